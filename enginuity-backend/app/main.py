@@ -1,17 +1,37 @@
 # app/main.py
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import get_settings
-from app.routers import health, notes, search, quiz, chat, export, upload, corpus
+from app.routers import health, notes, search, quiz, chat, export, upload, corpus, vector
+from app.services import llm
+from app.services.timing import ServerTimingMiddleware
 
 # Load settings
 settings = get_settings()
 
+# App loggers (stage timings etc.) live under "enginuity"
+_log = logging.getLogger("enginuity")
+if not _log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _log.addHandler(_handler)
+_log.setLevel(logging.INFO)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await llm.aclose()  # shared pooled LLM client
+    quiz.shutdown_executor()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Enginuity Backend",
     version="0.1.0",
-    description="Backend API for Enginuity AI"
+    description="Backend API for Enginuity AI",
+    lifespan=lifespan,
 )
 
 # --- CORS Configuration ---
@@ -29,8 +49,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Session-Id"],
 )
 
+# --- Per-stage latency (Server-Timing header + log) ---
+app.add_middleware(ServerTimingMiddleware, enabled=settings.SERVER_TIMING)
+
 # --- Routers ---
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(notes.router, prefix="/notes", tags=["notes"])
@@ -40,6 +64,7 @@ app.include_router(chat.router, prefix="/chat", tags=["chat"])
 app.include_router(export.router, prefix="/export", tags=["export"])
 app.include_router(upload.router, prefix="/upload", tags=["upload"])
 app.include_router(corpus.router, prefix="/corpus", tags=["corpus"])
+app.include_router(vector.router, prefix="/vector", tags=["vector"])
 
 # --- Root Route ---
 @app.get("/")
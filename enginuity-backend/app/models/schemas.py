@@ -12,6 +12,18 @@ class SearchRequest(BaseModel):
     q: str
     top_k: int = 5
     mode: str = "hybrid"  # hybrid|keyword|semantic
+    diversity: float = 0.0  # 0 = relevance only, up to 1 = MMR-diversified
+    cursor: str | None = None  # from a previous SearchPage.next_cursor; top_k is the page size
+
+class SearchPage(BaseModel):
+    hits: List[SearchHit] = []
+    next_cursor: str | None = None
+    total: int = 0  # size of the cached candidate list
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str = "term"  # term|phrase|title
+    score: int = 0
 
 class QuizItem(BaseModel):
     q: str
@@ -24,25 +36,42 @@ class QuizRequest(BaseModel):
     type: str = "mcq"   # mcq|fib|mix
     difficulty: str = "auto"
     topic: str | None = None
+    section_ids: List[str] | None = None  # scope to these sections (resolved server-side); None = all
+    corpus_id: str | None = None  # from /corpus/status; a mismatch means the notes changed (409)
+    context: str | None = None  # ad-hoc study text instead of the stored notes
+    no_cache: bool = False  # bypass the LLM response cache and quiz bank for fresh items
+
+class QuizBatchRequest(BaseModel):
+    quizzes: List[QuizRequest]  # one quiz per spec (topic and/or section_ids)
+    corpus_id: str | None = None  # default for specs that don't set their own
 
 class ChatMessage(BaseModel):
     role: str
     content: Any
 
 class ChatRequest(BaseModel):
-    messages: List[ChatMessage]
+    messages: List[ChatMessage] = []  # stateless mode: full history, last user message is answered
+    message: str | None = None  # session mode: just the new turn (history is kept server-side)
+    session_id: str | None = None  # omitted/unknown -> a new session is started
     top_k: int = 5
     temperature: float = 0.2
     ctx_mode: str = "notes"  # notes|notes+web
+    no_cache: bool = False  # bypass the LLM response cache
 
 class ChatResponse(BaseModel):
     text: str
     citations: List[dict] = []
+    timings: dict = {}  # retrieval_ms, generation_ms, context_tokens
+    session_id: str | None = None
 
 class NotesDoc(BaseModel):
+    lecture_id: int | None = None
     lecture_title: str = "Notes"
     generated_at: int | None = None
     sections: list = []
+    total: int | None = None  # sections in the lecture (the page in `sections` may hold fewer)
+    offset: int = 0
 
 class ExportRequest(BaseModel):
     format: str = "pdf"  # pdf|docx|anki|md
+    lecture_id: int | None = None  # default: the active lecture
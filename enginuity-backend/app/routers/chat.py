@@ -1,17 +1,113 @@
-from fastapi import APIRouter
+import json
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
 from app.models.schemas import ChatRequest, ChatResponse
+from app.services.rag import answer, message_text, stream_answer
+from app.services import singleflight
+from app.services.sessions import get_store, record_turn
+from app.services.singleflight import fingerprint
 
 router = APIRouter()
 
+
+def _turn(req: ChatRequest) -> Tuple[str, List[Dict], Optional[Dict]]:
+    """(question, history, session). Session mode when `message` is set; otherwise stateless."""
+    if req.message is not None:
+        question = req.message.strip()
+        if not question:
+            raise HTTPException(status_code=400, detail="Empty question.")
+        session = get_store().get_or_create(req.session_id)
+        return question, list(session["window"]), session
+
+    idx = next((i for i in range(len(req.messages) - 1, -1, -1) if req.messages[i].role == "user"), None)
+    if idx is None:
+        raise HTTPException(status_code=400, detail="No user message to answer.")
+    question = message_text(req.messages[idx].content).strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="Empty question.")
+    return question, [m.model_dump() for m in req.messages[:idx]], None
+
+
+def _gen_args(req: ChatRequest, session: Optional[Dict]) -> Dict:
+    return {
+        "top_k": max(1, min(int(req.top_k), 20)),
+        "temperature": max(0.0, min(float(req.temperature), 2.0)),
+        "carry": session["sections"] if session else (),
+        "summary": session["summary"] if session else "",
+        "no_cache": req.no_cache,
+    }
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.post("", response_model=ChatResponse)
-def chat(req: ChatRequest):
-    # Placeholder — echoes a domain-specific tip
-    demo_text = (
-        "Stability requires all poles to lie in the left half-plane. "
-        "For a step input, examine the dominant pole to estimate settling time."
-    )
-    demo_citations = [
-        {"title": "Poles & stability", "section_id": "sec-1", "score": 0.78, "snippet": "A linear system is stable if all poles lie strictly in the left half-plane."},
-        {"title": "Laplace Transform — definition", "section_id": "sec-2", "score": 0.73, "snippet": "𝓛{f(t)} = ∫₀^∞ f(t)e^{-st} dt."},
-    ]
-    return ChatResponse(text=demo_text, citations=demo_citations)
+async def chat(req: ChatRequest):
+    """
+    Answer the latest user message from the indexed notes.
+    Send either the full `messages` list, or `message` (+ `session_id`) to keep history server-side.
+    `ctx_mode` "notes+web" currently falls back to notes only (no web retriever yet).
+    """
+    question, history, session = await run_in_threadpool(_turn, req)
+    args = _gen_args(req, session)
+    carry_ids = [h.get("section_id") for h in args["carry"]]
+    key = fingerprint(" ".join(question.lower().split()), history, carry_ids, {k: v for k, v in args.items() if k != "carry"})
+    result = dict(await singleflight.group("chat").do(key, lambda: answer(question, history, **args)))
+    sections = result.pop("sections")
+    if session is not None:
+        await run_in_threadpool(get_store().save, record_turn(session, question, result["text"], sections))
+        result["session_id"] = session["id"]
+    return ChatResponse(**result)
+
+
+@router.post("/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Same as POST /chat, as Server-Sent Events:
+    `citations` (list) -> `token` ({"t": str}) ... -> `done` ({"timings": {..., "ttft_ms"}, "session_id"}).
+    The session id is also sent up front as the X-Session-Id header.
+    Errors after the stream has started are sent as an `error` event.
+    """
+    question, history, session = await run_in_threadpool(_turn, req)
+    args = _gen_args(req, session)
+
+    async def events():
+        parts: List[str] = []
+        try:
+            async for kind, payload in stream_answer(question, history, **args):
+                if kind == "token":
+                    parts.append(payload)
+                    yield _sse(kind, {"t": payload})
+                elif kind == "done":
+                    sections = payload.pop("sections")
+                    if session is not None:
+                        await run_in_threadpool(get_store().save, record_turn(session, question, "".join(parts), sections))
+                        payload["session_id"] = session["id"]
+                    yield _sse(kind, payload)
+                else:
+                    yield _sse(kind, payload)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if session is not None:
+        headers["X-Session-Id"] = session["id"]
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/sessions/{session_id}")
+def get_session(session_id: str):
+    session = get_store().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session.")
+    return {k: session[k] for k in ("id", "window", "summary", "turns", "updated_at")}
+
+
+@router.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    return {"deleted": get_store().delete(session_id)}
@@ -2,36 +2,22 @@
 from __future__ import annotations
 from fastapi import APIRouter
 from typing import Dict, Any
-from pathlib import Path
-import json
-from app.core.config import get_settings
+from app.services import quiz_prep
+from app.services.io import get_notes_repo
 
 router = APIRouter()
 
 def _load_notes_meta() -> Dict[str, Any]:
-    settings = get_settings()
-    notes_path = Path(settings.DATA_DIR).joinpath("notes.json").resolve()
-    if notes_path.exists():
-        try:
-            doc = json.loads(notes_path.read_text(encoding="utf-8"))
-            sections = doc.get("sections") or []
-            title = doc.get("lecture_title") or "Notes"
-            ts = doc.get("generated_at")
-            return {
-                "ready": bool(sections),
-                "lecture_title": title,
-                "generated_at": ts,
-                "sections": len(sections),
-            }
-        except Exception:
-            pass
-    return {"ready": False, "lecture_title": None, "generated_at": None, "sections": 0}
+    """Precomputed summary from the shared notes repository (no I/O while the notes are unchanged)."""
+    return dict(get_notes_repo().snapshot().status)
 
 @router.get("/status")
 def status() -> Dict[str, Any]:
     """
-    Returns whether a corpus/notes already exist on disk/DB.
+    Returns whether a corpus/notes already exist in the notes store.
     Frontend uses this to avoid forcing a re-upload.
     """
     meta = _load_notes_meta()
+    # echoed back by /quiz so section ids are resolved against the same notes
+    meta["corpus_id"] = quiz_prep.corpus_id() if meta["ready"] else None
     return {"ok": True, **meta}
@@ -1,13 +1,22 @@
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import ExportRequest
-from app.services.io import read_json, notes_json
+from app.services.io import get_notes_repo
+from app.services.notes_store import get_notes_store
 
 router = APIRouter()
 
 @router.post("")
 def do_export(req: ExportRequest):
     # Minimal stub: return markdown concatenation
-    doc = read_json(notes_json(), {"lecture_title": "Notes", "sections": []})
+    snap = get_notes_repo().snapshot()
+    if req.lecture_id is None or req.lecture_id == snap.status["lecture_id"]:
+        doc = snap.doc
+    else:
+        doc = get_notes_store().doc(req.lecture_id)
+    if doc is None:
+        if req.lecture_id is not None:
+            raise HTTPException(status_code=404, detail=f"Unknown lecture {req.lecture_id}.")
+        doc = {"lecture_title": "Notes", "sections": []}
     md = "# " + doc.get("lecture_title", "Notes") + "\n\n" + "\n\n".join(
         [f"## {s.get('title','Untitled')}\n\n{s.get('content','')}" for s in doc.get("sections", [])]
     )
@@ -1,8 +1,22 @@
 from fastapi import APIRouter
 from datetime import datetime
 
+from app.services import quiz_bank, singleflight
+from app.services.llm_cache import get_cache
+
 router = APIRouter()
 
 @router.get("")
 def status():
     return {"ok": True, "ts": datetime.utcnow().isoformat()}
+
+@router.get("/metrics")
+def metrics():
+    """In-process counters: request coalescing per call site, LLM cache and quiz bank usage."""
+    cache = get_cache()
+    bank = quiz_bank.get_bank()
+    return {
+        "singleflight": singleflight.metrics(),
+        "llm_cache": cache.stats() if cache else None,
+        "quiz_bank": bank.stats() if bank else None,
+    }
@@ -1,22 +1,75 @@
-from fastapi import APIRouter
-from app.services.io import read_json, notes_json
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from app.services.io import get_notes_repo, section_outline
+from app.services.notes_store import get_notes_store
 from app.models.schemas import NotesDoc
 
 router = APIRouter()
 
+SAMPLE = {
+    "lecture_title": "Sample Notes",
+    "generated_at": 0,
+    "sections": [
+        {"id": "sec-1", "title": "Signals & Systems", "type": "text",
+         "content": "Definition, block diagrams, linearity, time-invariance…"},
+        {"id": "sec-2", "title": "Laplace Transform", "type": "latex",
+         "content": "$$\\mathcal{L}\\{f(t)\\} = \\int_0^\\infty f(t)e^{-st} dt$$"},
+        {"id": "sec-3", "title": "Example Code", "type": "code", "language": "python",
+         "content": "import numpy as np\nt = np.linspace(0,1,1000)\n"},
+    ],
+}
+
 @router.get("", response_model=NotesDoc)
-def get_notes():
-    sample = {
-        "lecture_title": "Sample Notes",
-        "generated_at": 0,
-        "sections": [
-            {"id": "sec-1", "title": "Signals & Systems", "type": "text",
-             "content": "Definition, block diagrams, linearity, time-invariance…"},
-            {"id": "sec-2", "title": "Laplace Transform", "type": "latex",
-             "content": "$$\\mathcal{L}\\{f(t)\\} = \\int_0^\\infty f(t)e^{-st} dt$$"},
-            {"id": "sec-3", "title": "Example Code", "type": "code", "language": "python",
-             "content": "import numpy as np\nt = np.linspace(0,1,1000)\n"},
-        ],
-    }
-    doc = read_json(notes_json(), sample)
-    return doc
+def get_notes(
+    lecture_id: Optional[int] = None,
+    outline: bool = False,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    The active (most recent) lecture, or `lecture_id`; sample notes before the first upload.
+    `outline=true` leaves out section bodies (fetch them from /notes/{section_id});
+    `offset`/`limit` page through the sections, `total` counts them all.
+    """
+    snap = get_notes_repo().snapshot()
+    end = None if limit is None else offset + limit
+    if lecture_id is None or lecture_id == snap.status["lecture_id"]:
+        doc = snap.doc  # served from memory
+        if doc is not None:
+            secs = snap.outline if outline else doc["sections"]
+            return {**doc, "sections": secs[offset:end], "total": len(secs), "offset": offset}
+    else:
+        lec = get_notes_store().lecture(lecture_id)
+        if lec is not None and outline:  # a page of rows, without loading the bodies
+            return {"lecture_id": lec["id"], "lecture_title": lec["title"], "generated_at": lec["generated_at"],
+                    "sections": get_notes_store().outline(lec["id"], offset, limit),
+                    "total": lec["n_sections"], "offset": offset}
+        doc = get_notes_store().doc(lecture_id) if lec is not None else None
+    if doc is None:
+        if lecture_id is not None:
+            raise HTTPException(status_code=404, detail=f"Unknown lecture {lecture_id}.")
+        doc = SAMPLE
+    secs = doc["sections"]
+    if outline:
+        secs = [section_outline(s) for s in secs]
+    return {**doc, "sections": secs[offset:end], "total": len(secs), "offset": offset}
+
+@router.get("/lectures")
+def list_lectures() -> List[dict]:
+    """Every stored lecture, newest first (no section content)."""
+    return get_notes_repo().snapshot().lectures
+
+# declared after /lectures so that path isn't taken for a section id
+@router.get("/{section_id}")
+def get_section(section_id: str) -> dict:
+    """One section with its body (active lecture from memory, older lectures from the store)."""
+    snap = get_notes_repo().snapshot()
+    sec = snap.by_id.get(section_id)
+    if sec is None and snap.doc is None:
+        sec = next((s for s in SAMPLE["sections"] if s["id"] == section_id), None)
+    if sec is None:
+        sec = get_notes_store().section(section_id)
+    if sec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown section {section_id}.")
+    return sec
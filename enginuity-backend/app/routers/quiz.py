@@ -1,66 +1,51 @@
 # enginuity-backend/app/routers/quiz.py
 from __future__ import annotations
 
-import os
+import asyncio
+import contextvars
+import functools
+import logging
 import re
 import random
 import json
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from app.core.config import get_settings
-from app.models.schemas import QuizRequest, QuizItem
+from app.models.schemas import QuizBatchRequest, QuizRequest, QuizItem
+from app.services import llm, quiz_bank, singleflight
+from app.services.compress import compress
+from app.services.io import get_notes_repo
+from app.services.notes_store import get_notes_store
+from app.services.quiz_prep import (
+    about,
+    candidates_by_id,
+    clean_lines,
+    clean_whitespace as _clean_whitespace,
+    corpus_id,
+    get_candidates,
+    key_lines,
+    looks_like_contact_or_greeting as _looks_like_contact_or_greeting,
+    meaningful_token as _meaningful_token,
+    merge,
+    section_text,
+    vocabulary,
+)
+from app.services.singleflight import fingerprint
+from app.services.timing import timed
 
 router = APIRouter()
-
-# ----------------------------
-# OpenAI (optional)
-# ----------------------------
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-try:
-    from openai import OpenAI  # type: ignore # openai>=1.0
-    _openai = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-except Exception:
-    _openai = None
+log = logging.getLogger("enginuity.quiz")
 
 # ----------------------------
 # Config
 # ----------------------------
-MAX_CONTEXT_CHARS = 20000
 MAX_ITEMS = 25
-RANDOM_SEED = 17
-
-STOPWORDS = set("""
-a an and are as at be by for from has have if in into is it its of on or that the this to was were will with your you we i
-""".split())
-
-CONTACT_PATTERNS = [
-    r"^dear\b.*",                      # greetings
-    r"^hi\b.*",
-    r"^hello\b.*",
-    r"^best\b.*",                      # signatures
-    r"^regards\b.*",
-    r"^sincerely\b.*",
-    r"\bbest regards\b",
-    r"\bthanks\b",
-    r"\bthank you\b",
-    r"\bphone\b",
-    r"\bemail\b",
-    r"\blinked?in\b",
-    r"\bgithub\b",
-    r"\bportfolio\b",
-    r"\bresume\b",
-    r"\bcover letter\b",
-    r"\bhiring\b.*team\b",
-    r"\bcontact\b",
-    r"\baddress\b",
-    r"\+\d{1,3}\s?\d",                 # intl phone
-    r"\(\d{3}\)\s?\d{3}-\d{4}",        # (999) 999-9999
-    r"\d{3}-\d{3}-\d{4}",              # 999-999-9999
-    r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",  # email
-    r"https?://\S+",
-]
+RANDOM_SEED = 17  # base seed; each request gets its own Random seeded from this + its fingerprint
 
 # ---- Answer length / shaping ----
 MIN_ANS_CHARS = 2
@@ -71,12 +56,6 @@ MAX_ANS_TOKENS = 10         # ~1–10 words preferred for MCQ answers
 # ----------------------------
 # Utilities
 # ----------------------------
-def _clean_whitespace(s: str) -> str:
-    s = (s or "").replace("\r", "")
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
-    return s.strip()
-
 def _word_count(s: str) -> int:
     return len([w for w in re.findall(r"\b\w+\b", s or "")])
 
@@ -108,53 +87,13 @@ def _valid_answer_text(s: str) -> bool:
     alpha = sum(ch.isalpha() for ch in s)
     return (alpha / max(1, len(s))) >= 0.45
 
-def _alpha_ratio(s: str) -> float:
-    if not s:
-        return 0.0
-    alpha = sum(ch.isalpha() for ch in s)
-    return alpha / max(1, len(s))
-
-def _looks_like_contact_or_greeting(s: str) -> bool:
-    low = s.strip().lower()
-    for pat in CONTACT_PATTERNS:
-        if re.search(pat, low):
-            return True
-    return False
-
-def _meaningful_token(t: str) -> bool:
-    t = t.strip().lower()
-    return (
-        len(t) >= 4
-        and t not in STOPWORDS
-        and bool(re.match(r"^[a-z][a-z0-9_\-]*$", t))
-    )
-
 def preprocess_context(raw: str) -> str:
-    """
-    Remove greetings/signatures/contact lines/URLs/emails, tiny lines, and low-alpha lines.
-    Keep math/code blocks; keep sentences >= 15 chars or with key punctuation.
-    """
-    raw = _clean_whitespace(raw)
-    lines = [ln.strip() for ln in raw.split("\n")]
-
-    filtered: List[str] = []
-    for ln in lines:
-        if not ln:
-            continue
-        # Filter non-study lines
-        if _looks_like_contact_or_greeting(ln):
-            continue
-        if len(ln) < 15 and not any(x in ln for x in (":", "=", "->", "∴", "∵")):
-            continue
-        if _alpha_ratio(ln) < 0.5 and not any(x in ln for x in ("=", "$", "\\", "∑", "∫", "→", "↦")):
-            continue
-        filtered.append(ln)
+    """Cleaned study lines (see quiz_prep.clean_lines); no length cap, prompts are sized by compress()."""
+    return "\n".join(clean_lines(raw)).strip()
 
-    # Merge and cap
-    text = "\n".join(filtered).strip()
-    if len(text) > MAX_CONTEXT_CHARS:
-        text = text[:MAX_CONTEXT_CHARS]
-    return text
+def request_rng(key: str = "") -> random.Random:
+    """Private RNG for one request: reproducible for identical requests, untouched by concurrent ones."""
+    return random.Random(f"{RANDOM_SEED}:{key}")
 
 def _difficulty_hint(diff: str) -> str:
     return {
@@ -197,9 +136,12 @@ Return JSON ONLY as a list:
 For FIB items, omit the "choices" field.
 """
 
-def llm_generate(context: str, n: int, qtype: str, difficulty: str) -> List[QuizItem]:
-    if not _openai:
+async def llm_generate(
+    context: str, n: int, qtype: str, difficulty: str, no_cache: bool = False, rng: Optional[random.Random] = None
+) -> List[QuizItem]:
+    if not llm.llm_enabled():
         return []
+    rng = rng or request_rng()
 
     type_hint = {
         "mcq": "Generate only MCQs with short, noun-phrase answers (1–8 words).",
@@ -212,20 +154,19 @@ def llm_generate(context: str, n: int, qtype: str, difficulty: str) -> List[Quiz
         f"{type_hint}\n"
         f"Number of questions: {min(max(1, n), MAX_ITEMS)}.\n"
         "Study material:\n"
-        f"{context[:6000]}\n"
+        f"{context}\n"
     )
 
     try:
-        resp = _openai.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            temperature=0.2,
-            messages=[
+        content = await llm.complete(
+            [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
+            temperature=0.2,
             response_format={"type": "json_object"},
+            no_cache=no_cache,
         )
-        content = (resp.choices[0].message.content or "").strip()
         parsed = json.loads(content)
         items = parsed if isinstance(parsed, list) else parsed.get("items", [])
     except Exception:
@@ -267,7 +208,7 @@ def llm_generate(context: str, n: int, qtype: str, difficulty: str) -> List[Quiz
                         break
             if len(choice_short) != 4:
                 continue
-            random.shuffle(choice_short)
+            rng.shuffle(choice_short)
             out.append(QuizItem(q=q, choices=choice_short, answer=ans, explanation=expl))
         else:
             # FIB
@@ -278,6 +219,60 @@ def llm_generate(context: str, n: int, qtype: str, difficulty: str) -> List[Quiz
     return out
 
 
+def _stem_key(q: str) -> str:
+    """Normalized stem for de-duplicating questions across shards."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", (q or "").lower().replace("____", " ")).split())
+
+def _shard_lines(lines: List[str], k: int) -> List[List[str]]:
+    """Split lines into up to k contiguous slices of roughly equal size (reading order kept)."""
+    total = sum(len(ln) + 1 for ln in lines)
+    shards: List[List[str]] = [[]]
+    acc = 0
+    for ln in lines:
+        if shards[-1] and len(shards) < k and acc >= total * len(shards) / k:
+            shards.append([])
+        shards[-1].append(ln)
+        acc += len(ln) + 1
+    return [s for s in shards if s]
+
+async def llm_generate_sharded(
+    context: str, n: int, qtype: str, difficulty: str, topic: str = "", no_cache: bool = False,
+    rng: Optional[random.Random] = None,
+) -> List[QuizItem]:
+    """
+    One LLM call per contiguous slice of the material (each compressed to the prompt budget),
+    QUIZ_SHARD_ITEMS questions apiece, run concurrently; results are interleaved across shards,
+    de-duplicated by normalized stem and trimmed to n. Small quizzes stay a single call.
+    """
+    s = get_settings()
+    lines = [ln for ln in context.split("\n") if ln.strip()]
+    k = max(1, min(s.QUIZ_MAX_SHARDS, -(-n // max(1, s.QUIZ_SHARD_ITEMS)), len(lines)))
+    shards = _shard_lines(lines, k)
+    per_shard = -(-n // len(shards)) + (1 if len(shards) > 1 else 0)  # slack for cross-shard duplicates
+    sem = asyncio.Semaphore(max(1, s.QUIZ_SHARD_CONCURRENCY))
+    rng = rng or request_rng()
+    seeds = [rng.getrandbits(64) for _ in shards]  # drawn up front: shards finish in any order
+
+    async def one(shard: List[str], seed: int) -> List[QuizItem]:
+        async with sem:
+            prompt_context = await run_in_threadpool(compress, "\n".join(shard), topic, s.QUIZ_CONTEXT_TOKENS)
+            return await llm_generate(prompt_context, per_shard, qtype, difficulty, no_cache=no_cache, rng=random.Random(seed))
+
+    batches = await asyncio.gather(*(one(sh, seed) for sh, seed in zip(shards, seeds)))
+    log.debug("quiz llm: %d chars in %d shards -> %s items", len(context), len(shards), [len(b) for b in batches])
+
+    out: List[QuizItem] = []
+    seen = set()
+    for rnd in range(max((len(b) for b in batches), default=0)):
+        for b in batches:
+            if rnd < len(b):
+                key = _stem_key(b[rnd].q)
+                if key and key not in seen:
+                    seen.add(key)
+                    out.append(b[rnd])
+    return out[:n]
+
+
 # ----------------------------
 # Deterministic fallback (grounded)
 # ----------------------------
@@ -288,13 +283,7 @@ TECH_FALLBACKS = [
 ]
 
 def _key_lines(context: str) -> List[str]:
-    lines = [ln.strip() for ln in context.split("\n") if ln.strip()]
-    # prefer definitional/mathy lines
-    keyish = [ln for ln in lines if (":" in ln or "=" in ln or r"\(" in ln or r"\math" in ln)]
-    if not keyish:
-        # aim for medium-length factual sentences
-        keyish = [ln for ln in lines if 40 <= len(ln) <= 180 and not _looks_like_contact_or_greeting(ln)]
-    return keyish[:300]
+    return key_lines(context.split("\n"))
 
 def _choose_term(line: str) -> Optional[str]:
     tokens = re.findall(r"[A-Za-z][A-Za-z0-9_\-]{3,}", line)
@@ -314,7 +303,7 @@ def _make_fib(line: str) -> Optional[QuizItem]:
         return None
     return QuizItem(q=q, answer=term, explanation="Derived from the provided material.")
 
-def _make_mcq(line: str, vocab: List[str]) -> Optional[QuizItem]:
+def _make_mcq(line: str, vocab: List[str], rng: random.Random) -> Optional[QuizItem]:
     if ":" in line:
         concept, rhs = line.split(":", 1)
         stem = f"Which best describes {concept.strip()}?"
@@ -351,18 +340,21 @@ def _make_mcq(line: str, vocab: List[str]) -> Optional[QuizItem]:
         return None
 
     choices = [ans] + distractors
-    random.shuffle(choices)
+    rng.shuffle(choices)
     return QuizItem(q=stem, choices=choices, answer=ans, explanation="Derived from the provided material.")
 
-def rule_based_generate(context: str, n: int, qtype: str) -> List[QuizItem]:
-    random.seed(RANDOM_SEED)
-    lines = _key_lines(context)
-    # vocabulary pool for distractors
-    vocab = []
-    for w in re.findall(r"[A-Za-z][A-Za-z0-9_\-]{3,}", context):
-        if _meaningful_token(w):
-            vocab.append(w)
-    vocab = list(dict.fromkeys(vocab))[:400]
+def rule_based_generate(context: str, n: int, qtype: str, rng: Optional[random.Random] = None) -> List[QuizItem]:
+    return _rule_generate(_key_lines(context), vocabulary(context), n, qtype, rng)
+
+def rule_based_from_candidates(preps: List[Dict], n: int, qtype: str, rng: Optional[random.Random] = None) -> List[QuizItem]:
+    """Same generator, fed from the per-section candidates precomputed at ingest."""
+    _, lines, vocab = merge(preps)
+    return _rule_generate(lines, vocab, n, qtype, rng)
+
+def _rule_generate(
+    lines: List[str], vocab: List[str], n: int, qtype: str, rng: Optional[random.Random] = None
+) -> List[QuizItem]:
+    rng = rng or request_rng()
     items: List[QuizItem] = []
 
     def want_mcq(idx: int) -> bool:
@@ -376,7 +368,7 @@ def rule_based_generate(context: str, n: int, qtype: str) -> List[QuizItem]:
     for ln in lines:
         if i >= n:
             break
-        it = _make_mcq(ln, vocab) if want_mcq(i) else _make_fib(ln)
+        it = _make_mcq(ln, vocab, rng) if want_mcq(i) else _make_fib(ln)
         if it and it.q and it.answer and (len(it.q) >= 12):
             items.append(it)
             i += 1
@@ -385,37 +377,50 @@ def rule_based_generate(context: str, n: int, qtype: str) -> List[QuizItem]:
     j = 0
     while len(items) < n and j < len(lines):
         ln = lines[j]
-        it = _make_fib(ln) if want_mcq(len(items)) else _make_mcq(ln, vocab)
+        it = _make_fib(ln) if want_mcq(len(items)) else _make_mcq(ln, vocab, rng)
         if it and it.q and it.answer and (len(it.q) >= 12):
             items.append(it)
         j += 1
     return items[:n]
 
 
+# ----------------------------
+# Rule-based executor
+# ----------------------------
+# CPU-bound generation gets its own small pool so a burst of quizzes can't take
+# every worker of the shared threadpool that sync routes and I/O offloads use.
+_rule_pool: Optional[ThreadPoolExecutor] = None
+_rule_pool_lock = threading.Lock()
+
+def _rule_executor() -> ThreadPoolExecutor:
+    global _rule_pool
+    with _rule_pool_lock:
+        if _rule_pool is None:
+            _rule_pool = ThreadPoolExecutor(max_workers=max(1, get_settings().QUIZ_RULE_WORKERS), thread_name_prefix="quiz-rule")
+        return _rule_pool
+
+async def run_rule(fn, *args):
+    """Run `fn(*args)` on the rule-based pool (request context, e.g. stage timings, carried along)."""
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_rule_executor(), functools.partial(ctx.run, fn, *args))
+
+def shutdown_executor() -> None:
+    global _rule_pool
+    with _rule_pool_lock:
+        if _rule_pool is not None:
+            _rule_pool.shutdown(wait=False, cancel_futures=True)
+            _rule_pool = None
+
+
 # ----------------------------
 # Build context from request (resilient)
 # ----------------------------
-def _load_notes_text_from_disk() -> str:
-    """Concatenate section contents from DATA_DIR/notes.json for fallback."""
+def _load_notes_text() -> str:
+    """Concatenate the active lecture's section contents (shared notes repository) for fallback."""
     try:
-        settings = get_settings()
-        notes_path = Path(settings.DATA_DIR).joinpath("notes.json").resolve()
-        if notes_path.exists():
-            doc = json.loads(notes_path.read_text(encoding="utf-8"))
-            sections = doc.get("sections", []) or []
-            parts: List[str] = []
-            for s in sections:
-                title = s.get("title", "")
-                content = s.get("content", "")
-                if not content:
-                    continue
-                if s.get("type") == "code":
-                    parts.append(f"{title}\nCode:\n{content}\n")
-                elif s.get("type") == "latex":
-                    parts.append(f"{title}\nMath:\n{content}\n")
-                else:
-                    parts.append(f"{title}\n{content}\n")
-            return "\n\n".join(parts).strip()
+        doc = get_notes_repo().snapshot().doc or {}
+        parts = [section_text(s) for s in doc.get("sections", []) or []]
+        return "\n\n".join(p for p in parts if p).strip()
     except Exception:
         pass
     return ""
@@ -423,25 +428,24 @@ def _load_notes_text_from_disk() -> str:
 def build_context(req: QuizRequest) -> str:
     parts: List[str] = []
 
-    # 1) UI-provided trimmed context (preferred)
-    context_val = getattr(req, "context", None)
-    if context_val:
-        parts.append(str(context_val))
+    # 1) Ad-hoc study text from the caller (preferred)
+    if req.context:
+        parts.append(req.context)
 
-    # 2) Fallback: local notes.json if available
+    # 2) Fallback: the stored notes, if any
     if not parts:
-        disk_text = _load_notes_text_from_disk()
-        if disk_text:
-            parts.append(disk_text)
+        notes_text = _load_notes_text()
+        if notes_text:
+            parts.append(notes_text)
 
     # 3) Last resort: topic (still filtered)
-    if not parts and getattr(req, "topic", None):
-        parts.append(str(req.topic))
+    if not parts and req.topic:
+        parts.append(req.topic)
 
     if not parts:
         raise HTTPException(
             status_code=400,
-            detail="No study material found. Pass 'context' in the request or ensure data/notes.json exists (optionally provide 'topic')."
+            detail="No study material found. Pass 'context' in the request or upload a lecture first (optionally provide 'topic')."
         )
 
     raw = "\n\n".join(parts)
@@ -454,17 +458,14 @@ def build_context(req: QuizRequest) -> str:
 # ----------------------------
 @router.post("", response_model=List[QuizItem])   # POST /quiz
 @router.post("/", response_model=List[QuizItem])  # POST /quiz/
-def gen_quiz(req: QuizRequest) -> List[QuizItem]:
-    # Debug — appears in backend console
-    try:
-        print("QUIZ DEBUG:", {
-            "using_openai": bool(_openai),
-            "has_context": bool(getattr(req, "context", None)),
-            "topic": getattr(req, "topic", None),
-        })
-    except Exception:
-        pass
+async def gen_quiz(req: QuizRequest) -> List[QuizItem]:
+    log.debug("quiz request: llm=%s context=%s sections=%d topic=%r",
+              llm.llm_enabled(), bool(req.context), len(req.section_ids or []), req.topic)
+    return await _quiz(req)
 
+
+def _params(req: QuizRequest):
+    """Normalized (n, qtype, difficulty)."""
     n = max(1, min(int(req.n), MAX_ITEMS))
     qtype = (req.type or "mcq").lower().strip()
     if qtype in ("fill-in-the-blank", "fill in the blank", "fill_in_the_blank"):
@@ -475,21 +476,90 @@ def gen_quiz(req: QuizRequest) -> List[QuizItem]:
     difficulty = (req.difficulty or "auto").lower().strip()
     if difficulty not in {"auto", "easy", "medium", "hard"}:
         difficulty = "auto"
+    return n, qtype, difficulty
 
-    context = build_context(req)  # filtered, capped
 
-    try:
-        print("QUIZ DEBUG 2:", {"pre_len": len(context)})
-    except Exception:
-        pass
+async def _quiz(req: QuizRequest, by_id: Optional[Dict[str, Dict]] = None) -> List[QuizItem]:
+    n, qtype, difficulty = _params(req)
+    # Identical concurrent requests (a whole class clicking "Generate") share one generation
+    topic = " ".join((req.topic or "").lower().split())
+    key = fingerprint(n, qtype, difficulty, topic, sorted(set(req.section_ids or [])), req.corpus_id, req.context, req.no_cache)
+    rng = request_rng(key)
+    return await singleflight.group("quiz").do(key, lambda: _generate_quiz(req, n, qtype, difficulty, by_id, rng))
+
+
+def _resolve_sections(
+    req: QuizRequest, cands: Optional[Dict[str, Dict]] = None, current: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    Requested sections from the in-memory candidate index ({} for ad-hoc context or no notes).
+    /quiz/batch passes the index and corpus id it loaded once for all of its quizzes.
+    """
+    if req.context:
+        return {}
+    if cands is None:
+        current = corpus_id()
+    if req.corpus_id and req.corpus_id != current:
+        raise HTTPException(status_code=409, detail="The notes have changed since this page loaded; reload and pick sections again.")
+    if cands is None:
+        by_id = candidates_by_id(req.section_ids)
+    elif req.section_ids:
+        by_id = {sid: cands[sid] for sid in dict.fromkeys(req.section_ids) if sid in cands}
+    else:
+        by_id = cands
+    if req.section_ids and not by_id:
+        raise HTTPException(status_code=404, detail="None of the requested sections exist in the current notes.")
+    return by_id
+
+async def _generate_quiz(
+    req: QuizRequest, n: int, qtype: str, difficulty: str, by_id: Optional[Dict[str, Dict]] = None,
+    rng: Optional[random.Random] = None,
+) -> List[QuizItem]:
+    rng = rng or request_rng()
+    with timed("quiz_context"):
+        # Per-section candidates precomputed at ingest; raw text only if a context was passed or there are no notes
+        if by_id is None:
+            by_id = await run_in_threadpool(_resolve_sections, req)
+        # A topic narrows the sections to the ones about it; if none are, the bank (which
+        # knows nothing of topics) is skipped and the LLM steers by topic over all of them
+        on_topic = about(by_id, req.topic) if by_id and req.topic else by_id
+        by_id = on_topic or by_id
+        preps = list(by_id.values())
+
+    # Pre-generated questions for these sections, unless the caller asked for fresh ones
+    if on_topic and not req.no_cache:
+        banked = await _from_bank(by_id, n, qtype, difficulty, rng)
+        if banked:
+            return banked
+
+    with timed("quiz_context"):
+        if preps:
+            context = "\n".join(ln for p in preps for ln in p["lines"])
+        else:
+            context = await run_in_threadpool(build_context, req)  # filtered
 
-    # Try LLM first (if configured)
-    items = llm_generate(context, n, qtype, difficulty) if _openai else []
+    # Try LLM first (if configured): sharded over the material, each shard compressed to the prompt budget
+    items: List[QuizItem] = []
+    if llm.llm_enabled():
+        with timed("quiz_llm"):
+            items = await llm_generate_sharded(context, n, qtype, difficulty, req.topic or "", no_cache=req.no_cache, rng=rng)
     # Fallback to deterministic generator
     if not items:
-        items = rule_based_generate(context, n, qtype)
+        with timed("quiz_rule"):
+            if preps:
+                items = await run_rule(rule_based_from_candidates, preps, n, qtype, rng)
+            else:
+                items = await run_rule(rule_based_generate, context, n, qtype, rng)
+
+    out = _normalize(items, rng)
+    if not out:
+        raise HTTPException(status_code=422, detail="Could not generate quiz from the provided study material.")
+    return out
 
-    # Final normalization: ensure choices sane and answer included
+
+def _normalize(items: List[QuizItem], rng: Optional[random.Random] = None) -> List[QuizItem]:
+    """Final normalization: ensure choices sane and answer included."""
+    rng = rng or request_rng()
     out: List[QuizItem] = []
     seen_q = set()
     for it in items:
@@ -526,7 +596,7 @@ def gen_quiz(req: QuizRequest) -> List[QuizItem]:
                         break
             if len(ch_proc) != 4 or not _valid_answer_text(a_short):
                 continue
-            random.shuffle(ch_proc)
+            rng.shuffle(ch_proc)
             out.append(QuizItem(q=q, choices=ch_proc, answer=a_short, explanation=it.explanation))
         else:
             # FIB
@@ -539,7 +609,143 @@ def gen_quiz(req: QuizRequest) -> List[QuizItem]:
                 continue
             out.append(QuizItem(q=q, answer=a, explanation=it.explanation))
         seen_q.add(q)
-
-    if not out:
-        raise HTTPException(status_code=422, detail="Could not generate quiz from the provided study material.")
     return out
+
+
+# ----------------------------
+# Quiz bank (pre-generated per section)
+# ----------------------------
+_background: Set["asyncio.Task[Any]"] = set()
+
+def _rule_bank_rows(preps: Dict[str, Dict]) -> List[quiz_bank.Row]:
+    """Rule-based questions of both types per section (cheap; difficulty-independent, stored as "auto")."""
+    per = get_settings().QUIZ_BANK_PER_SECTION
+    rows: List[quiz_bank.Row] = []
+    for sid, prep in preps.items():
+        rng = request_rng(prep["hash"])
+        items = rule_based_from_candidates([prep], per, "mcq", rng) + rule_based_from_candidates([prep], per, "fib", rng)
+        items = _normalize(items, rng)
+        rows.append((sid, prep["hash"], "auto", "rule", [it.model_dump() for it in items]))
+    return rows
+
+async def fill_bank(preps: Dict[str, Dict], difficulty: str = "auto") -> int:
+    """Generate and store questions for the given sections (id -> prepared section). Returns rows written."""
+    bank = quiz_bank.get_bank()
+    if bank is None or not preps:
+        return 0
+    s = get_settings()
+    rows: List[quiz_bank.Row] = []
+    if llm.llm_enabled():
+        sem = asyncio.Semaphore(max(1, s.QUIZ_SHARD_CONCURRENCY))
+
+        async def one(sid: str, prep: Dict) -> Optional[quiz_bank.Row]:
+            rng = request_rng(f"{prep['hash']}:{difficulty}")
+            async with sem:
+                items = await llm_generate_sharded("\n".join(prep["lines"]), s.QUIZ_BANK_PER_SECTION, "mix", difficulty, rng=rng)
+            items = _normalize(items, rng)
+            return (sid, prep["hash"], difficulty, "llm", [it.model_dump() for it in items]) if items else None
+
+        rows = [r for r in await asyncio.gather(*(one(sid, p) for sid, p in preps.items())) if r]
+    done = {r[0] for r in rows}
+    rest = {sid: p for sid, p in preps.items() if sid not in done}
+    if rest:
+        rows += await run_rule(_rule_bank_rows, rest)
+    await run_in_threadpool(bank.put_many, rows)
+    return len(rows)
+
+async def refresh_bank() -> Dict[str, int]:
+    """
+    Background job after ingest: drop stale rows, then fill every section of the active
+    lecture without current questions. Earlier lectures' rows are kept (lectures are add-only).
+    """
+    bank = quiz_bank.get_bank()
+    if bank is None:
+        return {"pruned": 0, "filled": 0}
+    by_id = await run_in_threadpool(candidates_by_id, None)
+    hashes = {sid: p["hash"] for sid, p in by_id.items()}
+    stored = await run_in_threadpool(get_notes_store().section_ids)
+    pruned = await run_in_threadpool(bank.prune, hashes, set(stored) - set(hashes))
+    have = await run_in_threadpool(bank.get, hashes, "auto")
+    filled = await fill_bank({sid: p for sid, p in by_id.items() if sid not in have})
+    log.info("quiz bank refreshed: %d stale rows dropped, %d sections filled", pruned, filled)
+    return {"pruned": pruned, "filled": filled}
+
+def _spawn(coro) -> None:
+    task = asyncio.ensure_future(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+async def _from_bank(
+    by_id: Dict[str, Dict], n: int, qtype: str, difficulty: str, rng: Optional[random.Random] = None
+) -> List[QuizItem]:
+    """Sample n banked questions; a few missing/stale sections are generated inline, many in the background."""
+    bank = quiz_bank.get_bank()
+    if bank is None:
+        return []
+    with timed("quiz_bank"):
+        hashes = {sid: p["hash"] for sid, p in by_id.items()}
+        pools = await run_in_threadpool(bank.get, hashes, difficulty)
+        missing = {sid: p for sid, p in by_id.items() if sid not in pools}
+        if missing and len(missing) <= get_settings().QUIZ_BANK_SYNC_SECTIONS:
+            await fill_bank(missing, difficulty)
+            pools = await run_in_threadpool(bank.get, hashes, difficulty)
+        elif missing:
+            key = fingerprint(sorted(missing), difficulty)
+            _spawn(singleflight.group("quiz_bank").do(key, lambda: fill_bank(missing, difficulty)))
+        picked = quiz_bank.sample(pools, n, qtype, rng)
+    # Too few banked questions of this type: generate on demand this time
+    return [QuizItem(**it) for it in picked] if len(picked) >= n else []
+
+
+# ----------------------------
+# Batch endpoint (POST /quiz/batch, NDJSON)
+# ----------------------------
+def _ndjson(obj: Dict[str, Any]) -> str:
+    return json.dumps(obj, ensure_ascii=False) + "\n"
+
+@router.post("/batch")
+async def gen_quiz_batch(req: QuizBatchRequest) -> StreamingResponse:
+    """
+    Several quizzes (one per topic / section spec) in one round-trip. Notes are loaded
+    once for the whole batch, quizzes are generated concurrently (QUIZ_BATCH_CONCURRENCY),
+    and each is streamed as one NDJSON line as soon as it is ready, in completion order:
+      {"index": i, "topic": ..., "section_ids": ..., "items": [...]}
+      {"index": i, ..., "error": {"status_code": 422, "detail": "..."}}
+    """
+    s = get_settings()
+    if not req.quizzes:
+        raise HTTPException(status_code=400, detail="No quizzes requested.")
+    if len(req.quizzes) > s.QUIZ_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {s.QUIZ_BATCH_MAX} quizzes per batch.")
+
+    with timed("quiz_context"):
+        cands, current = await run_in_threadpool(lambda: (get_candidates(), corpus_id()))
+    if req.corpus_id and req.corpus_id != current:
+        raise HTTPException(status_code=409, detail="The notes have changed since this page loaded; reload and pick sections again.")
+    specs = [q if q.corpus_id or not req.corpus_id else q.model_copy(update={"corpus_id": req.corpus_id}) for q in req.quizzes]
+    sem = asyncio.Semaphore(max(1, s.QUIZ_BATCH_CONCURRENCY))
+
+    async def one(i: int, spec: QuizRequest) -> Dict[str, Any]:
+        line: Dict[str, Any] = {"index": i, "topic": spec.topic, "section_ids": spec.section_ids}
+        try:
+            async with sem:
+                by_id = _resolve_sections(spec, cands, current)
+                items = await _quiz(spec, by_id)
+            line["items"] = [it.model_dump() for it in items]
+        except HTTPException as e:
+            line["error"] = {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:  # one bad spec shouldn't sink the batch
+            log.exception("batch quiz %d failed", i)
+            line["error"] = {"status_code": 500, "detail": str(e)}
+        return line
+
+    async def lines():
+        tasks = [asyncio.ensure_future(one(i, spec)) for i, spec in enumerate(specs)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield _ndjson(await fut)
+        finally:
+            for t in tasks:  # client went away: stop the rest
+                t.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
@@ -1,14 +1,57 @@
-from fastapi import APIRouter
-from app.models.schemas import SearchRequest, SearchHit
-from typing import List
-from app.services.vector import search as vec_search
+from fastapi import APIRouter, HTTPException, Query
+from app.models.schemas import SearchRequest, SearchHit, SearchPage, Suggestion
+from typing import Dict, List, Optional, Tuple
+import base64
+import json
+from app.core.config import get_settings
+from app.services.vector import cached_candidates, search_candidates
+from app.services.suggest import suggest
 
 router = APIRouter()
 
-@router.post("", response_model=List[SearchHit])
+def _encode_cursor(list_id: str, offset: int) -> str:
+    raw = json.dumps({"id": list_id, "o": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        list_id, offset = str(data["id"]), int(data["o"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed search cursor.")
+    # a negative offset would slice from the end of the candidate list
+    if not 0 <= offset <= get_settings().SEARCH_MAX_CANDIDATES:
+        raise HTTPException(status_code=400, detail="Malformed search cursor.")
+    return list_id, offset
+
+@router.post("", response_model=SearchPage)
 def run_search(req: SearchRequest):
-    q = req.q.strip()
-    if not q:
-        return []
-    hits = vec_search(q, top_k=req.top_k)
-    return [SearchHit(**h) for h in hits]
+    """
+    First call runs one deep query and caches the candidates; the returned cursor pages
+    through that list without re-embedding or re-querying.
+    """
+    page_size = max(1, req.top_k)
+    if req.cursor:
+        list_id, offset = _decode_cursor(req.cursor)
+        hits: Optional[List[Dict]] = cached_candidates(list_id)
+        if hits is None:
+            raise HTTPException(status_code=410, detail="Search cursor expired; run the search again.")
+    else:
+        q = req.q.strip()
+        if not q:
+            return SearchPage()
+        list_id, hits = search_candidates(q, req.diversity)
+        offset = 0
+
+    end = offset + page_size
+    return SearchPage(
+        hits=[SearchHit(**h) for h in hits[offset:end]],
+        next_cursor=_encode_cursor(list_id, end) if end < len(hits) else None,
+        total=len(hits),
+    )
+
+@router.get("/suggest", response_model=List[Suggestion])
+def run_suggest(q: str = Query("", max_length=100), limit: int = Query(8, ge=1, le=20)):
+    """Type-ahead: prefix match over indexed terms, phrases and section titles (no embedding)."""
+    return suggest(q, limit)
@@ -1,24 +1,33 @@
 # app/routers/upload.py
-from fastapi import APIRouter, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from pathlib import Path
 from datetime import datetime
+import time
 from app.core.config import get_settings
 from app.services.extract import extract_text
 from app.services.chunk import simple_chunk
+from app.services.dedupe import dedupe_sections
+from app.services import quiz_prep, suggest
 from app.services.vector import index_sections
 from app.services.io import write_json, notes_json
+from app.services.notes_store import get_notes_store
+from app.services.timing import timed
+from app.routers.quiz import refresh_bank
 
 router = APIRouter()
 
 @router.post("")
-async def upload(files: List[UploadFile] = File(...), kind: str = Form("doc")):
+async def upload(background: BackgroundTasks, files: List[UploadFile] = File(...), kind: str = Form("doc")):
     """
     1) Save files to DATA_DIR/uploads
     2) Extract text
     3) Chunk -> sections
-    4) Save notes.json
-    5) Upsert into Chroma
+    4) Drop/merge near-duplicate sections
+    5) Store as a new lecture, snapshot it to notes.json (+ rebuild the type-ahead index and quiz candidates)
+    6) Upsert into Chroma
+    7) After the response: refresh the per-section quiz bank
     """
     settings = get_settings()
     data_dir = Path(settings.DATA_DIR).resolve()
@@ -27,10 +36,14 @@ async def upload(files: List[UploadFile] = File(...), kind: str = Form("doc")):
 
     full_texts = []
     lecture_title = None
+    saved = []
 
     for f in files:
         dest = up_dir / f.filename
-        dest.write_bytes(await f.read())
+        with timed("save_upload"):
+            data = await f.read()
+            dest.write_bytes(data)
+        saved.append({"filename": f.filename, "kind": kind, "bytes": len(data)})
         title, txt = extract_text(dest)
         lecture_title = lecture_title or title
         if txt:
@@ -40,16 +53,49 @@ async def upload(files: List[UploadFile] = File(...), kind: str = Form("doc")):
     if not combined:
         return {"ok": False, "msg": "No text extracted."}
 
-    sections = simple_chunk(combined)
+    chunks = simple_chunk(combined)
+    with timed("dedupe"):
+        sections, to_index, dedupe = dedupe_sections(
+            chunks,
+            threshold=settings.DEDUPE_THRESHOLD,
+            mode=settings.DEDUPE_MODE.lower().strip(),
+        )
 
     doc = {
         "lecture_title": lecture_title or "Notes",
         "generated_at": int(datetime.now().timestamp()),
         "sections": sections
     }
-    write_json(notes_json(), doc)
+    with timed("notes_write"):
+        # section ids become lecture-unique here (in place, so `to_index` follows)
+        doc["lecture_id"] = await run_in_threadpool(
+            get_notes_store().save_lecture, doc["lecture_title"], doc["generated_at"], sections, saved
+        )
+        write_json(notes_json(), doc)
+    with timed("suggest_index"):
+        suggest.rebuild(to_index, doc["lecture_title"])
+    with timed("quiz_prep"):
+        cands = quiz_prep.rebuild(sections)
 
     # index vectors for search/chat
-    index_sections(doc["lecture_title"], sections)
+    t0 = time.perf_counter()
+    if to_index:
+        index_sections(doc["lecture_title"], to_index)
+    embed_s = time.perf_counter() - t0
 
-    return {"ok": True, "lecture_title": doc["lecture_title"], "n_sections": len(sections)}
+    # embedding cost is ~linear in text length, so extrapolate from what we did embed
+    indexed_chars = max(1, dedupe["chars_in"] - dedupe["chars_skipped"])
+    dedupe["embed_seconds"] = round(embed_s, 3)
+    dedupe["embed_seconds_saved"] = round(embed_s * dedupe["chars_skipped"] / indexed_chars, 3)
+
+    background.add_task(refresh_bank)
+
+    return {
+        "ok": True,
+        "lecture_id": doc["lecture_id"],
+        "lecture_title": doc["lecture_title"],
+        "corpus_id": cands["corpus_id"],
+        "n_sections": len(sections),
+        "n_indexed": len(to_index),
+        "dedupe": dedupe,
+    }
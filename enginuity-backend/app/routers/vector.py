@@ -1,48 +1,41 @@
-# app/services/vector.py
-from typing import List, Dict, Tuple
+# app/routers/vector.py
+import os
+import shutil
+import tempfile
 from pathlib import Path
-from app.core.config import get_settings
-import chromadb
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from app.services.io import data_dir
+from app.services.snapshot import SnapshotError, export_snapshot, import_snapshot
 
-# use a local model (no API key required)
-_embedder = SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
+router = APIRouter()
 
-def _client():
-    settings = get_settings()
-    persist = Path(settings.VECTORDB_DIR).resolve()
-    persist.mkdir(parents=True, exist_ok=True)
-    return chromadb.PersistentClient(path=str(persist))
+def _snapshot_dir():
+    d = data_dir() / "snapshots"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
 
-def collection(name: str = "enginuity") -> chromadb.api.models.Collection.Collection:
-    cli = _client()
-    try:
-        return cli.get_collection(name=name, embedding_function=_embedder)
-    except Exception:
-        return cli.create_collection(name=name, embedding_function=_embedder)
-
-def index_sections(lecture_title: str, sections: List[Dict]) -> None:
-    col = collection()
-    ids = [s["id"] for s in sections]
-    docs = [s["content"] for s in sections]
-    metas = [{"title": lecture_title, "section_id": s["id"]} for s in sections]
-    col.upsert(ids=ids, documents=docs, metadatas=metas)
+@router.get("/snapshot")
+def download_snapshot():
+    """Export the vector collection as a single checksummed snapshot file."""
+    path = _snapshot_dir() / "vector_index.snap"
+    export_snapshot(path)
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
 
-def search(q: str, top_k: int = 5) -> List[Dict]:
-    col = collection()
-    res = col.query(query_texts=[q], n_results=top_k)
-    out: List[Dict] = []
-    if not res or not res.get("documents"):
-        return out
-    docs = res["documents"][0]
-    metas = res["metadatas"][0]
-    dists = res.get("distances", [[ ]])[0] if res.get("distances") else [None]*len(docs)
-    for doc, meta, dist in zip(docs, metas, dists):
-        out.append({
-            "title": "Match",
-            "snippet": doc[:280] + ("…" if len(doc) > 280 else ""),
-            "score": 1.0 - float(dist) if dist is not None else None,  # convert distance to pseudo-score
-            "section_id": meta.get("section_id"),
-            "source": meta.get("title", "Notes"),
-        })
-    return out
+@router.post("/snapshot")
+def upload_snapshot(file: UploadFile = File(...), replace: bool = False):
+    """
+    Load a snapshot produced by GET /vector/snapshot (or scripts/snapshot.py).
+    Embeddings are inserted as-is, so no model inference happens here.
+    """
+    fd, name = tempfile.mkstemp(dir=_snapshot_dir(), prefix="incoming-", suffix=".snap")  # one file per request
+    path = Path(name)
+    with os.fdopen(fd, "wb") as fh:
+        shutil.copyfileobj(file.file, fh, length=1 << 20)
+    try:
+        stats = import_snapshot(path, replace=replace)
+    except SnapshotError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        path.unlink(missing_ok=True)
+    return {"ok": True, **stats}
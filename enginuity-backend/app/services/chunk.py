@@ -1,7 +1,9 @@
 # app/services/chunk.py
 from typing import List, Dict
 import re
+from app.services.timing import timed
 
+@timed("chunk")
 def simple_chunk(text: str, max_chars: int = 1200, overlap: int = 150) -> List[Dict]:
     """Greedy chunker with soft boundaries on paragraph breaks."""
     text = re.sub(r'\n{3,}', '\n\n', text.strip())
@@ -11,7 +13,7 @@ def simple_chunk(text: str, max_chars: int = 1200, overlap: int = 150) -> List[D
         j = min(i + max_chars, len(text))
         # try to break on paragraph boundary inside window
         k = text.rfind("\n\n", i, j)
-        if k == -1 or j - k < 200:
+        if k <= i or j - k < 200:
             k = j
         parts.append(text[i:k].strip())
         i = max(k - overlap, k)  # add overlap only if not at end
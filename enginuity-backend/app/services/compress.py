@@ -0,0 +1,97 @@
+# app/services/compress.py
+"""
+Extractive context compression for LLM prompts.
+
+Split the context into sentence/line units, embed the query and every unit in
+one batched call to the index embedder, and keep the highest-scoring units, in
+their original order, until the token budget is used. With no query, units are
+scored against the centroid of the whole context (its most representative
+lines). Contexts that already fit the budget are returned untouched. If the
+embedder can't be loaded, units are ranked by word overlap instead.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.embedder import get_embedder
+from app.services.rag import estimate_tokens
+from app.services.timing import timed
+
+MAX_UNITS = 1500        # bound the encode; beyond this, units are prefiltered lexically
+MIN_UNIT_CHARS = 12
+EMBED_RETRY_S = 300     # after an embedder failure, use word overlap for this long
+
+_UNIT_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9$\\(])|\n+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9_\-]{2,}")
+
+log = logging.getLogger("enginuity.compress")
+
+_embed_broken_until = 0.0
+
+EmbedFn = Callable[[Sequence[str]], Sequence[Sequence[float]]]
+
+
+def split_units(text: str) -> List[str]:
+    return [u.strip() for u in _UNIT_SPLIT.split(text or "") if len(u.strip()) >= MIN_UNIT_CHARS]
+
+
+def _prefilter(units: List[str], query: str, limit: int) -> List[str]:
+    """Keep `limit` units (original order), preferring those sharing words with the query."""
+    q_terms = {w.lower() for w in _WORD.findall(query)}
+    overlap = [len(q_terms & {w.lower() for w in _WORD.findall(u)}) for u in units]
+    keep = sorted(sorted(range(len(units)), key=lambda i: -overlap[i])[:limit])
+    return [units[i] for i in keep]
+
+
+def _embedding_scores(units: List[str], query: str, embed: EmbedFn) -> np.ndarray:
+    vecs = np.asarray(embed(([query] if query else []) + units), dtype=np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-12
+    if query:
+        return vecs[1:] @ vecs[0]
+    return vecs @ vecs.mean(axis=0)
+
+
+def _lexical_scores(units: List[str], query: str) -> np.ndarray:
+    unit_terms = [{w.lower() for w in _WORD.findall(u)} for u in units]
+    q_terms = {w.lower() for w in _WORD.findall(query)}
+    if not q_terms:  # no query: favour units made of the context's common terms
+        df = Counter(t for terms in unit_terms for t in terms)
+        return np.array([sum(df[t] for t in terms) / (1 + len(terms)) for terms in unit_terms], dtype=np.float32)
+    return np.array([len(q_terms & terms) for terms in unit_terms], dtype=np.float32)
+
+
+def compress(text: str, query: str = "", budget_tokens: int = 1500, embed: Optional[EmbedFn] = None) -> str:
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    units = split_units(text)
+    if not units:
+        return text[: budget_tokens * 4]
+    if len(units) > MAX_UNITS:
+        units = _prefilter(units, query, MAX_UNITS)
+
+    global _embed_broken_until
+    query = (query or "").strip()
+    with timed("compress"):
+        scores = None
+        if embed is not None or time.monotonic() >= _embed_broken_until:
+            try:
+                scores = _embedding_scores(units, query, embed or get_embedder())
+            except Exception as e:
+                _embed_broken_until = time.monotonic() + EMBED_RETRY_S
+                log.warning("embedder unavailable for compression (%s); using word overlap", e)
+        if scores is None:
+            scores = _lexical_scores(units, query)
+
+        keep: List[int] = []
+        used = 0
+        for i in np.argsort(-scores, kind="stable"):
+            cost = estimate_tokens(units[i])
+            if used + cost > budget_tokens:
+                continue
+            keep.append(int(i))
+            used += cost
+    return "\n".join(units[i] for i in sorted(keep))
@@ -0,0 +1,112 @@
+# app/services/dedupe.py
+"""
+Near-duplicate section detection with MinHash + LSH banding.
+
+Each section gets a 64-value MinHash signature over word 3-shingles (digits
+folded so "Page 3" and "Page 4" headers collide). Signatures are bucketed in
+16 bands of 4 rows; only sections sharing a bucket are compared, so the pass is
+roughly linear in the number of sections. A later section whose estimated
+Jaccard similarity to an earlier kept one reaches the threshold is a duplicate.
+"""
+import re
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+_PRIME = np.uint64(4294967291)  # largest prime < 2**32; keeps a*x+b inside uint64
+
+_rng = np.random.default_rng(1337)
+_A = _rng.integers(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+
+
+def _shingles(text: str) -> List[str]:
+    words = _WORD.findall(_DIGITS.sub("0", (text or "").lower()))
+    if len(words) <= SHINGLE:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)]
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (uint64[NUM_PERM]); all-max for empty text."""
+    sh = _shingles(text)
+    if not sh:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(sh)), dtype=np.uint64)
+    return ((_A[:, None] * x[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def find_duplicates(texts: List[str], threshold: float = 0.85) -> Dict[int, int]:
+    """Map index of each near-duplicate -> index of the earlier text it duplicates."""
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    sigs: List[np.ndarray] = []
+    dup_of: Dict[int, int] = {}
+    for i, text in enumerate(texts):
+        sig = minhash(text)
+        sigs.append(sig)
+        keys = [(b, sig[b * ROWS : (b + 1) * ROWS].tobytes()) for b in range(BANDS)]
+        match = None
+        seen = set()
+        for key in keys:
+            for j in buckets.get(key, ()):
+                if j in seen:
+                    continue
+                seen.add(j)
+                if similarity(sig, sigs[j]) >= threshold:
+                    match = j
+                    break
+            if match is not None:
+                break
+        if match is not None:
+            dup_of[i] = match
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(i)
+    return dup_of
+
+
+def dedupe_sections(sections: List[Dict], threshold: float = 0.85, mode: str = "drop") -> Tuple[List[Dict], List[Dict], Dict]:
+    """
+    Returns (note_sections, index_sections, stats).
+    mode="drop":  duplicates are removed from both the notes and the index.
+    mode="merge": duplicates stay in the notes with `dup_of` set to the kept section id,
+                  and only the kept section is embedded.
+    mode="off":   passthrough.
+    """
+    total_chars = sum(len(s.get("content", "")) for s in sections)
+    if mode == "off" or len(sections) < 2:
+        return sections, sections, {"sections_in": len(sections), "duplicates": 0,
+                                    "chars_in": total_chars, "chars_skipped": 0}
+
+    dup_of = find_duplicates([s.get("content", "") for s in sections], threshold)
+    notes: List[Dict] = []
+    to_index: List[Dict] = []
+    skipped_chars = 0
+    for i, s in enumerate(sections):
+        if i in dup_of:
+            skipped_chars += len(s.get("content", ""))
+            if mode == "merge":
+                notes.append({**s, "dup_of": sections[dup_of[i]]["id"]})
+            continue
+        notes.append(s)
+        to_index.append(s)
+    stats = {
+        "sections_in": len(sections),
+        "duplicates": len(dup_of),
+        "chars_in": total_chars,
+        "chars_skipped": skipped_chars,
+    }
+    return notes, to_index, stats
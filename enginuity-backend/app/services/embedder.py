@@ -0,0 +1,155 @@
+# app/services/embedder.py
+"""
+Local embedding backends for the vector index.
+
+- "torch": sentence-transformers on PyTorch (original path).
+- "onnx":  the same MiniLM exported to ONNX (optionally int8 dynamic-quantized)
+           and run under ONNX Runtime with a fixed intra-op thread count.
+
+Both return L2-normalized mean-pooled vectors, so an index built with one can be
+queried with the other (see scripts/bench_embedder.py for the parity check).
+"""
+import inspect
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from app.core.config import get_settings
+
+log = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx")
+MAX_SEQ_LEN = 256     # all-MiniLM-L6-v2 max_seq_length
+BATCH_SIZE = 32
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def export_onnx(model_name: str, out_dir: Path, quantize: bool = True) -> Path:
+    """
+    Export the transformer of a sentence-transformers model to ONNX (+ tokenizer.json).
+    With `quantize`, also writes an int8 dynamic-quantized copy. Returns the model path to load.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    hf_model = transformer.auto_model.eval()
+    tok = transformer.tokenizer
+    tok.save_pretrained(str(out_dir))
+
+    sample = tok(["export sample"], return_tensors="pt", padding=True)
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    inputs = tuple(sample[n] for n in names if n in sample)
+    names = [n for n in names if n in sample]
+    dyn = {n: {0: "batch", 1: "seq"} for n in names}
+    dyn["last_hidden_state"] = {0: "batch", 1: "seq"}
+    fp32_path = out_dir / ONNX_FILE
+    # newer torch defaults to the dynamo exporter; the TorchScript one handles BERT dynamic axes fine
+    extra = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            hf_model,
+            inputs,
+            str(fp32_path),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dyn,
+            opset_version=14,
+            **extra,
+        )
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = out_dir / ONNX_INT8_FILE
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function backed by an exported MiniLM under ONNX Runtime."""
+
+    def __init__(self, model_dir: Path, quantized: bool = True, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_path = model_dir / (ONNX_INT8_FILE if quantized else ONNX_FILE)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.inter_op_num_threads = 1
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(str(model_path), opts, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=MAX_SEQ_LEN)
+        self._tokenizer.enable_padding()
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        enc = self._tokenizer.encode_batch(texts)
+        ids = np.asarray([e.ids for e in enc], dtype=np.int64)
+        mask = np.asarray([e.attention_mask for e in enc], dtype=np.int64)
+        feed = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.zeros_like(ids)
+        hidden = self._session.run(None, feed)[0]
+        m = mask[..., None].astype(np.float32)
+        pooled = (hidden * m).sum(axis=1) / np.maximum(m.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        # length-sorted batches keep padding (and wasted FLOPs) down; order is restored below
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: List[np.ndarray] = [np.empty(0)] * len(texts)
+        for start in range(0, len(order), BATCH_SIZE):
+            idx = order[start : start + BATCH_SIZE]
+            vecs = self._encode_batch([texts[i] for i in idx])
+            for i, v in zip(idx, vecs):
+                out[i] = v.astype(np.float32)
+        return out
+
+
+def build_embedder(backend: str) -> EmbeddingFunction:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDER_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+    settings = get_settings()
+    if backend == "onnx":
+        model_dir = Path(settings.EMBEDDER_ONNX_DIR).resolve()
+        quantized = bool(settings.EMBEDDER_ONNX_QUANTIZE)
+        if not (model_dir / (ONNX_INT8_FILE if quantized else ONNX_FILE)).exists():
+            log.info("Exporting %s to ONNX in %s", settings.EMBEDDER_LOCAL_MODEL, model_dir)
+            export_onnx(settings.EMBEDDER_LOCAL_MODEL, model_dir, quantize=quantized)
+        return OnnxEmbeddingFunction(model_dir, quantized=quantized, threads=int(settings.EMBEDDER_ONNX_THREADS))
+
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction  # type: ignore
+    return SentenceTransformerEmbeddingFunction(model_name=settings.EMBEDDER_LOCAL_MODEL)
+
+
+def embedder_id() -> Dict:
+    """What produces the vectors; stored in snapshots so they only load where queries embed alike."""
+    s = get_settings()
+    backend = s.EMBEDDER_BACKEND.lower().strip()
+    out = {"backend": backend, "model": s.EMBEDDER_LOCAL_MODEL}
+    if backend == "onnx":
+        out["quantized"] = bool(s.EMBEDDER_ONNX_QUANTIZE)
+    return out
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> EmbeddingFunction:
+    """Process-wide embedder for the configured EMBEDDER_BACKEND (loaded on first use)."""
+    return build_embedder(get_settings().EMBEDDER_BACKEND.lower().strip())
@@ -3,7 +3,9 @@ from pathlib import Path
 from typing import Tuple
 import fitz  
 from pptx import Presentation
+from app.services.timing import timed
 
+@timed("extract_pdf")
 def from_pdf(path: Path) -> str:
     doc = fitz.open(str(path))
     texts = []
@@ -11,6 +13,7 @@ def from_pdf(path: Path) -> str:
         texts.append(page.get_text()) # type: ignore
     return "\n".join(texts).strip()
 
+@timed("extract_pptx")
 def from_pptx(path: Path) -> str:
     prs = Presentation(str(path))
     texts = []
@@ -33,4 +36,5 @@ def extract_text(path: Path) -> Tuple[str, str]:
         return name, from_pptx(p)
     else:
         # audio pipeline can put its transcript.txt here later
-        return name, p.read_text(encoding="utf-8", errors="ignore")
+        with timed("extract_text"):
+            return name, p.read_text(encoding="utf-8", errors="ignore")
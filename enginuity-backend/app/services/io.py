@@ -1,7 +1,15 @@
-import json, os
+import gzip, json, logging, os, tempfile, threading, time
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 from app.core.config import get_settings
 
+try:  # optional: several times faster than the stdlib on large documents
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson isn't installed
+    orjson = None
+
+log = logging.getLogger("enginuity.io")
+
 def data_dir() -> Path:
     return Path(get_settings().DATA_DIR).resolve()
 
@@ -11,14 +19,154 @@ def notes_json() -> Path:
 def uploads_json() -> Path:
     return data_dir() / "uploads.json"
 
+def quiz_candidates_json() -> Path:
+    return data_dir() / "quiz_candidates.json"
+
+# ----------------------------
+# JSON persistence
+# ----------------------------
+# Compact encoding (orjson when installed), written to a temp file in the same
+# directory and renamed over the target, so readers see the old or the new file,
+# never a truncated one. Documents of at least JSON_SIDECAR_MIN_KB also get a
+# gzip sidecar (<name>.gz): a smaller backup copy that read_json only falls back
+# to when the JSON itself is missing or unreadable.
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # e.g. non-str keys or big ints; the stdlib copes
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + ".gz")
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
 def read_json(path: Path, default):
     try:
-        if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
+        return loads(path.read_bytes())
+    except FileNotFoundError:
         pass
-    return default
+    except Exception as e:
+        log.error("could not parse %s (%s)", path, e)
+    # the JSON is missing or corrupt: fall back to the compressed copy, if there is one
+    side = sidecar_path(path)
+    try:
+        doc = loads(gzip.decompress(side.read_bytes()))
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        log.error("could not parse %s (%s); using the default", side, e)
+        return default
+    log.warning("recovered %s from %s", path.name, side.name)
+    return doc
 
 def write_json(path: Path, obj) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, indent=2), encoding="utf-8")
+    data = dumps(obj)
+    side = sidecar_path(path)
+    min_kb = get_settings().JSON_SIDECAR_MIN_KB
+    atomic_write_bytes(path, data)
+    if min_kb and len(data) >= min_kb * 1024:
+        atomic_write_bytes(side, gzip.compress(data, compresslevel=1, mtime=0))
+    elif side.exists():
+        side.unlink()  # would be stale
+
+
+# ----------------------------
+# Notes repository (shared, in memory)
+# ----------------------------
+OUTLINE_FIELDS = ("id", "title", "type", "language", "dup_of")
+
+
+def section_outline(sec: Dict) -> Dict:
+    """A section without its body: what a table of contents needs (plus the body length)."""
+    out = {k: sec[k] for k in OUTLINE_FIELDS if sec.get(k) is not None}
+    out["n_chars"] = len(sec.get("content") or "")
+    return out
+
+
+class NotesSnapshot:
+    """Immutable view of the stored notes: the active lecture's document plus derived indexes."""
+
+    def __init__(self, version: int, writes: int, doc: Optional[Dict], lectures: List[Dict]):
+        self.version = version          # notes store version this was loaded at
+        self.writes = writes            # in-process store write count at load
+        self.checked_at = time.monotonic()
+        self.doc = doc                  # active lecture, notes.json-shaped (None before the first upload)
+        self.lectures = lectures        # newest first, no content
+        doc_ = doc or {}
+        sections = doc_.get("sections") or []
+        self.by_id: Dict[str, Dict] = {sec["id"]: sec for sec in sections if sec.get("id")}
+        self.outline: List[Dict] = [section_outline(sec) for sec in sections]
+        self.status = {
+            "ready": bool(sections),
+            "lecture_id": doc_.get("lecture_id"),
+            "lecture_title": doc_.get("lecture_title"),
+            "generated_at": doc_.get("generated_at"),
+            "sections": len(sections),
+            "lectures": len(lectures),
+        }
+
+
+class NotesRepository:
+    """
+    One parsed copy of the notes shared by every reader (/notes, /corpus/status,
+    /quiz, /export, sidecar indexes). A write through this process's notes store
+    invalidates it immediately; writes by other processes are noticed by
+    re-reading the store's version counter at most every NOTES_RECHECK_S. Between
+    those, reads do no I/O at all.
+    """
+
+    def __init__(self):
+        self._snap: Optional[NotesSnapshot] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def snapshot(self) -> NotesSnapshot:
+        from app.services.notes_store import get_notes_store  # notes_store imports this module
+
+        store = get_notes_store()
+        snap = self._snap
+        if snap is not None and snap.writes == store.writes:
+            if time.monotonic() - snap.checked_at < get_settings().NOTES_RECHECK_S:
+                return snap
+            if store.version() == snap.version:
+                snap.checked_at = time.monotonic()
+                return snap
+        with self._lock:
+            if self._snap is snap:  # nobody reloaded while we waited
+                writes = store.writes
+                version = store.version()
+                self._snap = NotesSnapshot(version, writes, store.doc(), store.lectures())
+                self.loads += 1
+            return self._snap  # type: ignore[return-value]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snap = None
+
+
+_notes_repo = NotesRepository()
+
+
+def get_notes_repo() -> NotesRepository:
+    return _notes_repo
@@ -0,0 +1,288 @@
+# app/services/llm.py
+"""
+Shared async LLM client used by /chat and /quiz.
+
+One pooled httpx.AsyncClient per event loop talks to the OpenAI-compatible
+`/chat/completions` endpoint. Every call has an overall deadline (LLM_TIMEOUT_S,
+retries included), retries 429/5xx/transport errors with full-jitter backoff
+(honouring Retry-After), and waits on a global semaphore so at most
+LLM_MAX_CONCURRENCY completions are in flight.
+
+With LLM_FAKE=1 requests go to an in-process httpx.MockTransport that returns
+deterministic OpenAI-shaped replies, so the whole path runs offline.
+
+The module-level `complete`/`stream` go through the persistent response cache
+(services/llm_cache.py); pass `no_cache=True` to force a fresh generation.
+"""
+import asyncio
+import json
+import random
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.core.config import get_settings
+from app.services import singleflight
+from app.services.llm_cache import cache_key, get_cache
+from app.services.timing import timed
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+BACKOFF_BASE_S = 0.5
+BACKOFF_CAP_S = 8.0
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    try:
+        return max(0.0, float(resp.headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key: str = "",
+        base_url: str = "https://api.openai.com/v1",
+        model: str = "gpt-4o-mini",
+        timeout_s: float = 60.0,
+        connect_timeout_s: float = 5.0,
+        max_retries: int = 3,
+        concurrency: int = 8,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.model = model
+        self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.max_retries = max_retries
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            limits=httpx.Limits(max_connections=max(1, concurrency), max_keepalive_connections=max(1, concurrency)),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    @asynccontextmanager
+    async def _slot(self):
+        async with self._sem:
+            yield
+
+    def _payload(self, messages: List[Dict], temperature: float, model: Optional[str], **extra) -> Dict:
+        payload = {"model": model or self.model, "temperature": temperature, "messages": messages}
+        payload.update({k: v for k, v in extra.items() if v is not None})
+        return payload
+
+    async def _send(self, payload: Dict, deadline: float, stream: bool = False) -> httpx.Response:
+        """POST with retries until `deadline` (loop time). Returns a 2xx response (open, if streaming)."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise LLMTimeout(f"LLM call exceeded its {self.timeout_s:.0f}s deadline.")
+            retry_after = None
+            try:
+                req = self._http.build_request(
+                    "POST", "/chat/completions", json=payload,
+                    timeout=httpx.Timeout(remaining, connect=min(self.connect_timeout_s, remaining)),
+                )
+                resp = await self._http.send(req, stream=stream)
+            except httpx.TransportError as e:  # includes timeouts
+                err: Exception = e
+            else:
+                if resp.status_code < 400:
+                    return resp
+                body = (await resp.aread())[:300].decode("utf-8", "replace")
+                await resp.aclose()
+                err = LLMError(f"LLM HTTP {resp.status_code}: {body}")
+                if resp.status_code not in RETRY_STATUS:
+                    raise err
+                retry_after = _retry_after(resp)
+
+            if attempt >= self.max_retries:
+                raise LLMError(f"LLM call failed after {attempt + 1} attempts: {err}") from err
+            delay = retry_after if retry_after is not None else random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+            if loop.time() + delay >= deadline:
+                raise LLMTimeout(f"LLM call would exceed its deadline while backing off: {err}") from err
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.2,
+        model: Optional[str] = None,
+        response_format: Optional[Dict] = None,
+        timeout_s: Optional[float] = None,
+    ) -> str:
+        """Single chat completion. Raises LLMError/LLMTimeout."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout_s or self.timeout_s)
+        payload = self._payload(messages, temperature, model, response_format=response_format)
+        async with self._slot():
+            resp = await self._send(payload, deadline)
+        try:
+            data = resp.json()
+            return (data["choices"][0]["message"].get("content") or "").strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Malformed LLM response: {e}") from e
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.2,
+        model: Optional[str] = None,
+        timeout_s: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Streaming chat completion; yields content deltas. Retries happen only before the first byte."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout_s or self.timeout_s)
+        payload = self._payload(messages, temperature, model, stream=True)
+        async with self._slot():
+            resp = await self._send(payload, deadline, stream=True)
+            try:
+                async for line in resp.aiter_lines():
+                    if loop.time() > deadline:
+                        raise LLMTimeout(f"LLM stream exceeded its {self.timeout_s:.0f}s deadline.")
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+            finally:
+                await resp.aclose()
+
+
+# ----------------------------
+# Offline stub (LLM_FAKE)
+# ----------------------------
+def _fake_reply(body: Dict) -> str:
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({"items": []})
+    last = next((m for m in reversed(body.get("messages") or []) if m.get("role") == "user"), {})
+    line = str(last.get("content") or "").strip().splitlines()[-1:] or [""]
+    return f"[stub:{body.get('model')}] {line[0][:200]}"
+
+
+def fake_handler(request: httpx.Request) -> httpx.Response:
+    """Deterministic OpenAI-shaped responses for /chat/completions (plain and streamed)."""
+    body = json.loads(request.content or b"{}")
+    text = _fake_reply(body)
+    if not body.get("stream"):
+        return httpx.Response(200, json={"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]})
+    words = [w + " " for w in text.split(" ")]
+    words[-1] = words[-1].rstrip()
+    chunks = [f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': w}}]})}\n\n" for w in words]
+    return httpx.Response(200, text="".join(chunks) + "data: [DONE]\n\n", headers={"content-type": "text/event-stream"})
+
+
+# ----------------------------
+# Shared instance (one per event loop; pools can't cross loops)
+# ----------------------------
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMClient]" = weakref.WeakKeyDictionary()
+
+
+def build_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> LLMClient:
+    s = get_settings()
+    if transport is None and s.LLM_FAKE:
+        transport = httpx.MockTransport(fake_handler)
+    return LLMClient(
+        api_key=s.OPENAI_API_KEY or "",
+        base_url=s.OPENAI_BASE_URL,
+        model=s.OPENAI_MODEL,
+        timeout_s=s.LLM_TIMEOUT_S,
+        connect_timeout_s=s.LLM_CONNECT_TIMEOUT_S,
+        max_retries=s.LLM_MAX_RETRIES,
+        concurrency=s.LLM_MAX_CONCURRENCY,
+        transport=transport,
+    )
+
+
+def get_llm() -> LLMClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = build_client()
+    return client
+
+
+async def aclose() -> None:
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def llm_enabled() -> bool:
+    s = get_settings()
+    return s.openai_enabled or s.LLM_FAKE
+
+
+async def complete(
+    messages: List[Dict],
+    temperature: float = 0.2,
+    model: Optional[str] = None,
+    response_format: Optional[Dict] = None,
+    no_cache: bool = False,
+    **kwargs,
+) -> str:
+    """Cached completion: identical (model, temperature, messages, format) return the stored text.
+    `no_cache` skips the lookup but still refreshes the entry."""
+    client = get_llm()
+    cache = get_cache()
+    key = cache_key(model or client.model, temperature, messages, response_format) if cache else ""
+    if cache and not no_cache:
+        with timed("llm_cache"):
+            hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            return hit
+    flight_key = key or cache_key(model or client.model, temperature, messages, response_format)
+
+    async def call() -> str:
+        text = await client.complete(messages, temperature=temperature, model=model, response_format=response_format, **kwargs)
+        if cache and text:
+            await asyncio.to_thread(cache.put, key, text)
+        return text
+
+    return await singleflight.group("llm").do(f"{flight_key}:{int(no_cache)}", call)
+
+
+async def stream(
+    messages: List[Dict],
+    temperature: float = 0.2,
+    model: Optional[str] = None,
+    no_cache: bool = False,
+    **kwargs,
+) -> AsyncIterator[str]:
+    """Streaming counterpart of `complete`; a cached answer is replayed as a single delta."""
+    client = get_llm()
+    cache = get_cache()
+    key = cache_key(model or client.model, temperature, messages) if cache else ""
+    if cache and not no_cache:
+        with timed("llm_cache"):
+            hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            yield hit
+            return
+    parts: List[str] = []
+    async for delta in client.stream(messages, temperature=temperature, model=model, **kwargs):
+        parts.append(delta)
+        yield delta
+    if cache and parts:
+        await asyncio.to_thread(cache.put, key, "".join(parts))
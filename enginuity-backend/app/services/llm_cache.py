@@ -0,0 +1,108 @@
+# app/services/llm_cache.py
+"""
+Persistent, content-addressed cache of LLM completions.
+
+Key = sha256 over (model, temperature, messages, response_format), so the same
+system prompt + user prompt against the same model returns instantly. Rows
+expire after LLM_CACHE_TTL_S; once the cache grows past LLM_CACHE_MAX_MB the
+least-recently-used rows are dropped. Stored in SQLite (WAL) next to the app.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+
+EVICT_EVERY = 32  # puts between size checks
+
+
+def cache_key(model: str, temperature: float, messages: List[Dict], response_format: Optional[Dict] = None) -> str:
+    blob = json.dumps(
+        [model, round(float(temperature), 3), messages, response_format or None],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache(last_used)")
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db() as db:
+            row = db.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND created_at >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 1:
+                self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        doomed: List[str] = []
+        for key, size in db.execute("SELECT key, size FROM llm_cache ORDER BY last_used"):
+            doomed.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in doomed])
+
+    def stats(self) -> Dict:
+        with self._db() as db:
+            n, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {"entries": n, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """The shared cache, or None when LLM_CACHE_PATH is empty."""
+    global _cache
+    with _cache_lock:
+        s = get_settings()
+        if _cache is None and s.LLM_CACHE_PATH:
+            _cache = ResponseCache(s.LLM_CACHE_PATH, s.LLM_CACHE_TTL_S, s.LLM_CACHE_MAX_MB * 1024 * 1024)
+        return _cache
@@ -0,0 +1,293 @@
+# app/services/notes_store.py
+"""
+Relational notes store: one row per lecture, section and uploaded file.
+
+Each upload becomes a new lecture instead of overwriting the previous one; the
+most recent lecture is the "active" one that /notes, /quiz and /export serve
+by default. Section ids are made unique across lectures ("L3-sec-1"), since
+the vector index and quiz bank key on them. Section reads are single-row
+statements and never load other lectures. Lectures are only ever added: there
+is no edit or delete path, since the vector index, suggest index and quiz bank
+would have to follow along.
+
+SQLite (WAL) in DATA_DIR by default; any SQLAlchemy URL via NOTES_DB_URL
+(e.g. the POSTGRES_URL value) works unchanged. A `version` counter in
+notes_meta is bumped by every write, and `writes` counts this process's writes,
+so the shared repository in io.py can cache by them. notes.json
+is still written as a snapshot of the active lecture (sidecar indexes and the
+UI's local fallback read it) and is imported once into an empty store.
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    event,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import get_settings
+from app.services.io import notes_json, read_json
+
+SECTION_FIELDS = ("id", "title", "type", "language", "content", "dup_of")
+
+metadata = MetaData()
+
+lectures = Table(
+    "lectures", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("title", String(512), nullable=False),
+    Column("generated_at", BigInteger),
+    Column("n_sections", Integer, nullable=False, default=0),
+    Column("created_at", BigInteger, nullable=False),
+    Column("updated_at", BigInteger, nullable=False),
+)
+Index("ix_lectures_created_at", lectures.c.created_at)
+
+sections = Table(
+    "sections", metadata,
+    Column("id", String(128), primary_key=True),
+    Column("lecture_id", Integer, ForeignKey("lectures.id", ondelete="CASCADE"), nullable=False),
+    Column("ord", Integer, nullable=False),
+    Column("title", String(512), nullable=False, default=""),
+    Column("type", String(32), nullable=False, default="text"),
+    Column("language", String(64)),
+    Column("content", Text, nullable=False, default=""),
+    Column("n_chars", Integer, nullable=False, default=0),
+    Column("dup_of", String(128)),
+    Column("extra", Text),  # any other section keys, as JSON
+)
+Index("ix_sections_lecture_ord", sections.c.lecture_id, sections.c.ord, unique=True)
+
+uploads = Table(
+    "uploads", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("lecture_id", Integer, ForeignKey("lectures.id", ondelete="CASCADE"), nullable=False),
+    Column("filename", String(512), nullable=False),
+    Column("kind", String(32), nullable=False, default="doc"),
+    Column("bytes", BigInteger, nullable=False, default=0),
+    Column("created_at", BigInteger, nullable=False),
+)
+Index("ix_uploads_lecture", uploads.c.lecture_id)
+
+notes_meta = Table(
+    "notes_meta", metadata,
+    Column("key", String(64), primary_key=True),
+    Column("value", BigInteger, nullable=False),
+)
+
+
+def scoped_id(lecture_id: int, section_id: str) -> str:
+    return f"L{lecture_id}-{section_id}"
+
+
+def _section_row(lecture_id: int, ord_: int, s: Dict) -> Dict:
+    extra = {k: v for k, v in s.items() if k not in SECTION_FIELDS}
+    content = s.get("content") or ""
+    return {
+        "id": s["id"],
+        "lecture_id": lecture_id,
+        "ord": ord_,
+        "title": s.get("title") or "",
+        "type": s.get("type") or "text",
+        "language": s.get("language"),
+        "content": content,
+        "n_chars": len(content),
+        "dup_of": s.get("dup_of"),
+        "extra": json.dumps(extra, ensure_ascii=False) if extra else None,
+    }
+
+
+def _section_dict(row) -> Dict:
+    s = {"id": row.id, "title": row.title, "type": row.type, "content": row.content}
+    if row.language:
+        s["language"] = row.language
+    if row.dup_of:
+        s["dup_of"] = row.dup_of
+    if row.extra:
+        s.update(json.loads(row.extra))
+    return s
+
+
+def _lecture_dict(row) -> Dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "generated_at": row.generated_at,
+        "n_sections": row.n_sections,
+        "created_at": row.created_at,
+    }
+
+
+class NotesStore:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine: Engine = create_engine(url, future=True, pool_pre_ping=not url.startswith("sqlite"))
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _sqlite_pragmas)
+        metadata.create_all(self.engine)
+        self.writes = 0  # committed writes through this instance
+        self._writes_lock = threading.Lock()
+
+    def _committed(self) -> None:
+        with self._writes_lock:
+            self.writes += 1
+
+    # ---- writes ----
+    def _bump(self, conn: Connection) -> None:
+        if conn.execute(update(notes_meta).where(notes_meta.c.key == "version").values(value=notes_meta.c.value + 1)).rowcount == 0:
+            conn.execute(notes_meta.insert().values(key="version", value=1))
+
+    def save_lecture(
+        self,
+        title: str,
+        generated_at: Optional[int],
+        section_list: List[Dict],
+        files: Iterable[Dict] = (),
+        scope_ids: bool = True,
+    ) -> int:
+        """
+        Insert a lecture with its sections and upload records; returns the lecture id.
+        With `scope_ids`, section ids (and dup_of references) are rewritten in place to
+        their lecture-unique form, so other references to the same dicts follow along.
+        """
+        now = int(time.time())
+        with self.engine.begin() as conn:
+            lecture_id = conn.execute(
+                lectures.insert().values(
+                    title=title, generated_at=generated_at, n_sections=len(section_list), created_at=now, updated_at=now
+                )
+            ).inserted_primary_key[0]
+            if scope_ids:
+                for s in section_list:
+                    s["id"] = scoped_id(lecture_id, s["id"])
+                    if s.get("dup_of"):
+                        s["dup_of"] = scoped_id(lecture_id, s["dup_of"])
+            if section_list:
+                conn.execute(sections.insert(), [_section_row(lecture_id, i, s) for i, s in enumerate(section_list)])
+            file_rows = [
+                {"lecture_id": lecture_id, "filename": f["filename"], "kind": f.get("kind", "doc"),
+                 "bytes": int(f.get("bytes", 0)), "created_at": now}
+                for f in files
+            ]
+            if file_rows:
+                conn.execute(uploads.insert(), file_rows)
+            self._bump(conn)
+        self._committed()
+        return lecture_id
+
+    # ---- reads ----
+    def version(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(notes_meta.c.value).where(notes_meta.c.key == "version")).scalar() or 0
+
+    def lectures(self) -> List[Dict]:
+        """All lectures, newest first (no section content)."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(lectures).order_by(lectures.c.created_at.desc(), lectures.c.id.desc()))
+            return [_lecture_dict(r) for r in rows]
+
+    def lecture(self, lecture_id: Optional[int] = None) -> Optional[Dict]:
+        """One lecture's summary; the active (newest) one when no id is given."""
+        q = select(lectures)
+        if lecture_id is None:
+            q = q.order_by(lectures.c.created_at.desc(), lectures.c.id.desc()).limit(1)
+        else:
+            q = q.where(lectures.c.id == lecture_id)
+        with self.engine.connect() as conn:
+            row = conn.execute(q).first()
+        return _lecture_dict(row) if row else None
+
+    def sections(self, lecture_id: int) -> List[Dict]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(sections).where(sections.c.lecture_id == lecture_id).order_by(sections.c.ord))
+            return [_section_dict(r) for r in rows]
+
+    def outline(self, lecture_id: int, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """One page of a lecture's sections without their content (see io.section_outline)."""
+        cols = [sections.c.id, sections.c.title, sections.c.type, sections.c.language, sections.c.dup_of, sections.c.n_chars]
+        q = select(*cols).where(sections.c.lecture_id == lecture_id).order_by(sections.c.ord).offset(offset)
+        if limit is not None:
+            q = q.limit(limit)
+        with self.engine.connect() as conn:
+            return [{k: v for k, v in r._mapping.items() if v is not None} for r in conn.execute(q)]
+
+    def section(self, section_id: str) -> Optional[Dict]:
+        with self.engine.connect() as conn:
+            row = conn.execute(select(sections).where(sections.c.id == section_id)).first()
+        return _section_dict(row) if row else None
+
+    def section_ids(self) -> List[str]:
+        """Ids of every stored section, across all lectures."""
+        with self.engine.connect() as conn:
+            return list(conn.execute(select(sections.c.id)).scalars())
+
+    def uploads(self, lecture_id: int) -> List[Dict]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(uploads).where(uploads.c.lecture_id == lecture_id).order_by(uploads.c.id))
+            return [{"filename": r.filename, "kind": r.kind, "bytes": r.bytes, "created_at": r.created_at} for r in rows]
+
+    def doc(self, lecture_id: Optional[int] = None) -> Optional[Dict]:
+        """notes.json-shaped document for a lecture (the active one by default)."""
+        lec = self.lecture(lecture_id)
+        if lec is None:
+            return None
+        return {
+            "lecture_id": lec["id"],
+            "lecture_title": lec["title"],
+            "generated_at": lec["generated_at"],
+            "sections": self.sections(lec["id"]),
+        }
+
+
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA foreign_keys=ON")
+    cur.close()
+
+
+def default_url() -> str:
+    s = get_settings()
+    if s.NOTES_DB_URL:
+        return s.NOTES_DB_URL
+    path = Path(s.DATA_DIR).resolve() / "notes.sqlite3"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return f"sqlite:///{path}"
+
+
+_store: Optional[NotesStore] = None
+_store_lock = threading.Lock()
+
+
+def get_notes_store() -> NotesStore:
+    """Shared store; on first use an existing notes.json is imported if the store is empty."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NotesStore(default_url())
+            _import_legacy(_store)
+        return _store
+
+
+def _import_legacy(store: NotesStore) -> None:
+    if store.lecture() is not None or not notes_json().exists():
+        return
+    doc = read_json(notes_json(), {})
+    if doc.get("sections"):
+        # keep the old ids: they are already in the vector index and sidecars
+        store.save_lecture(doc.get("lecture_title") or "Notes", doc.get("generated_at"), doc["sections"], scope_ids=False)
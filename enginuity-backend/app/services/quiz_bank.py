@@ -0,0 +1,158 @@
+# app/services/quiz_bank.py
+"""
+Persistent per-section quiz bank.
+
+After ingest a background task generates a handful of questions for every
+section (LLM when configured, rule-based otherwise) and stores them here,
+keyed by section id and difficulty together with the section's content hash
+(quiz_prep). /quiz then samples the requested sections' questions instead of
+generating inside the request; a row whose hash no longer matches the section
+is stale and is ignored until it is regenerated. Rule-based questions don't
+depend on difficulty, so they are stored once under "auto" and match any
+difficulty. Stored in SQLite (WAL) in DATA_DIR, next to the notes store.
+"""
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.io import data_dir
+
+MIX_MCQ_SHARE = 0.6  # same split as the generators' "mix"
+
+Row = Tuple[str, str, str, str, List[Dict]]  # (section_id, content_hash, difficulty, source, items)
+
+
+class QuizBank:
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS quiz_bank ("
+                "section_id TEXT NOT NULL, difficulty TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "source TEXT NOT NULL, items TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (section_id, difficulty))"
+            )
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def get(self, hashes: Dict[str, str], difficulty: str = "auto") -> Dict[str, List[Dict]]:
+        """section id -> stored questions, for sections whose stored hash matches `hashes`."""
+        out: Dict[str, List[Dict]] = {}
+        ids = list(hashes)
+        with self._db() as db:
+            for i in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+                chunk = ids[i:i + 500]
+                rows = db.execute(
+                    f"SELECT section_id, difficulty, content_hash, source, items FROM quiz_bank "
+                    f"WHERE section_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for sid, diff, h, source, items in rows:
+                    if h != hashes[sid]:
+                        continue
+                    if difficulty != "auto" and diff != difficulty and source != "rule":
+                        continue
+                    out.setdefault(sid, []).extend(json.loads(items))
+        self.hits += len(out)
+        self.misses += len(ids) - len(out)
+        return out
+
+    def put_many(self, rows: Iterable[Row]) -> None:
+        now = time.time()
+        with self._db() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO quiz_bank (section_id, difficulty, content_hash, source, items, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(sid, diff, h, source, json.dumps(items, ensure_ascii=False), now) for sid, h, diff, source, items in rows],
+            )
+
+    def prune(self, hashes: Dict[str, str], keep: Iterable[str] = ()) -> int:
+        """
+        Drop rows for sections that no longer exist or whose content changed. `hashes` are
+        the current sections; rows for ids in `keep` (other stored lectures) are left alone.
+        """
+        keep = set(keep)
+        with self._db() as db:
+            doomed = [
+                (sid, diff)
+                for sid, diff, h in db.execute("SELECT section_id, difficulty, content_hash FROM quiz_bank")
+                if hashes.get(sid) != h and sid not in keep
+            ]
+            db.executemany("DELETE FROM quiz_bank WHERE section_id = ? AND difficulty = ?", doomed)
+        return len(doomed)
+
+    def stats(self) -> Dict:
+        with self._db() as db:
+            sections, rows = db.execute("SELECT COUNT(DISTINCT section_id), COUNT(*) FROM quiz_bank").fetchone()
+        return {"sections": sections, "rows": rows, "hits": self.hits, "misses": self.misses}
+
+
+def _is_mcq(item: Dict) -> bool:
+    return bool(item.get("choices"))
+
+
+def sample(pools: Dict[str, List[Dict]], n: int, qtype: str, rng: Optional[random.Random] = None) -> List[Dict]:
+    """
+    Up to n questions of the requested type, spread round-robin over the sections
+    (so a quiz over many sections isn't drawn from the first few). "mix" aims for
+    ~60% MCQ and tops up from the other type when one runs short.
+    """
+    rng = rng or random.Random()
+    seen = set()
+    mcq: List[List[Dict]] = []
+    fib: List[List[Dict]] = []
+    for sid in sorted(pools):
+        items = [it for it in pools[sid] if not (it["q"] in seen or seen.add(it["q"]))]
+        rng.shuffle(items)
+        mcq.append([it for it in items if _is_mcq(it)])
+        fib.append([it for it in items if not _is_mcq(it)])
+    rng.shuffle(mcq)
+    rng.shuffle(fib)
+
+    def draw(buckets: List[List[Dict]], k: int) -> List[Dict]:
+        out: List[Dict] = []
+        while len(out) < k and any(buckets):
+            for b in buckets:
+                if b and len(out) < k:
+                    out.append(b.pop())
+        return out
+
+    if qtype == "mcq":
+        return draw(mcq, n)
+    if qtype == "fib":
+        return draw(fib, n)
+    out = draw(mcq, round(n * MIX_MCQ_SHARE))
+    out += draw(fib, n - len(out))
+    out += draw(mcq, n - len(out))
+    rng.shuffle(out)
+    return out
+
+
+_bank: Optional[QuizBank] = None
+_bank_lock = threading.Lock()
+
+
+def default_path() -> str:
+    s = get_settings()
+    if s.QUIZ_BANK_PATH:
+        return s.QUIZ_BANK_PATH
+    d = data_dir()
+    d.mkdir(parents=True, exist_ok=True)
+    return str(d / "quiz_bank.sqlite3")
+
+
+def get_bank() -> Optional[QuizBank]:
+    """The shared bank (in DATA_DIR unless QUIZ_BANK_PATH is set), or None when QUIZ_BANK_ENABLED is off."""
+    global _bank
+    with _bank_lock:
+        if _bank is None and get_settings().QUIZ_BANK_ENABLED:
+            _bank = QuizBank(default_path())
+        return _bank
@@ -0,0 +1,255 @@
+# app/services/quiz_prep.py
+"""
+Quiz text preparation, done once per section at ingest instead of on every /quiz.
+
+For each section we store the cleaned study lines (greetings/contact/low-alpha
+lines removed), the key-line candidates the rule-based generator builds
+questions from, and the distractor vocabulary. The result is written next to
+notes.json as quiz_candidates.json, tagged with the notes store version it was
+built from, and rebuilt lazily from the shared notes repository (io.py) when
+that version moves on. Each entry carries a content hash so the quiz bank (quiz_bank.py)
+can tell when a section's questions are stale, and the sidecar as a whole carries
+a corpus id (a hash of those hashes) that clients echo back so /quiz can reject
+section ids from notes that have since been replaced. Line filtering uses one compiled regex equivalent to CONTACT_PATTERNS
+(CONTACT_RE) rather than a re.search per pattern per line.
+"""
+import hashlib
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.io import get_notes_repo, quiz_candidates_json, read_json, write_json
+
+VERSION = 3
+MAX_KEY_LINES = 300
+MAX_VOCAB = 400
+
+STOPWORDS = set("""
+a an and are as at be by for from has have if in into is it its of on or that the this to was were will with your you we i
+""".split())
+
+CONTACT_PATTERNS = [
+    r"^dear\b.*",                      # greetings
+    r"^hi\b.*",
+    r"^hello\b.*",
+    r"^best\b.*",                      # signatures
+    r"^regards\b.*",
+    r"^sincerely\b.*",
+    r"\bbest regards\b",
+    r"\bthanks\b",
+    r"\bthank you\b",
+    r"\bphone\b",
+    r"\bemail\b",
+    r"\blinked?in\b",
+    r"\bgithub\b",
+    r"\bportfolio\b",
+    r"\bresume\b",
+    r"\bcover letter\b",
+    r"\bhiring\b.*team\b",
+    r"\bcontact\b",
+    r"\baddress\b",
+    r"\+\d{1,3}\s?\d",                 # intl phone
+    r"\(\d{3}\)\s?\d{3}-\d{4}",        # (999) 999-9999
+    r"\d{3}-\d{3}-\d{4}",              # 999-999-9999
+    r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",  # email
+    r"https?://\S+",
+]
+# The same filter as one regex, factored by shared prefix: a plain "|".join of the list above
+# makes `re` try all 24 branches at every position, which is barely faster than 24 searches.
+CONTACT_RE = re.compile(
+    r"^(?:dear|hi|hello|best|regards|sincerely)\b"
+    r"|\b(?:best regards|thanks|thank you|phone|email|linked?in|github|portfolio|resume|cover letter|contact|address)\b"
+    r"|\bhiring\b.*team\b"
+    r"|\+\d{1,3}\s?\d|\(\d{3}\)\s?\d{3}-\d{4}|\d{3}-\d{3}-\d{4}"
+    r"|[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+    r"|https?://\S+"
+)
+
+_TERM = re.compile(r"[A-Za-z][A-Za-z0-9_\-]{3,}")
+_IDENT = re.compile(r"^[a-z][a-z0-9_\-]*$")
+_SPACES = re.compile(r"[ \t]+")
+_BLANKS = re.compile(r"\n{3,}")
+
+
+def clean_whitespace(s: str) -> str:
+    s = (s or "").replace("\r", "")
+    s = _SPACES.sub(" ", s)
+    s = _BLANKS.sub("\n\n", s)
+    return s.strip()
+
+
+def alpha_ratio(s: str) -> float:
+    if not s:
+        return 0.0
+    alpha = sum(ch.isalpha() for ch in s)
+    return alpha / max(1, len(s))
+
+
+def looks_like_contact_or_greeting(s: str) -> bool:
+    return CONTACT_RE.search(s.strip().lower()) is not None
+
+
+def meaningful_token(t: str) -> bool:
+    t = t.strip().lower()
+    return len(t) >= 4 and t not in STOPWORDS and _IDENT.match(t) is not None
+
+
+def clean_lines(raw: str) -> List[str]:
+    """
+    Remove greetings/signatures/contact lines/URLs/emails, tiny lines, and low-alpha lines.
+    Keep math/code blocks; keep sentences >= 15 chars or with key punctuation.
+    """
+    out: List[str] = []
+    for ln in clean_whitespace(raw).split("\n"):
+        ln = ln.strip()
+        if not ln:
+            continue
+        if looks_like_contact_or_greeting(ln):
+            continue
+        if len(ln) < 15 and not any(x in ln for x in (":", "=", "->", "∴", "∵")):
+            continue
+        if alpha_ratio(ln) < 0.5 and not any(x in ln for x in ("=", "$", "\\", "∑", "∫", "→", "↦")):
+            continue
+        out.append(ln)
+    return out
+
+
+def is_keyish(ln: str) -> bool:
+    """Definitional/mathy lines make the best question stems."""
+    return ":" in ln or "=" in ln or r"\(" in ln or r"\math" in ln
+
+
+def is_fact_line(ln: str) -> bool:
+    return 40 <= len(ln) <= 180 and not looks_like_contact_or_greeting(ln)
+
+
+def key_lines(lines: Iterable[str]) -> List[str]:
+    lines = [ln.strip() for ln in lines if ln.strip()]
+    keyish = [ln for ln in lines if is_keyish(ln)]
+    if not keyish:
+        # aim for medium-length factual sentences
+        keyish = [ln for ln in lines if is_fact_line(ln)]
+    return keyish[:MAX_KEY_LINES]
+
+
+def vocabulary(text: str) -> List[str]:
+    """Distinct meaningful terms in order of first appearance (distractor pool)."""
+    vocab = [w for w in _TERM.findall(text) if meaningful_token(w)]
+    return list(dict.fromkeys(vocab))[:MAX_VOCAB]
+
+
+def section_text(s: Dict) -> str:
+    title = s.get("title", "")
+    content = s.get("content", "")
+    if not content:
+        return ""
+    if s.get("type") == "code":
+        return f"{title}\nCode:\n{content}\n"
+    if s.get("type") == "latex":
+        return f"{title}\nMath:\n{content}\n"
+    return f"{title}\n{content}\n"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def prepare_section(s: Dict) -> Dict:
+    text = section_text(s)
+    lines = clean_lines(text)
+    return {
+        "hash": content_hash(text),
+        "lines": lines,
+        "key": [ln for ln in lines if is_keyish(ln)],
+        "facts": [ln for ln in lines if 40 <= len(ln) <= 180],  # already contact-filtered
+        "vocab": vocabulary("\n".join(lines)),
+    }
+
+
+def build_candidates(sections: List[Dict]) -> Dict:
+    preps = {s.get("id", f"sec-{i + 1}"): prepare_section(s) for i, s in enumerate(sections) if not s.get("dup_of")}
+    return {
+        "version": VERSION,
+        "corpus_id": content_hash("".join(f"{sid}:{p['hash']}" for sid, p in preps.items()))[:16],
+        "sections": preps,
+    }
+
+
+def merge(preps: List[Dict]) -> Tuple[str, List[str], List[str]]:
+    """(cleaned context, key lines, vocab) for a set of sections, as if computed over their joined text."""
+    keyish = [ln for p in preps for ln in p["key"]]
+    lines = keyish if keyish else [ln for p in preps for ln in p["facts"]]
+    vocab = list(dict.fromkeys(w for p in preps for w in p["vocab"]))[:MAX_VOCAB]
+    context = "\n".join(ln for p in preps for ln in p["lines"])
+    return context, lines[:MAX_KEY_LINES], vocab
+
+
+def topic_terms(topic: str) -> set:
+    return {w.lower() for w in _TERM.findall(topic or "") if meaningful_token(w)}
+
+
+def about(preps: Dict[str, Dict], topic: str) -> Dict[str, Dict]:
+    """
+    The sections that mention the topic's terms, most terms first ({} when none do,
+    or the topic has no meaningful terms).
+    """
+    terms = topic_terms(topic)
+    if not terms:
+        return {}
+    scores = {}
+    for sid, p in preps.items():
+        words = {w.lower() for ln in p["lines"] for w in _TERM.findall(ln)}
+        if terms & words:
+            scores[sid] = len(terms & words)
+    return {sid: preps[sid] for sid in sorted(scores, key=lambda sid: -scores[sid])}
+
+
+# ----------------------------
+# Sidecar (data/quiz_candidates.json)
+# ----------------------------
+_cache: Dict[str, object] = {"version": None, "corpus_id": None, "sections": {}}
+_lock = threading.Lock()
+
+
+def rebuild(sections: List[Dict], notes_version: Optional[int] = None) -> Dict:
+    """Recompute and persist candidates (called by the upload pipeline, after the notes are stored)."""
+    cands = build_candidates(sections)
+    cands["notes_version"] = get_notes_repo().snapshot().version if notes_version is None else notes_version
+    write_json(quiz_candidates_json(), cands)
+    with _lock:
+        _cache.update(version=cands["notes_version"], corpus_id=cands["corpus_id"], sections=cands["sections"])
+    return cands
+
+
+def get_candidates() -> Dict[str, Dict]:
+    """section id -> prepared section for the active lecture; no I/O while the notes are unchanged."""
+    snap = get_notes_repo().snapshot()
+    with _lock:
+        if _cache["version"] == snap.version:
+            return _cache["sections"]  # type: ignore[return-value]
+        if snap.doc is None:
+            _cache.update(version=snap.version, corpus_id=None, sections={})
+            return {}
+        doc = read_json(quiz_candidates_json(), {})
+        if doc.get("version") == VERSION and doc.get("notes_version") == snap.version:
+            _cache.update(version=snap.version, corpus_id=doc.get("corpus_id"), sections=doc.get("sections", {}))
+            return _cache["sections"]  # type: ignore[return-value]
+    return rebuild(snap.doc.get("sections") or [], snap.version)["sections"]
+
+
+def candidates_for(section_ids: Optional[List[str]] = None) -> List[Dict]:
+    """Prepared sections, all in notes order or just `section_ids` when given."""
+    return list(candidates_by_id(section_ids).values())
+
+
+def candidates_by_id(section_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Like candidates_for, keyed by section id (in request order; unknown ids are skipped)."""
+    cands = get_candidates()
+    if not section_ids:
+        return dict(cands)
+    return {sid: cands[sid] for sid in dict.fromkeys(section_ids) if sid in cands}
+
+
+def corpus_id() -> Optional[str]:
+    """Id of the notes the candidates were built from (None when there are no notes)."""
+    return _cache["corpus_id"] if get_candidates() else None  # type: ignore[return-value]
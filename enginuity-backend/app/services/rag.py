@@ -0,0 +1,251 @@
+# app/services/rag.py
+"""
+Retrieval-augmented answering for /chat.
+
+retrieve -> drop repeated/near-identical sections -> pack into a token budget
+-> generate with the configured LLM (or a deterministic extractive stand-in when
+no API key is set). Citations are the packed sections, numbered as in the prompt.
+"""
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.services import llm
+from app.services.dedupe import find_duplicates
+from app.services.timing import record, timed
+from app.services.vector import search as vec_search
+
+CHARS_PER_TOKEN = 4          # rough English average; avoids a tokenizer dependency
+MIN_PARTIAL_TOKENS = 60      # don't bother packing a sliver of a section
+RETRIEVE_OVERFETCH = 2       # fetch extra hits so dedupe doesn't starve the budget
+RETRIEVE_DIVERSITY = 0.3
+CARRY_DISCOUNT = 0.9         # previous turn's sections compete with fresh hits at a slight discount
+
+SYSTEM_PROMPT = """You are a study assistant answering questions about the student's lecture notes.
+Use ONLY the numbered context passages. Cite passages inline as [1], [2], ...
+If the context does not contain the answer, say so briefly instead of guessing.
+Keep answers concise and technical; use LaTeX ($...$) for math where helpful."""
+
+NO_CONTEXT_ANSWER = "I couldn't find anything about that in your notes yet."
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9_\-]{2,}")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def message_text(content: Any) -> str:
+    """Chat contents are plain strings or {"text": ...} dicts (see pages/60_Chat.py)."""
+    if isinstance(content, dict):
+        return str(content.get("text", ""))
+    return str(content or "")
+
+
+def retrieve(question: str, top_k: int, carry: Sequence[Dict] = ()) -> List[Dict]:
+    """
+    Fresh hits for `question`, merged by score with `carry` (sections behind the
+    previous answer in a session) so short follow-ups still have their context.
+    """
+    hits = vec_search(question, top_k=top_k * RETRIEVE_OVERFETCH, diversity=RETRIEVE_DIVERSITY)
+    if carry:
+        carried = [{**c, "score": float(c.get("score") or 0.0) * CARRY_DISCOUNT} for c in carry]
+        hits = sorted(hits + carried, key=lambda h: -float(h.get("score") or 0.0))
+    seen_ids = set()
+    unique: List[Dict] = []
+    for h in hits:
+        sid = h.get("section_id")
+        if sid in seen_ids:
+            continue
+        seen_ids.add(sid)
+        unique.append(h)
+    dup_of = find_duplicates([h.get("content") or h.get("snippet") or "" for h in unique])
+    return [h for i, h in enumerate(unique) if i not in dup_of][:top_k]
+
+
+def _clip_to_tokens(text: str, budget: int) -> str:
+    limit = budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind("\n"))
+    return (cut[: end + 1] if end > limit // 2 else cut).rstrip() + " …"
+
+
+def pack_context(hits: List[Dict], budget_tokens: int) -> Tuple[str, List[Dict]]:
+    """Greedy, score-ordered packing; the last section may be clipped at a sentence boundary."""
+    blocks: List[str] = []
+    packed: List[Dict] = []
+    remaining = budget_tokens
+    for h in hits:
+        text = (h.get("content") or h.get("snippet") or "").strip()
+        if not text:
+            continue
+        cost = estimate_tokens(text)
+        if cost > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                break
+            text = _clip_to_tokens(text, remaining)
+            cost = estimate_tokens(text)
+        n = len(packed) + 1
+        blocks.append(f"[{n}] ({h.get('source', 'Notes')} · {h.get('section_id')})\n{text}")
+        packed.append({**h, "content": text})
+        remaining -= cost
+        if remaining <= 0:
+            break
+    return "\n\n".join(blocks), packed
+
+
+def local_answer(question: str, packed: List[Dict], max_sentences: int = 4) -> str:
+    """Deterministic extractive stand-in: best-overlapping sentences, each cited."""
+    q_terms = {w.lower() for w in _WORD.findall(question)}
+    scored: List[Tuple[float, int, int, int, str]] = []
+    for ci, h in enumerate(packed, 1):
+        for si, sent in enumerate(_SENT_SPLIT.split(h.get("content", ""))):
+            sent = sent.strip()
+            if len(sent) < 20:
+                continue
+            shared = len(q_terms & {w.lower() for w in _WORD.findall(sent)})
+            rank = shared / (1 + len(q_terms)) + 0.05 * float(h.get("score") or 0.0)
+            scored.append((rank, shared, ci, si, sent))
+    if not scored:
+        return "I couldn't find this in your notes."
+    # sentences sharing a question term; otherwise open the top passage
+    pool = [x for x in scored if x[1] > 0] or [x for x in scored if x[2] == 1][:2]
+    best = sorted(pool, key=lambda x: (-x[0], x[2], x[3]))[:max_sentences]
+    best.sort(key=lambda x: (x[2], x[3]))  # keep reading order
+    return " ".join(f"{sent} [{ci}]" for _, _, ci, _, sent in best)
+
+
+def history_messages(messages: List[Dict], turns: int) -> List[Dict]:
+    """Last `turns` prior user/assistant messages as plain-text chat messages."""
+    out = []
+    for m in messages[-turns:]:
+        role = m.get("role")
+        if role in ("user", "assistant"):
+            text = message_text(m.get("content")).strip()
+            if text:
+                out.append({"role": role, "content": text})
+    return out
+
+
+def _prompt_messages(question: str, context: str, history: List[Dict], summary: str = "") -> List[Dict]:
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if summary:
+        messages.append({"role": "system", "content": f"Earlier questions in this conversation:\n{summary}"})
+    messages += history_messages(history, get_settings().CHAT_HISTORY_TURNS)
+    messages.append({"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"})
+    return messages
+
+
+def _citations(packed: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "n": i,
+            "title": h.get("source") or "Notes",
+            "section_id": h.get("section_id"),
+            "score": h.get("score"),
+            "snippet": h.get("snippet"),
+        }
+        for i, h in enumerate(packed, 1)
+    ]
+
+
+def _retrieve_and_pack(question: str, top_k: int, carry: Sequence[Dict]) -> Tuple[str, List[Dict]]:
+    with timed("chat_retrieve"):
+        hits = retrieve(question, top_k, carry)
+        return pack_context(hits, get_settings().CHAT_CONTEXT_TOKENS)
+
+
+async def answer(
+    question: str,
+    history: List[Dict],
+    top_k: int,
+    temperature: float,
+    carry: Sequence[Dict] = (),
+    summary: str = "",
+    no_cache: bool = False,
+) -> Dict:
+    """Returns {text, citations, timings, sections}; `sections` (the packed hits) is for session carry-over."""
+    t0 = time.perf_counter()
+    context, packed = await run_in_threadpool(_retrieve_and_pack, question, top_k, carry)
+    t1 = time.perf_counter()
+
+    with timed("chat_generate"):
+        if not packed:
+            text = NO_CONTEXT_ANSWER
+        elif llm.llm_enabled():
+            text = await llm.complete(
+                _prompt_messages(question, context, history, summary), temperature=temperature, no_cache=no_cache
+            )
+        else:
+            text = local_answer(question, packed)
+    t2 = time.perf_counter()
+
+    return {
+        "text": text,
+        "citations": _citations(packed),
+        "timings": {
+            "retrieval_ms": round((t1 - t0) * 1000.0, 1),
+            "generation_ms": round((t2 - t1) * 1000.0, 1),
+            "context_tokens": estimate_tokens(context),
+        },
+        "sections": packed,
+    }
+
+
+_STREAM_PIECE = re.compile(r"\S+\s*")
+
+
+async def _pieces(question, context, packed, history, temperature, summary, no_cache) -> AsyncIterator[str]:
+    if not packed:
+        yield NO_CONTEXT_ANSWER
+    elif llm.llm_enabled():
+        messages = _prompt_messages(question, context, history, summary)
+        async for delta in llm.stream(messages, temperature=temperature, no_cache=no_cache):
+            yield delta
+    else:
+        for piece in _STREAM_PIECE.findall(local_answer(question, packed)):
+            yield piece
+
+
+async def stream_answer(
+    question: str,
+    history: List[Dict],
+    top_k: int,
+    temperature: float,
+    carry: Sequence[Dict] = (),
+    summary: str = "",
+    no_cache: bool = False,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Yields ("citations", [...]) once retrieval is done, then ("token", str) per delta,
+    then ("done", {"timings": ..., "sections": ...}). Time-to-first-token is measured from the call.
+    """
+    t0 = time.perf_counter()
+    context, packed = await run_in_threadpool(_retrieve_and_pack, question, top_k, carry)
+    t1 = time.perf_counter()
+    yield "citations", _citations(packed)
+
+    ttft = None
+    async for piece in _pieces(question, context, packed, history, temperature, summary, no_cache):
+        if ttft is None:
+            ttft = time.perf_counter()
+            record("chat_ttft", (ttft - t0) * 1000.0)
+        yield "token", piece
+    t2 = time.perf_counter()
+    record("chat_generate", (t2 - t1) * 1000.0)
+
+    yield "done", {
+        "timings": {
+            "retrieval_ms": round((t1 - t0) * 1000.0, 1),
+            "ttft_ms": round(((ttft or t2) - t0) * 1000.0, 1),
+            "generation_ms": round((t2 - t1) * 1000.0, 1),
+            "context_tokens": estimate_tokens(context),
+        },
+        "sections": packed,
+    }
@@ -0,0 +1,53 @@
+# app/services/rerank.py
+from typing import List, Sequence
+
+import numpy as np
+
+
+def _unit_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def mmr_select(
+    query_vec: Sequence[float],
+    cand_vecs: Sequence[Sequence[float]],
+    k: int,
+    diversity: float = 0.5,
+) -> List[int]:
+    """
+    Maximal marginal relevance over a candidate pool.
+    Returns indices into `cand_vecs`, best first. `diversity` is in [0, 1]:
+    0 keeps pure relevance order, 1 only penalizes redundancy.
+    The candidate/candidate cosine matrix is computed once; each pick is a vector op.
+    """
+    cands = np.asarray(cand_vecs, dtype=np.float32)
+    n = cands.shape[0] if cands.ndim == 2 else 0
+    k = min(max(0, int(k)), n)
+    if k == 0:
+        return []
+
+    cands = _unit_rows(cands)
+    q = _unit_rows(np.asarray(query_vec, dtype=np.float32).reshape(1, -1))[0]
+    relevance = cands @ q
+    lam = 1.0 - min(max(float(diversity), 0.0), 1.0)
+    if lam >= 1.0:
+        return [int(i) for i in np.argsort(-relevance, kind="stable")[:k]]
+
+    sim = cands @ cands.T
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    picked = np.zeros(n, dtype=bool)
+    order: List[int] = []
+
+    first = int(np.argmax(relevance))
+    for _ in range(k):
+        if order:
+            scores = lam * relevance - (1.0 - lam) * max_sim
+            scores[picked] = -np.inf
+            idx = int(np.argmax(scores))
+        else:
+            idx = first
+        order.append(idx)
+        picked[idx] = True
+        np.maximum(max_sim, sim[:, idx], out=max_sim)
+    return order
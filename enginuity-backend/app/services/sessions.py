@@ -0,0 +1,133 @@
+# app/services/sessions.py
+"""
+Server-side chat sessions, so clients send only the new turn plus a session id.
+
+A session keeps a rolling window of the last CHAT_HISTORY_TURNS messages (plain
+text, no citation blobs), a short extractive summary of the questions that fell
+out of the window, and the sections retrieved for the previous answer so a
+follow-up ("why?", "and the second one?") can reuse them.
+
+Sessions live in an LRU/TTL map. With CHAT_SESSION_DB set they are also written
+through to SQLite, so they survive memory eviction and restarts until the TTL.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.cache import TTLCache
+
+SUMMARY_QUESTION_CHARS = 160     # per folded question
+CARRY_FIELDS = ("section_id", "source", "score", "snippet", "content")
+
+
+def new_session(session_id: Optional[str] = None) -> Dict:
+    return {
+        "id": session_id or uuid.uuid4().hex,
+        "window": [],        # [{"role", "content"}], oldest first
+        "summary": "",       # earlier user questions, most recent last
+        "sections": [],      # packed sections behind the last answer
+        "turns": 0,
+        "updated_at": time.time(),
+    }
+
+
+def _fold(summary: str, question: str, limit: int) -> str:
+    q = " ".join(question.split())
+    if len(q) > SUMMARY_QUESTION_CHARS:
+        q = q[:SUMMARY_QUESTION_CHARS].rstrip() + "…"
+    parts = [p for p in summary.split("\n") if p] + [f"- {q}"]
+    while len(parts) > 1 and sum(len(p) + 1 for p in parts) > limit:
+        parts.pop(0)  # drop the oldest question first
+    return "\n".join(parts)
+
+
+def record_turn(session: Dict, question: str, answer_text: str, sections: List[Dict]) -> Dict:
+    """Append one user/assistant exchange, folding overflow into the summary."""
+    s = get_settings()
+    session["window"] += [
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer_text},
+    ]
+    while len(session["window"]) > s.CHAT_HISTORY_TURNS:
+        old = session["window"].pop(0)
+        if old["role"] == "user":
+            session["summary"] = _fold(session["summary"], old["content"], s.CHAT_SUMMARY_CHARS)
+    session["sections"] = [{k: h.get(k) for k in CARRY_FIELDS} for h in sections]
+    session["turns"] += 1
+    session["updated_at"] = time.time()
+    return session
+
+
+class SessionStore:
+    def __init__(self, maxsize: int, ttl: float, db_path: str = ""):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._mem = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        if db_path:
+            with self._db() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                    "id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5.0)
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        sess = self._mem.get(session_id)
+        if sess is not None or not self.db_path:
+            return sess
+        with self._db() as db:
+            row = db.execute(
+                "SELECT data FROM chat_sessions WHERE id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        sess = json.loads(row[0])
+        self._mem.set(session_id, sess)
+        return sess
+
+    def get_or_create(self, session_id: Optional[str]) -> Dict:
+        """The session for `session_id`, or a new one; unknown ids get a fresh server-minted id."""
+        with self._lock:
+            sess = self.get(session_id) if session_id else None
+            if sess is None:
+                sess = new_session()
+                self._mem.set(sess["id"], sess)
+            return sess
+
+    def save(self, session: Dict) -> None:
+        self._mem.set(session["id"], session)
+        if self.db_path:
+            with self._db() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO chat_sessions (id, data, updated_at) VALUES (?, ?, ?)",
+                    (session["id"], json.dumps(session, ensure_ascii=False), session["updated_at"]),
+                )
+                db.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+
+    def delete(self, session_id: str) -> bool:
+        found = self._mem.pop(session_id) is not None
+        if self.db_path:
+            with self._db() as db:
+                found = db.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,)).rowcount > 0 or found
+        return found
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            s = get_settings()
+            _store = SessionStore(s.CHAT_SESSIONS_MAX, s.CHAT_SESSION_TTL_S, s.CHAT_SESSION_DB)
+        return _store
@@ -0,0 +1,69 @@
+# app/services/singleflight.py
+"""
+In-flight request coalescing ("single flight").
+
+Concurrent callers with the same key await one shared asyncio task instead of
+each doing the work. The task is shielded, so a leader whose client disconnects
+doesn't cancel the computation for everyone else. Keys are dropped as soon as
+the task finishes; nothing is cached past completion (see llm_cache for that).
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def fingerprint(*parts: Any) -> str:
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0       # every do()
+        self.executed = 0    # calls that started the work
+        self.coalesced = 0   # calls that joined an in-flight task
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def group(name: str) -> SingleFlight:
+    """Named, process-wide group (one per call site, e.g. "quiz", "chat", "llm")."""
+    if name not in _groups:
+        _groups[name] = SingleFlight(name)
+    return _groups[name]
+
+
+def metrics() -> Dict[str, Dict[str, int]]:
+    return {name: g.stats() for name, g in sorted(_groups.items())}
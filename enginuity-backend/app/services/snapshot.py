@@ -0,0 +1,209 @@
+# app/services/snapshot.py
+"""
+Single-file snapshots of the vector collection (ids, documents, metadata, embeddings).
+
+Layout (little-endian):
+    b"ENGSNAP1" | u64 header_len | header JSON | zero pad to 64 | float32[count, dim] | records JSON
+The header records offsets, shape and a sha256 over everything after the padding,
+so the embedding block can be np.memmap'd straight from disk and imports are
+verified before anything is written to the index. It also names the embedder
+that produced the vectors and the distance they were indexed with; imports
+refuse a different embedder, and a collection of another space or dimension.
+"""
+import hashlib
+import json
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.services.embedder import embedder_id
+from app.services.vector import _client, collection, hnsw_metadata, invalidate_search_cache
+
+MAGIC = b"ENGSNAP1"
+VERSION = 1
+ALIGN = 64
+EXPORT_PAGE = 1000
+HEADER_INTS = ("count", "dim", "embeddings_nbytes", "records_nbytes")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _pad(n: int) -> int:
+    return (-n) % ALIGN
+
+
+def export_snapshot(path: Path, name: str = "enginuity") -> Dict:
+    """Write the whole collection to `path`. Returns the header (plus elapsed_s)."""
+    t0 = time.perf_counter()
+    col = collection(name)
+    ids: List[str] = []
+    docs: List[str] = []
+    metas: List[Dict] = []
+    blocks: List[np.ndarray] = []
+    offset = 0
+    while True:
+        res = col.get(limit=EXPORT_PAGE, offset=offset, include=["embeddings", "documents", "metadatas"])
+        page_ids = res.get("ids") or []
+        if not page_ids:
+            break
+        ids.extend(page_ids)
+        docs.extend(res.get("documents") or [""] * len(page_ids))
+        metas.extend(res.get("metadatas") or [{}] * len(page_ids))
+        blocks.append(np.asarray(res["embeddings"], dtype="<f4"))
+        offset += len(page_ids)
+
+    emb = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype="<f4")
+    emb_bytes = np.ascontiguousarray(emb).tobytes()
+    records = json.dumps(
+        [{"id": i, "document": d, "metadata": m or {}} for i, d, m in zip(ids, docs, metas)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    digest = hashlib.sha256(emb_bytes + records).hexdigest()
+
+    header = {
+        "version": VERSION,
+        "collection": name,
+        "created_at": int(time.time()),
+        "count": len(ids),
+        "dim": int(emb.shape[1]) if emb.ndim == 2 and emb.size else 0,
+        "dtype": "<f4",
+        "space": (col.metadata or {}).get("hnsw:space", "l2"),
+        "embedder": embedder_id(),
+        "embeddings_nbytes": len(emb_bytes),
+        "records_nbytes": len(records),
+        "sha256": digest,
+    }
+    head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    prefix = len(MAGIC) + 8 + len(head)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<Q", len(head)))
+        fh.write(head)
+        fh.write(b"\0" * _pad(prefix))
+        fh.write(emb_bytes)
+        fh.write(records)
+    tmp.replace(path)
+    return {**header, "bytes": path.stat().st_size, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
+def read_snapshot(path: Path, verify: bool = True) -> Tuple[Dict, np.ndarray, List[Dict]]:
+    """Return (header, embeddings memmap, records). Raises SnapshotError on a bad file."""
+    path = Path(path)
+    with path.open("rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError("Not an Enginuity snapshot file.")
+        raw_len = fh.read(8)
+        if len(raw_len) != 8:
+            raise SnapshotError("Snapshot is truncated.")
+        (head_len,) = struct.unpack("<Q", raw_len)
+        try:
+            header = json.loads(fh.read(head_len).decode("utf-8"))
+        except Exception as e:
+            raise SnapshotError(f"Corrupt snapshot header: {e}")
+    if not isinstance(header, dict) or header.get("version") != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version: {header.get('version') if isinstance(header, dict) else None}")
+    missing = [k for k in HEADER_INTS if not isinstance(header.get(k), int) or header[k] < 0]
+    if missing:
+        raise SnapshotError(f"Corrupt snapshot header: bad or missing {', '.join(missing)}")
+    if not isinstance(header.get("space"), str):
+        raise SnapshotError("Corrupt snapshot header: bad or missing space")
+    if header.get("dtype") != "<f4":
+        raise SnapshotError(f"Unsupported embedding dtype: {header.get('dtype')}")
+
+    prefix = len(MAGIC) + 8 + head_len
+    emb_off = prefix + _pad(prefix)
+    n, dim, emb_nbytes = header["count"], header["dim"], header["embeddings_nbytes"]
+    if emb_nbytes != n * dim * 4:
+        raise SnapshotError(f"Embedding block is {emb_nbytes} bytes, expected {n * dim * 4} for {n} x {dim} float32.")
+    rec_off = emb_off + emb_nbytes
+    if path.stat().st_size != rec_off + header["records_nbytes"]:
+        raise SnapshotError("Snapshot is truncated or has trailing data.")
+
+    if n and dim:
+        emb = np.memmap(path, dtype=header["dtype"], mode="r", offset=emb_off, shape=(n, dim))
+    else:
+        emb = np.zeros((0, dim), dtype=header["dtype"])
+    with path.open("rb") as fh:
+        fh.seek(rec_off)
+        rec_bytes = fh.read(header["records_nbytes"])
+
+    if verify:
+        h = hashlib.sha256()
+        with path.open("rb") as fh:
+            fh.seek(emb_off)
+            remaining = emb_nbytes
+            while remaining:
+                buf = fh.read(min(remaining, 1 << 20))
+                if not buf:
+                    break
+                h.update(buf)
+                remaining -= len(buf)
+        h.update(rec_bytes)
+        if h.hexdigest() != header.get("sha256"):
+            raise SnapshotError("Snapshot checksum mismatch.")
+
+    try:
+        records = json.loads(rec_bytes.decode("utf-8"))
+    except Exception as e:
+        raise SnapshotError(f"Corrupt snapshot records: {e}")
+    if not isinstance(records, list) or len(records) != n:
+        raise SnapshotError("Snapshot record count does not match header.")
+    return header, emb, records
+
+
+def import_snapshot(path: Path, name: str = "enginuity", replace: bool = False) -> Dict:
+    """
+    Bulk-load a snapshot into the collection using the stored embeddings (no re-embedding).
+    With `replace`, the collection is dropped and recreated with the configured HNSW params first.
+    """
+    t0 = time.perf_counter()
+    header, emb, records = read_snapshot(path)
+    if header.get("embedder") != embedder_id():
+        raise SnapshotError(
+            f"Snapshot vectors come from embedder {header.get('embedder')}, this server embeds queries with "
+            f"{embedder_id()}; re-index instead of importing."
+        )
+    if replace:
+        cli = _client()
+        try:
+            cli.delete_collection(name=name)
+        except Exception:
+            pass
+    # a missing (or just dropped) collection is created with the snapshot's distance
+    col = collection(name, metadata={**hnsw_metadata(), "hnsw:space": header["space"]})
+    space = (col.metadata or {}).get("hnsw:space", "l2")
+    if space != header["space"]:
+        raise SnapshotError(f"Snapshot uses {header['space']} distance but collection '{name}' uses {space}; import with replace.")
+    if records and col.count():
+        have = col.get(limit=1, include=["embeddings"])["embeddings"]
+        if have is not None and len(have) and len(have[0]) != header["dim"]:
+            raise SnapshotError(
+                f"Snapshot vectors have {header['dim']} dimensions, collection '{name}' has {len(have[0])}; import with replace."
+            )
+    batch = max(1, min(_client().get_max_batch_size(), 5000))
+    for start in range(0, len(records), batch):
+        chunk = records[start : start + batch]
+        col.upsert(
+            ids=[r["id"] for r in chunk],
+            documents=[r["document"] for r in chunk],
+            metadatas=[r["metadata"] or None for r in chunk],
+            embeddings=np.asarray(emb[start : start + batch]).tolist(),
+        )
+    invalidate_search_cache()
+    return {
+        "collection": name,
+        "imported": len(records),
+        "dim": header["dim"],
+        "space": space,
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
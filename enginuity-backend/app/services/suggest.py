@@ -0,0 +1,119 @@
+# app/services/suggest.py
+"""
+Prefix index for type-ahead suggestions on the Search page.
+
+Built once per ingest from the chunked sections: single terms, frequent
+two-word phrases and section/lecture titles go into one sorted array of
+lowercased keys, so a lookup is a bisect plus a short forward scan.
+The index object is immutable; rebuilds swap the module-level reference.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.services.io import get_notes_repo
+
+_TOKEN = re.compile(r"[A-Za-z][A-Za-z0-9_\-]{2,}")
+_STOP = set("""
+and are for from has have into its not that the this was were will with your you can also but
+which when where what how than then there these those such each other more most only over
+""".split())
+
+MIN_PHRASE_COUNT = 2
+MAX_SCAN = 5000       # bounds work for one-letter prefixes on very large vocabularies
+TITLE_BOOST = 5
+
+
+class SuggestIndex:
+    def __init__(self, entries: List[Tuple[str, str, str, int]]):
+        # (key, text, kind, weight) sorted by key
+        entries.sort(key=lambda e: e[0])
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, prefix: str, limit: int = 8) -> List[Dict]:
+        p = (prefix or "").strip().lower()
+        if not p:
+            return []
+        i = bisect_left(self._keys, p)
+        hits: List[Tuple[str, str, str, int]] = []
+        end = min(len(self._keys), i + MAX_SCAN)
+        while i < end and self._keys[i].startswith(p):
+            hits.append(self._entries[i])
+            i += 1
+        hits.sort(key=lambda e: (-e[3], len(e[0]), e[0]))
+        out: List[Dict] = []
+        seen = set()
+        for _, t, kind, w in hits:  # a title and a term can share their text: keep the better one
+            if t.casefold() in seen:
+                continue
+            seen.add(t.casefold())
+            out.append({"text": t, "kind": kind, "score": w})
+            if len(out) == limit:
+                break
+        return out
+
+
+def build_index(sections: List[Dict], lecture_title: Optional[str] = None) -> SuggestIndex:
+    term_counts: Counter = Counter()
+    phrase_counts: Counter = Counter()
+    display: Dict[str, Counter] = {}
+
+    for s in sections:
+        words = [w for w in _TOKEN.findall(s.get("content", "") or "")]
+        prev: Optional[str] = None
+        for w in words:
+            low = w.lower()
+            if low in _STOP:
+                prev = None
+                continue
+            term_counts[low] += 1
+            display.setdefault(low, Counter())[w] += 1
+            if prev is not None:
+                phrase_counts[f"{prev} {low}"] += 1
+            prev = low
+
+    entries: List[Tuple[str, str, str, int]] = []
+    for low, n in term_counts.items():
+        entries.append((low, display[low].most_common(1)[0][0], "term", n))
+    for phrase, n in phrase_counts.items():
+        if n >= MIN_PHRASE_COUNT:
+            entries.append((phrase, phrase, "phrase", n))
+
+    titles = [s.get("title") for s in sections] + [lecture_title]
+    for t in dict.fromkeys(filter(None, titles)):
+        entries.append((t.lower(), t, "title", TITLE_BOOST + term_counts.get(t.lower(), 0)))
+    return SuggestIndex(entries)
+
+
+_lock = threading.Lock()
+_index: Optional[SuggestIndex] = None
+
+
+def rebuild(sections: List[Dict], lecture_title: Optional[str] = None) -> SuggestIndex:
+    """Rebuild from freshly chunked sections (called at ingest)."""
+    global _index
+    idx = build_index(sections, lecture_title)
+    _index = idx
+    return idx
+
+
+def get_index() -> SuggestIndex:
+    """Current index; built from the stored notes on first use after a restart."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                doc = get_notes_repo().snapshot().doc or {"sections": []}
+                sections = [s for s in doc.get("sections", []) or [] if not s.get("dup_of")]
+                _index = build_index(sections, doc.get("lecture_title"))
+    return _index
+
+
+def suggest(prefix: str, limit: int = 8) -> List[Dict]:
+    return get_index().lookup(prefix, limit)
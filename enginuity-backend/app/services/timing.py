@@ -0,0 +1,90 @@
+# app/services/timing.py
+"""
+Per-request stage timing, surfaced as a `Server-Timing` header and a log line.
+
+Code marks stages with `timed("embed")` (context manager or decorator). The
+middleware opens a fresh recorder per request in a ContextVar; Starlette copies
+the context into threadpool workers, so sync routes record into the same list.
+Outside a request, `timed` does only two perf_counter calls and a ContextVar read.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger("enginuity.timing")
+
+_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("server_timing_stages", default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec = _stages.get()
+        if rec is not None:
+            rec.append((stage, (time.perf_counter() - t0) * 1000.0))
+
+
+def record(stage: str, ms: float) -> None:
+    """Add a duration measured elsewhere (e.g. time-to-first-token)."""
+    rec = _stages.get()
+    if rec is not None:
+        rec.append((stage, ms))
+
+
+def current_stages() -> Dict[str, float]:
+    """Stage -> total ms recorded so far in this request (repeated stages are summed)."""
+    out: Dict[str, float] = {}
+    for name, ms in _stages.get() or []:
+        out[name] = out.get(name, 0.0) + ms
+    return out
+
+
+def header_value(stages: Dict[str, float], total_ms: float) -> str:
+    parts = [f"{name};dur={ms:.1f}" for name, ms in stages.items()]
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware (works with streaming responses, unlike BaseHTTPMiddleware)."""
+
+    def __init__(self, app, enabled: bool = True):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        rec: List[Tuple[str, float]] = []
+        token = _stages.set(rec)
+        t0 = time.perf_counter()
+        status = {"code": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                total = (time.perf_counter() - t0) * 1000.0
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", header_value(current_stages(), total).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            total = (time.perf_counter() - t0) * 1000.0
+            stages = current_stages()
+            if stages:
+                log.info(
+                    "%s %s %s total=%.1fms %s",
+                    scope.get("method"), scope.get("path"), status["code"], total,
+                    " ".join(f"{k}={v:.1f}ms" for k, v in stages.items()),
+                )
+            _stages.reset(token)
@@ -1,13 +1,13 @@
 # app/services/vector.py
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+import hashlib
 from app.core.config import get_settings
+from app.services.cache import TTLCache
+from app.services.embedder import get_embedder
+from app.services.rerank import mmr_select
+from app.services.timing import timed
 import chromadb
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction  # type: ignore
-
-
-# use a local model (no API key required)
-_embedder = SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
 
 def _client():
     settings = get_settings()
@@ -15,35 +15,99 @@ def _client():
     persist.mkdir(parents=True, exist_ok=True)
     return chromadb.PersistentClient(path=str(persist))
 
-def collection(name: str = "enginuity") -> chromadb.api.models.Collection.Collection: # type: ignore[attr-defined]
+def hnsw_metadata() -> Dict:
+    """Chroma collection metadata carrying the configured HNSW build/search params."""
+    settings = get_settings()
+    return {
+        "hnsw:space": settings.VECTORDB_SPACE,
+        "hnsw:M": int(settings.VECTORDB_HNSW_M),
+        "hnsw:construction_ef": int(settings.VECTORDB_HNSW_CONSTRUCTION_EF),
+        "hnsw:search_ef": int(settings.VECTORDB_HNSW_SEARCH_EF),
+    }
+
+def collection(name: str = "enginuity", metadata: Optional[Dict] = None) -> chromadb.api.models.Collection.Collection: # type: ignore[attr-defined]
+    """Get or create `name`; a new collection gets `metadata` (default: the configured HNSW params)."""
     cli = _client()
     try:
-        return cli.get_collection(name=name, embedding_function=_embedder)
+        return cli.get_collection(name=name, embedding_function=get_embedder())
     except Exception:
-        return cli.create_collection(name=name, embedding_function=_embedder)
+        return cli.create_collection(name=name, embedding_function=get_embedder(), metadata=metadata or hnsw_metadata())
 
 def index_sections(lecture_title: str, sections: List[Dict]) -> None:
     col = collection()
     ids = [s["id"] for s in sections]
     docs = [s["content"] for s in sections]
     metas = [{"title": lecture_title, "section_id": s["id"]} for s in sections]
-    col.upsert(ids=ids, documents=docs, metadatas=metas)
+    with timed("embed"):
+        embs = get_embedder()(docs)
+    with timed("index_upsert"):
+        col.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=embs)
+    invalidate_search_cache()
+
+# candidate pool for diversified (MMR) retrieval
+MMR_FETCH_K = 50
 
-def search(q: str, top_k: int = 5) -> List[Dict]:
+# query fingerprint -> deep candidate list, shared by every page of that query
+_candidates = TTLCache(maxsize=256, ttl=get_settings().SEARCH_CURSOR_TTL_S)
+
+def _hit(doc: str, meta: Dict, dist) -> Dict:
+    return {
+        "title": "Match",
+        "snippet": doc[:280] + ("…" if len(doc) > 280 else ""),
+        "score": 1.0 - float(dist) if dist is not None else None,  # convert distance to pseudo-score
+        "section_id": meta.get("section_id"),
+        "source": meta.get("title", "Notes"),
+        "content": doc,  # full text for context packing; not part of the SearchHit payload
+    }
+
+def search(q: str, top_k: int = 5, diversity: float = 0.0) -> List[Dict]:
+    """
+    ANN search over the collection. With `diversity` > 0 the query over-fetches
+    candidates (with embeddings) and re-ranks them with MMR before trimming to top_k.
+    """
     col = collection()
-    res = col.query(query_texts=[q], n_results=top_k)
+    with timed("embed_query"):
+        q_emb = get_embedder()([q])[0]
+    with timed("ann_query"):
+        if diversity and diversity > 0:
+            res = col.query(
+                query_embeddings=[q_emb],
+                n_results=max(top_k, MMR_FETCH_K),
+                include=["documents", "metadatas", "distances", "embeddings"],
+            )
+        else:
+            res = col.query(query_embeddings=[q_emb], n_results=top_k)
     out: List[Dict] = []
     if not res or not res.get("documents"):
         return out
     docs = res["documents"][0]
     metas = res["metadatas"][0]
     dists = res.get("distances", [[ ]])[0] if res.get("distances") else [None]*len(docs)
-    for doc, meta, dist in zip(docs, metas, dists):
-        out.append({
-            "title": "Match",
-            "snippet": doc[:280] + ("…" if len(doc) > 280 else ""),
-            "score": 1.0 - float(dist) if dist is not None else None,  # convert distance to pseudo-score
-            "section_id": meta.get("section_id"),
-            "source": meta.get("title", "Notes"),
-        })
+    order = range(len(docs))
+    embs = res.get("embeddings")
+    if diversity and diversity > 0 and embs is not None and len(embs[0]):
+        with timed("mmr"):
+            order = mmr_select(q_emb, embs[0], top_k, diversity)
+    for i in order:
+        out.append(_hit(docs[i], metas[i], dists[i]))
     return out
+
+def search_candidates(q: str, diversity: float = 0.0) -> Tuple[str, List[Dict]]:
+    """
+    Deep top-k (SEARCH_MAX_CANDIDATES) for a query, computed once and cached.
+    Returns (list_id, hits); list_id is what search cursors point at.
+    """
+    deep_k = get_settings().SEARCH_MAX_CANDIDATES
+    list_id = hashlib.sha1(f"{q}\x1f{diversity:.3f}\x1f{deep_k}".encode("utf-8")).hexdigest()[:16]
+    hits = _candidates.get(list_id)
+    if hits is None:
+        hits = search(q, top_k=deep_k, diversity=diversity)
+        _candidates.set(list_id, hits)
+    return list_id, hits
+
+def cached_candidates(list_id: str) -> Optional[List[Dict]]:
+    return _candidates.get(list_id)
+
+def invalidate_search_cache() -> None:
+    """Drop cached candidate lists; called whenever the index changes."""
+    _candidates.clear()
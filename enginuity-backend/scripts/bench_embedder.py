@@ -0,0 +1,114 @@
+# scripts/bench_embedder.py
+"""
+Accuracy parity + throughput of the ONNX embedder against the PyTorch path.
+
+Embeds the current notes sections (or --synthetic N generated sentences) with:
+  torch       sentence-transformers (reference)
+  onnx-fp32   exported MiniLM under ONNX Runtime
+  onnx-int8   the same, int8 dynamic-quantized
+and reports texts/s, min/mean cosine to the reference, and top-k neighbour overlap.
+Exits non-zero if a backend falls under --min-cosine (use it as a parity gate).
+
+    cd enginuity-backend
+    python scripts/bench_embedder.py --threads 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.embedder import (
+    ONNX_FILE,
+    ONNX_INT8_FILE,
+    OnnxEmbeddingFunction,
+    build_embedder,
+    export_onnx,
+)
+from app.services.io import notes_json, read_json
+
+WORDS = (
+    "laplace transform pole zero stability feedback system signal frequency response "
+    "convolution impulse step input output gain phase margin bode nyquist sampling filter"
+).split()
+
+
+def corpus_texts(synthetic: int) -> List[str]:
+    if not synthetic:
+        doc = read_json(notes_json(), {"sections": []})
+        texts = [s.get("content", "") for s in doc.get("sections", []) if s.get("content")]
+        if texts:
+            return texts
+        synthetic = 256
+    rng = np.random.default_rng(17)
+    return [" ".join(rng.choice(WORDS, size=int(rng.integers(8, 120)))) for _ in range(synthetic)]
+
+
+def run(fn, texts: List[str], repeats: int) -> Dict:
+    fn(texts[:4])  # warm up (session init, allocator)
+    best = float("inf")
+    vecs = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        vecs = fn(texts)
+        best = min(best, time.perf_counter() - t0)
+    return {"vecs": np.asarray(vecs, dtype=np.float32), "seconds": best}
+
+
+def topk_overlap(ref: np.ndarray, other: np.ndarray, k: int) -> float:
+    k = min(k, ref.shape[0] - 1)
+    if k <= 0:
+        return 1.0
+    a = np.argsort(-(ref @ ref.T), axis=1)[:, 1 : k + 1]
+    b = np.argsort(-(other @ other.T), axis=1)[:, 1 : k + 1]
+    return float(np.mean([len(set(x) & set(y)) / k for x, y in zip(a, b)]))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--synthetic", type=int, default=0)
+    ap.add_argument("--threads", type=int, default=get_settings().EMBEDDER_ONNX_THREADS)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--min-cosine", type=float, default=0.98)
+    args = ap.parse_args()
+
+    settings = get_settings()
+    model_dir = Path(settings.EMBEDDER_ONNX_DIR).resolve()
+    if not (model_dir / ONNX_FILE).exists() or not (model_dir / ONNX_INT8_FILE).exists():
+        print(f"exporting {settings.EMBEDDER_LOCAL_MODEL} -> {model_dir}")
+        export_onnx(settings.EMBEDDER_LOCAL_MODEL, model_dir, quantize=True)
+
+    texts = corpus_texts(args.synthetic)
+    backends = {
+        "torch": build_embedder("torch"),
+        "onnx-fp32": OnnxEmbeddingFunction(model_dir, quantized=False, threads=args.threads),
+        "onnx-int8": OnnxEmbeddingFunction(model_dir, quantized=True, threads=args.threads),
+    }
+    results = {name: run(fn, texts, args.repeats) for name, fn in backends.items()}
+    ref = results["torch"]["vecs"]
+
+    print(f"texts={len(texts)} avg_chars={np.mean([len(t) for t in texts]):.0f} onnx_threads={args.threads or 'default'}")
+    print(f"{'backend':<10} {'texts/s':>9} {'speedup':>8} {'cos min':>8} {'cos mean':>9} {'top-k':>6}")
+    ok = True
+    for name, r in results.items():
+        cos = np.sum(ref * r["vecs"], axis=1)
+        tps = len(texts) / r["seconds"]
+        speed = results["torch"]["seconds"] / r["seconds"]
+        print(f"{name:<10} {tps:>9.1f} {speed:>7.2f}x {cos.min():>8.4f} {cos.mean():>9.4f} "
+              f"{topk_overlap(ref, r['vecs'], args.k):>6.2f}")
+        ok = ok and float(cos.min()) >= args.min_cosine
+    if not ok:
+        print(f"parity check FAILED (min cosine < {args.min_cosine})")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# scripts/bench_io.py
+"""
+notes.json persistence: the old indent=2 + write_text path vs. the atomic compact writer.
+
+Writes a synthetic lecture (--sections) to a temporary directory and times:
+  legacy        json.dumps(indent=2) + write_text, json.loads(read_text)
+  atomic        io.write_json / io.read_json (orjson when installed, temp file + fsync + rename)
+  atomic+gzip   the same with a gzip sidecar (JSON_SIDECAR_MIN_KB=1); the read column is the
+                sidecar fallback (used only when the JSON is missing or corrupt)
+
+    cd enginuity-backend
+    python scripts/bench_io.py --sections 10000 --repeats 10
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.bench_quiz import synth_sections  # noqa: E402
+
+
+def timeit(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.9 * (len(samples) - 1))]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sections", type=int, default=10000)
+    ap.add_argument("--lines", type=int, default=20)
+    ap.add_argument("--repeats", type=int, default=10)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_io_"))
+    os.environ["DATA_DIR"] = str(tmp)
+
+    from app.core.config import get_settings
+    from app.services import io
+
+    doc = {"lecture_title": "Bench", "sections": synth_sections(args.sections, args.lines, random.Random(0))}
+    legacy, atomic, zipped = tmp / "legacy.json", tmp / "atomic.json", tmp / "zipped.json"
+    settings = get_settings()
+    print(f"corpus: {args.sections} sections x {args.lines} lines; json backend: "
+          f"{'orjson' if io.orjson is not None else 'stdlib'}")
+
+    def write_zipped():
+        settings.JSON_SIDECAR_MIN_KB = 1
+        try:
+            io.write_json(zipped, doc)
+        finally:
+            settings.JSON_SIDECAR_MIN_KB = 0
+
+    writes = [
+        ("legacy", timeit(lambda: legacy.write_text(json.dumps(doc, indent=2), encoding="utf-8"), args.repeats)),
+        ("atomic", timeit(lambda: io.write_json(atomic, doc), args.repeats)),
+        ("atomic+gzip", timeit(write_zipped, args.repeats)),
+    ]
+    reads = [
+        ("legacy", timeit(lambda: json.loads(legacy.read_text(encoding="utf-8")), args.repeats)),
+        ("atomic", timeit(lambda: io.read_json(atomic, {}), args.repeats)),
+        ("atomic+gzip", timeit(lambda: io.loads(gzip.decompress(io.sidecar_path(zipped).read_bytes())), args.repeats)),
+    ]
+    assert io.read_json(atomic, {}) == io.read_json(zipped, {}) == json.loads(legacy.read_text(encoding="utf-8"))
+    sizes = {"legacy": legacy.stat().st_size, "atomic": atomic.stat().st_size,
+             "atomic+gzip": io.sidecar_path(zipped).stat().st_size}
+
+    print(f"\n{'path':<14}{'write p50':>11}{'p90':>8}{'read p50':>10}{'p90':>8}{'MB':>8}")
+    for (name, (w50, w90)), (_, (r50, r90)) in zip(writes, reads):
+        print(f"{name:<14}{w50:>11.1f}{w90:>8.1f}{r50:>10.1f}{r90:>8.1f}{sizes[name] / 1e6:>8.1f}")
+    print(json.dumps({"data_dir": str(tmp)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
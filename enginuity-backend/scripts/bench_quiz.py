@@ -0,0 +1,116 @@
+# scripts/bench_quiz.py
+"""
+Rule-based /quiz latency: rescanning notes.json per request vs. ingest-time candidates.
+
+Writes a synthetic lecture (--sections x --lines) to a temporary DATA_DIR and times:
+  rescan        load the stored notes -> preprocess_context -> rule_based_generate (old per-request path)
+  precomputed   candidates_for() -> rule_based_from_candidates (current path; sidecar cached in memory)
+  cold sidecar  the same, after dropping the in-memory copy (reads quiz_candidates.json)
+plus the one-off ingest cost of build_candidates and the contact filter with one
+compiled alternation vs. one re.search per pattern.
+
+    cd enginuity-backend
+    python scripts/bench_quiz.py --sections 2000 --repeats 20
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+WORDS = (
+    "laplace transform pole zero stability feedback system signal frequency response "
+    "convolution impulse step input output gain phase margin bode nyquist sampling filter"
+).split()
+NOISE = ["Dear class,", "Thanks for attending!", "Email: ta@example.edu", "https://course.example.edu/slides", "Best regards"]
+
+
+def synth_sections(n: int, lines: int, rng: random.Random):
+    out = []
+    for i in range(n):
+        body = []
+        for j in range(lines):
+            r = rng.random()
+            if r < 0.1:
+                body.append(rng.choice(NOISE))
+            elif r < 0.4:
+                body.append(f"{rng.choice(WORDS).title()} {j}: " + " ".join(rng.choices(WORDS, k=10)))
+            else:
+                body.append(" ".join(rng.choices(WORDS, k=14)).capitalize() + ".")
+        out.append({"id": f"sec-{i + 1}", "title": f"Section {i + 1}", "type": "text", "content": "\n".join(body)})
+    return out
+
+
+def timeit(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.9 * (len(samples) - 1))]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sections", type=int, default=2000)
+    ap.add_argument("--lines", type=int, default=20)
+    ap.add_argument("--n", type=int, default=10, help="questions per quiz")
+    ap.add_argument("--repeats", type=int, default=20)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_quiz_")
+    os.environ["DATA_DIR"] = tmp  # before settings are first read
+
+    from app.routers import quiz
+    from app.services import quiz_prep
+    from app.services.io import notes_json, write_json
+
+    sections = synth_sections(args.sections, args.lines, random.Random(0))
+    write_json(notes_json(), {"lecture_title": "Bench", "sections": sections})
+    size_mb = notes_json().stat().st_size / 1e6
+    print(f"corpus: {args.sections} sections x {args.lines} lines ({size_mb:.1f} MB notes.json)")
+
+    t0 = time.perf_counter()
+    quiz_prep.rebuild(sections)
+    print(f"ingest build_candidates + sidecar write: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def rescan():
+        context = quiz.preprocess_context(quiz._load_notes_text())
+        return quiz.rule_based_generate(context, args.n, "mix")
+
+    def precomputed():
+        return quiz.rule_based_from_candidates(quiz_prep.candidates_for(None), args.n, "mix")
+
+    def cold():
+        quiz_prep._cache.update(version=None, sections={})
+        return precomputed()
+
+    assert rescan() == precomputed(), "paths disagree"
+    rows = [("rescan", timeit(rescan, args.repeats)),
+            ("precomputed", timeit(precomputed, args.repeats)),
+            ("cold sidecar", timeit(cold, max(3, args.repeats // 4)))]
+    print(f"\n{'path':<14}{'p50 ms':>10}{'p90 ms':>10}")
+    for name, (p50, p90) in rows:
+        print(f"{name:<14}{p50:>10.1f}{p90:>10.1f}")
+    print(f"speed-up (p50): {rows[0][1][0] / max(rows[1][1][0], 1e-6):.0f}x")
+
+    lines = [ln.strip().lower() for s in sections for ln in s["content"].split("\n")]
+    per_pattern = timeit(lambda: [any(re.search(p, ln) for p in quiz_prep.CONTACT_PATTERNS) for ln in lines], 3)[0]
+    combined = timeit(lambda: [quiz_prep.CONTACT_RE.search(ln) is not None for ln in lines], 3)[0]
+    print(f"\ncontact filter over {len(lines)} lines: per-pattern {per_pattern:.0f} ms, combined {combined:.0f} ms")
+    print(json.dumps({"data_dir": tmp}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# scripts/snapshot.py
+"""
+CLI for vector index snapshots (same format as GET/POST /vector/snapshot).
+
+    cd enginuity-backend
+    python scripts/snapshot.py export vector_index.snap
+    python scripts/snapshot.py import vector_index.snap --replace
+    python scripts/snapshot.py verify vector_index.snap
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.snapshot import SnapshotError, export_snapshot, import_snapshot, read_snapshot
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("action", choices=["export", "import", "verify"])
+    ap.add_argument("path", type=Path)
+    ap.add_argument("--collection", default="enginuity")
+    ap.add_argument("--replace", action="store_true", help="drop the collection before importing")
+    args = ap.parse_args()
+
+    try:
+        if args.action == "export":
+            out = export_snapshot(args.path, name=args.collection)
+        elif args.action == "import":
+            out = import_snapshot(args.path, name=args.collection, replace=args.replace)
+        else:
+            header, _, _ = read_snapshot(args.path)
+            out = {"ok": True, **header}
+    except SnapshotError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
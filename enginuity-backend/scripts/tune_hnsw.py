@@ -0,0 +1,156 @@
+# scripts/tune_hnsw.py
+"""
+Recall/latency sweep for the HNSW index behind the Chroma collection.
+
+Pulls the stored embeddings from the current corpus (or generates a synthetic
+set with --synthetic N), computes exact top-k by brute force, then builds
+hnswlib indexes (the same library Chroma uses) over a grid of M /
+construction ef / search ef and reports recall@k and p50/p99 query latency.
+Finishes with the cheapest config that meets --target-recall as .env lines.
+
+    cd enginuity-backend
+    python scripts/tune_hnsw.py --k 5 --queries 200 --target-recall 0.95
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import hnswlib  # type: ignore  # shipped with chroma-hnswlib
+import numpy as np
+
+
+def load_corpus_embeddings() -> np.ndarray:
+    from app.services.vector import collection
+
+    res = collection().get(include=["embeddings"])
+    embs = res.get("embeddings")
+    if embs is None or len(embs) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.asarray(embs, dtype=np.float32)
+
+
+def exact_topk(data: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    if space == "l2":
+        # ||q - x||^2 up to a per-query constant
+        scores = 2.0 * queries @ data.T - (data * data).sum(axis=1)[None, :]
+    elif space == "cosine":
+        dn = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-12)
+        qn = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = qn @ dn.T
+    else:  # ip
+        scores = queries @ data.T
+    part = np.argpartition(-scores, kth=min(k, data.shape[0]) - 1, axis=1)[:, :k]
+    return part
+
+
+def run_grid(
+    data: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    space: str,
+    ms: List[int],
+    cefs: List[int],
+    sefs: List[int],
+) -> List[Dict]:
+    rows: List[Dict] = []
+    ids = np.arange(data.shape[0])
+    for m in ms:
+        for cef in cefs:
+            index = hnswlib.Index(space=space, dim=data.shape[1])
+            t0 = time.perf_counter()
+            index.init_index(max_elements=data.shape[0], ef_construction=cef, M=m)
+            index.add_items(data, ids)
+            build_s = time.perf_counter() - t0
+            for sef in sefs:
+                index.set_ef(max(sef, k))
+                lat: List[float] = []
+                hits = 0
+                for qi in range(queries.shape[0]):
+                    t1 = time.perf_counter()
+                    labels, _ = index.knn_query(queries[qi : qi + 1], k=k)
+                    lat.append((time.perf_counter() - t1) * 1000.0)
+                    hits += len(set(labels[0].tolist()) & set(truth[qi].tolist()))
+                rows.append({
+                    "M": m,
+                    "construction_ef": cef,
+                    "search_ef": sef,
+                    "recall": hits / float(k * queries.shape[0]),
+                    "p50_ms": float(np.percentile(lat, 50)),
+                    "p99_ms": float(np.percentile(lat, 99)),
+                    "build_s": build_s,
+                })
+    return rows
+
+
+def recommend(rows: List[Dict], target: float) -> Tuple[Dict, bool]:
+    ok = [r for r in rows if r["recall"] >= target]
+    if ok:
+        return min(ok, key=lambda r: (r["p99_ms"], r["M"], r["construction_ef"])), True
+    return max(rows, key=lambda r: (r["recall"], -r["p99_ms"])), False
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--queries", type=int, default=200, help="number of sampled query vectors")
+    ap.add_argument("--space", default=None, help="l2|cosine|ip (default: VECTORDB_SPACE)")
+    ap.add_argument("--target-recall", type=float, default=0.95)
+    ap.add_argument("--synthetic", type=int, default=0, help="use N random 384-d vectors instead of the corpus")
+    ap.add_argument("--m", default="8,16,32")
+    ap.add_argument("--construction-ef", default="100,200")
+    ap.add_argument("--search-ef", default="10,32,64,128")
+    args = ap.parse_args()
+
+    from app.core.config import get_settings
+
+    space = args.space or get_settings().VECTORDB_SPACE
+    rng = np.random.default_rng(17)
+    if args.synthetic:
+        data = rng.normal(size=(args.synthetic, 384)).astype(np.float32)
+    else:
+        data = load_corpus_embeddings()
+    if data.shape[0] <= args.k:
+        print(f"Corpus too small for k={args.k} ({data.shape[0]} vectors). Upload notes or pass --synthetic N.")
+        return
+
+    # queries: perturbed corpus vectors, so they are in-distribution but not exact hits
+    pick = rng.choice(data.shape[0], size=min(args.queries, data.shape[0]), replace=False)
+    noise = rng.normal(scale=0.05 * float(np.abs(data).mean()), size=(pick.size, data.shape[1]))
+    queries = (data[pick] + noise).astype(np.float32)
+    truth = exact_topk(data, queries, args.k, space)
+
+    rows = run_grid(
+        data, queries, truth, args.k, space,
+        [int(x) for x in args.m.split(",")],
+        [int(x) for x in args.construction_ef.split(",")],
+        [int(x) for x in args.search_ef.split(",")],
+    )
+
+    print(f"vectors={data.shape[0]} dim={data.shape[1]} space={space} k={args.k} queries={queries.shape[0]}")
+    print(f"{'M':>4} {'c_ef':>6} {'s_ef':>6} {'recall':>8} {'p50 ms':>8} {'p99 ms':>8} {'build s':>8}")
+    for r in rows:
+        print(f"{r['M']:>4} {r['construction_ef']:>6} {r['search_ef']:>6} {r['recall']:>8.3f} "
+              f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['build_s']:>8.2f}")
+
+    best, met = recommend(rows, args.target_recall)
+    print()
+    if not met:
+        print(f"No config reached recall {args.target_recall:.2f}; closest:")
+    else:
+        print(f"Recommended (recall>={args.target_recall:.2f}, lowest p99):")
+    print(f"VECTORDB_SPACE={space}")
+    print(f"VECTORDB_HNSW_M={best['M']}")
+    print(f"VECTORDB_HNSW_CONSTRUCTION_EF={best['construction_ef']}")
+    print(f"VECTORDB_HNSW_SEARCH_EF={best['search_ef']}")
+    print("Build params only take effect for a newly created collection.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.routers import quiz
+from app.services import quiz_bank
+from app.services.quiz_bank import QuizBank
+from app.services.quiz_prep import build_candidates
+
+# Two sections on clearly different topics
+TOPICAL = [
+    {"id": "lap", "title": "Laplace", "type": "text",
+     "content": "Laplace transform: maps a time signal to the complex frequency domain.\n"
+                "Region of convergence: values of s where the Laplace integral converges.\n"
+                "Final value theorem: limit of s times the Laplace transform as s goes to zero."},
+    {"id": "conv", "title": "Convolution", "type": "text",
+     "content": "Convolution: integral of one signal times a flipped, shifted copy of another.\n"
+                "Impulse response: output of the system when the input is a unit impulse.\n"
+                "Commutativity: convolution gives the same result in either operand order."},
+]
+
+
+@pytest.fixture
+def quiz_corpus(monkeypatch, tmp_path):
+    """
+    use(sections, bank=False) serves /quiz from `sections` instead of the notes store,
+    rule-based only (no LLM), with no quiz bank or a fresh one in tmp_path. Returns
+    build_candidates(sections); call again to swap the sections (the bank is kept).
+    """
+    def use(sections, bank=False):
+        cands = build_candidates(sections)
+        monkeypatch.setattr(quiz, "get_candidates", lambda: cands["sections"])
+        monkeypatch.setattr(quiz, "corpus_id", lambda: cands["corpus_id"])
+        monkeypatch.setattr(quiz, "candidates_by_id",
+                            lambda ids=None: {k: v for k, v in cands["sections"].items() if not ids or k in ids})
+        monkeypatch.setattr(quiz, "get_notes_store", lambda: SimpleNamespace(section_ids=lambda: list(cands["sections"])))
+        monkeypatch.setattr(quiz.llm, "llm_enabled", lambda: False)
+        if not bank:
+            monkeypatch.setattr(quiz_bank, "get_bank", lambda: None)
+        elif quiz_bank._bank is None or quiz_bank._bank.path != str(tmp_path / "bank.sqlite3"):
+            monkeypatch.setattr(quiz_bank, "_bank", QuizBank(str(tmp_path / "bank.sqlite3")))
+        return cands
+
+    return use
+
+
+@pytest.fixture
+def topical_bank(quiz_corpus):
+    """TOPICAL as the notes, with the bank filled: (candidates, section id -> banked questions)."""
+    cands = quiz_corpus(TOPICAL, bank=True)
+    asyncio.run(quiz.refresh_bank())
+    return cands, quiz_bank.get_bank().get({k: v["hash"] for k, v in cands["sections"].items()})
@@ -0,0 +1,31 @@
+import re
+
+from app.services.compress import compress, split_units
+from app.services.rag import estimate_tokens
+
+VOCAB = ["pole", "stable", "laplace", "bode", "gain", "phase", "nyquist", "transform"]
+
+
+def bag_of_words(texts):
+    return [[len(re.findall(w, t.lower())) + 0.01 for w in VOCAB] for t in texts]
+
+
+NOTES = "\n".join(
+    [f"Filler line {i} about course logistics and office hours." for i in range(60)]
+    + ["A system is stable when every pole lies in the left half-plane."]
+    + [f"More filler {i} on grading policy and deadlines." for i in range(60)]
+    + ["The Bode plot shows gain and phase against frequency."]
+)
+
+
+def test_keeps_query_relevant_units_in_order_under_budget():
+    out = compress(NOTES, "when is a pole stable", budget_tokens=60, embed=bag_of_words)
+    assert estimate_tokens(out) <= 60 + len(split_units(out))  # newline joins only
+    lines = out.split("\n")
+    assert "A system is stable when every pole lies in the left half-plane." in lines  # past any prefix cut
+    positions = [NOTES.index(ln) for ln in lines]
+    assert positions == sorted(positions)  # original order kept
+
+
+def test_small_contexts_are_untouched():
+    assert compress("Short notes.", "anything", budget_tokens=100, embed=bag_of_words) == "Short notes."
@@ -0,0 +1,32 @@
+from app.services.dedupe import dedupe_sections, find_duplicates
+
+AGENDA = "Agenda: review of last week, Laplace transform properties, pole placement, Q&A. Page 3"
+BODY_A = "The Laplace transform converts a linear ODE into an algebraic equation in s, which makes solving initial value problems straightforward."
+BODY_B = "A system is BIBO stable when every pole of its transfer function lies strictly in the left half of the complex plane."
+
+
+def _secs(*texts):
+    return [{"id": f"sec-{i+1}", "title": f"Section {i+1}", "type": "text", "content": t} for i, t in enumerate(texts)]
+
+
+def test_repeated_header_is_detected_despite_page_number():
+    dups = find_duplicates([AGENDA, BODY_A, AGENDA.replace("Page 3", "Page 7"), BODY_B])
+    assert dups == {2: 0}
+
+
+def test_drop_mode_removes_duplicates_everywhere():
+    notes, to_index, stats = dedupe_sections(_secs(AGENDA, BODY_A, AGENDA, BODY_B), mode="drop")
+    assert [s["id"] for s in notes] == ["sec-1", "sec-2", "sec-4"]
+    assert notes == to_index
+    assert stats["duplicates"] == 1 and stats["chars_skipped"] == len(AGENDA)
+
+
+def test_merge_mode_keeps_note_but_skips_embedding():
+    notes, to_index, _ = dedupe_sections(_secs(AGENDA, BODY_A, AGENDA), mode="merge")
+    assert [s["id"] for s in to_index] == ["sec-1", "sec-2"]
+    assert notes[2]["dup_of"] == "sec-1"
+
+
+def test_distinct_sections_are_kept():
+    notes, to_index, stats = dedupe_sections(_secs(BODY_A, BODY_B), threshold=0.85)
+    assert len(to_index) == 2 and stats["duplicates"] == 0
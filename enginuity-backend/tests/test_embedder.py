@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import embedder
+from app.services.embedder import OnnxEmbeddingFunction
+
+PAD = 0
+
+
+class StubTokenizer:
+    """One id per word (its length), padded to the longest text in the batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode_batch(self, texts):
+        self.batches.append(list(texts))
+        ids = [[len(w) for w in t.split()] for t in texts]
+        width = max(len(x) for x in ids)
+        return [SimpleNamespace(ids=x + [PAD] * (width - len(x)), attention_mask=[1] * len(x) + [0] * (width - len(x)))
+                for x in ids]
+
+
+class StubSession:
+    """Hidden state per token: [id, 1]; padding positions get junk that pooling must ignore."""
+
+    def run(self, _outputs, feed):
+        assert "token_type_ids" in feed
+        ids = feed["input_ids"].astype(np.float32)
+        hidden = np.stack([ids, np.ones_like(ids)], axis=-1)
+        hidden[feed["attention_mask"] == 0] = 1e6
+        return [hidden]
+
+
+def _embedder():
+    fn = object.__new__(OnnxEmbeddingFunction)  # skip loading a model
+    fn._session = StubSession()
+    fn._tokenizer = StubTokenizer()
+    fn._input_names = {"input_ids", "attention_mask", "token_type_ids"}
+    return fn
+
+
+def test_mean_pooling_normalization_and_order(monkeypatch):
+    monkeypatch.setattr(embedder, "BATCH_SIZE", 2)
+    fn = _embedder()
+    texts = ["aaaa bb cccccc", "x", "yyy zz", "qqqq"]
+    out = fn(texts)
+
+    # batches are built shortest first; results come back in input order
+    assert fn._tokenizer.batches == [["x", "qqqq"], ["yyy zz", "aaaa bb cccccc"]]
+    for text, vec in zip(texts, out):
+        lens = [len(w) for w in text.split()]
+        expected = np.array([np.mean(lens), 1.0], dtype=np.float32)  # padding excluded from the mean
+        expected /= np.linalg.norm(expected)
+        assert vec.dtype == np.float32
+        assert np.allclose(vec, expected, atol=1e-6)
+        assert np.isclose(np.linalg.norm(vec), 1.0)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="onxx"):
+        embedder.build_embedder("onxx")
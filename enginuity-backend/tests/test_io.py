@@ -0,0 +1,62 @@
+import gzip
+import json
+import logging
+import os
+
+import pytest
+
+from app.core.config import get_settings
+from app.services import io
+from app.services.io import read_json, sidecar_path, write_json
+
+DOC = {"lecture_title": "Signals – Ω", "sections": [{"id": "sec-1", "content": "Poles and zeros."}]}
+
+
+def test_write_is_compact_and_round_trips(tmp_path):
+    path = tmp_path / "notes.json"
+    write_json(path, DOC)
+    raw = path.read_bytes()
+    assert b"\n" not in raw and b", " not in raw
+    assert json.loads(raw) == DOC and read_json(path, {}) == DOC
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.json"]
+
+
+def test_failed_write_keeps_old_file_and_cleans_up(tmp_path, monkeypatch):
+    path = tmp_path / "notes.json"
+    write_json(path, DOC)
+
+    def boom(*_):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(io.os, "replace", boom)
+    with pytest.raises(OSError):
+        write_json(path, {"sections": []})
+    assert read_json(path, {}) == DOC
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.json"]
+
+
+def test_corrupt_file_is_logged(tmp_path, caplog):
+    path = tmp_path / "notes.json"
+    path.write_text('{"sections": [', encoding="utf-8")
+    with caplog.at_level(logging.ERROR, logger="enginuity.io"):
+        assert read_json(path, {"default": True}) == {"default": True}
+    assert "could not parse" in caplog.text
+
+
+def test_sidecar_for_large_docs(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "JSON_SIDECAR_MIN_KB", 1)
+    path = tmp_path / "notes.json"
+    big = {"sections": [{"id": f"sec-{i}", "content": "x" * 100} for i in range(50)]}
+    write_json(path, big)
+    side = sidecar_path(path)
+    assert json.loads(gzip.decompress(side.read_bytes())) == big
+    path.write_text(json.dumps(DOC))  # written behind write_json's back, sidecar looks as new
+    os.utime(side, (path.stat().st_mtime + 1,) * 2)
+    assert read_json(path, {}) == DOC  # the JSON always wins while it parses
+    path.write_text("not json")
+    assert read_json(path, {}) == big  # corrupt or missing JSON: the sidecar is the backup
+    path.unlink()
+    assert read_json(path, {}) == big
+
+    write_json(path, DOC)  # below the threshold: the sidecar would be stale
+    assert not side.exists() and read_json(path, {}) == DOC
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.llm import LLMClient, LLMError, LLMTimeout, fake_handler
+
+
+def _ok(text: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+
+
+def _run(coro_fn, transport, **kwargs):
+    async def main():
+        client = LLMClient(base_url="http://llm.test/v1", transport=transport, **kwargs)
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_retries_429_and_5xx_then_succeeds():
+    statuses = iter([429, 503])
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        code = next(statuses, 200)
+        return _ok("fine") if code == 200 else httpx.Response(code, headers={"retry-after": "0"})
+
+    text = _run(lambda c: c.complete([{"role": "user", "content": "hi"}]), httpx.MockTransport(handler))
+    assert text == "fine" and calls == ["/v1/chat/completions"] * 3
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(400, json={"error": "bad"})
+
+    with pytest.raises(LLMError):
+        _run(lambda c: c.complete([]), httpx.MockTransport(handler))
+    assert len(calls) == 1
+
+
+def test_deadline_covers_retries():
+    def handler(request):
+        return httpx.Response(503, headers={"retry-after": "5"})
+
+    with pytest.raises(LLMTimeout):
+        _run(lambda c: c.complete([]), httpx.MockTransport(handler), timeout_s=0.5)
+
+
+def test_semaphore_caps_in_flight_calls():
+    state = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        state["now"] += 1
+        state["peak"] = max(state["peak"], state["now"])
+        await asyncio.sleep(0.02)
+        state["now"] -= 1
+        return _ok("x")
+
+    async def many(client):
+        return await asyncio.gather(*(client.complete([]) for _ in range(10)))
+
+    assert _run(many, httpx.MockTransport(handler), concurrency=3) == ["x"] * 10
+    assert state["peak"] == 3
+
+
+def test_fake_transport_streams_deltas():
+    async def collect(client):
+        msgs = [{"role": "user", "content": "Context: ...\n\nQuestion: what is a pole"}]
+        return [d async for d in client.stream(msgs)], await client.complete(msgs)
+
+    deltas, full = _run(collect, httpx.MockTransport(fake_handler), model="m")
+    assert "".join(deltas) == full == "[stub:m] Question: what is a pole"
+    assert json.loads(_run(lambda c: c.complete([], response_format={"type": "json_object"}),
+                           httpx.MockTransport(fake_handler))) == {"items": []}
@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+
+from app.services import llm
+from app.services.llm_cache import EVICT_EVERY, ResponseCache, cache_key
+
+
+def test_ttl_and_lru_size_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=60, max_bytes=250)
+    k = cache_key("m", 0.2, [{"role": "user", "content": "q"}])
+    assert k != cache_key("m", 0.3, [{"role": "user", "content": "q"}])
+    cache.put(k, "answer")
+    assert cache.get(k) == "answer" and cache.get("missing") is None
+
+    for i in range(40):  # 40 x 100 bytes >> 250; eviction runs every few puts
+        cache.put(f"k{i}", "x" * 100)
+    stats = cache.stats()
+    assert stats["bytes"] <= 250 + 100 * EVICT_EVERY and cache.get("k39") == "x" * 100
+    assert cache.get(k) is None  # least recently used went first
+
+    stale = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=0, max_bytes=250)
+    assert stale.get("k39") is None
+
+
+def test_complete_serves_repeats_from_cache_unless_no_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"reply {len(calls)}"}}]})
+
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=60, max_bytes=1 << 20)
+    monkeypatch.setattr(llm, "get_cache", lambda: cache)
+    monkeypatch.setattr(llm, "build_client", lambda: llm.LLMClient(transport=httpx.MockTransport(handler)))
+    msgs = [{"role": "system", "content": "sys"}, {"role": "user", "content": "same prompt"}]
+
+    async def run():
+        first = await llm.complete(msgs)
+        again = await llm.complete(msgs)
+        fresh = await llm.complete(msgs, no_cache=True)
+        after = await llm.complete(msgs)
+        await llm.aclose()
+        return first, again, fresh, after
+
+    assert asyncio.run(run()) == ("reply 1", "reply 1", "reply 2", "reply 2")
+    assert len(calls) == 2
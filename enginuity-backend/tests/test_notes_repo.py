@@ -0,0 +1,35 @@
+from sqlalchemy import event
+
+from app.services import notes_store
+from app.services.io import NotesRepository
+from app.services.notes_store import NotesStore
+
+SECTIONS = [{"id": "sec-1", "title": "Intro", "type": "text", "content": "Poles and zeros."}]
+
+
+def test_hot_reads_do_no_io_and_writes_invalidate(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'notes.sqlite3'}"
+    store = NotesStore(url)
+    monkeypatch.setattr(notes_store, "_store", store)
+    repo = NotesRepository()
+    statements = []
+    event.listen(store.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    empty = repo.snapshot()
+    assert empty.doc is None and empty.status["ready"] is False
+    lecture_id = store.save_lecture("Signals", 1, [dict(s) for s in SECTIONS])
+
+    snap = repo.snapshot()  # this process wrote: reloaded straight away
+    assert snap.status == {"ready": True, "lecture_id": lecture_id, "lecture_title": "Signals",
+                           "generated_at": 1, "sections": 1, "lectures": 1}
+    assert list(snap.by_id) == [f"L{lecture_id}-sec-1"]
+    statements.clear()
+    for _ in range(1000):
+        assert repo.snapshot() is snap
+    assert statements == [] and repo.loads == 2
+
+    # another process writes: noticed at the next version recheck
+    NotesStore(url).save_lecture("Control", 2, [dict(s) for s in SECTIONS])
+    assert repo.snapshot() is snap
+    snap.checked_at -= 60
+    assert repo.snapshot().status["lecture_title"] == "Control"
@@ -0,0 +1,69 @@
+from app.services.notes_store import NotesStore
+
+
+def _sections(prefix):
+    return [
+        {"id": "sec-1", "title": f"{prefix} intro", "type": "text", "content": f"{prefix} body one"},
+        {"id": "sec-2", "title": f"{prefix} code", "type": "code", "language": "python", "content": "print(1)", "page": 3},
+        {"id": "sec-3", "title": f"{prefix} dup", "type": "text", "content": f"{prefix} body one", "dup_of": "sec-1"},
+    ]
+
+
+def test_lectures_are_kept_side_by_side_with_unique_section_ids(tmp_path):
+    store = NotesStore(f"sqlite:///{tmp_path / 'notes.sqlite3'}")
+    first = _sections("Signals")
+    to_index = first[:2]  # same dicts, as the upload pipeline passes them on
+    a = store.save_lecture("Signals", 100, first, [{"filename": "a.pdf", "bytes": 10}])
+    b = store.save_lecture("Control", 200, _sections("Control"))
+
+    assert [s["id"] for s in to_index] == [f"L{a}-sec-1", f"L{a}-sec-2"]
+    assert first[2]["dup_of"] == f"L{a}-sec-1"
+    assert [lec["title"] for lec in store.lectures()] == ["Control", "Signals"]
+    assert store.doc()["lecture_id"] == b  # newest lecture is the active one
+    old = store.doc(a)
+    assert old["lecture_title"] == "Signals" and old["sections"] == first  # extra keys round-trip
+    assert store.uploads(a) == [{"filename": "a.pdf", "kind": "doc", "bytes": 10, "created_at": store.uploads(a)[0]["created_at"]}]
+    assert len(store.sections(a)) + len(store.sections(b)) == 6
+
+
+def test_new_lectures_bump_the_version_and_leave_others_alone(tmp_path):
+    store = NotesStore(f"sqlite:///{tmp_path / 'notes.sqlite3'}")
+    a = store.save_lecture("Signals", 100, _sections("Signals"))
+    before, v = store.doc(a), store.version()
+
+    b = store.save_lecture("Control", 200, _sections("Control"))
+    assert store.version() == v + 1 and store.writes == 2
+    assert store.doc(a) == before
+    assert store.section(f"L{b}-sec-1")["content"] == "Control body one"
+    assert store.section("L99-sec-1") is None
+
+
+def test_notes_outline_pages_and_section_fetch(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import notes_store
+    from app.services.io import get_notes_repo
+
+    store = NotesStore(f"sqlite:///{tmp_path / 'notes.sqlite3'}")
+    monkeypatch.setattr(notes_store, "_store", store)
+    a = store.save_lecture("Signals", 100, _sections("Signals"))
+    b = store.save_lecture("Control", 200, _sections("Control"))
+    get_notes_repo().invalidate()  # the shared snapshot may come from another test's store
+    client = TestClient(app)
+
+    for lecture in (None, a):  # active lecture from memory, older one from the store
+        params = {"outline": "true", "offset": 1, "limit": 1}
+        if lecture is not None:
+            params["lecture_id"] = lecture
+        doc = client.get("/notes", params=params).json()
+        lid = lecture or b
+        assert doc["total"] == 3 and doc["offset"] == 1 and doc["lecture_id"] == lid
+        assert doc["sections"] == [{"id": f"L{lid}-sec-2", "title": doc["sections"][0]["title"], "type": "code",
+                                    "language": "python", "n_chars": 8}]
+
+    assert len(client.get("/notes").json()["sections"]) == 3  # full documents are unchanged
+    assert client.get(f"/notes/L{a}-sec-2").json()["content"] == "print(1)"
+    assert client.get(f"/notes/L{b}-sec-1").json()["content"] == "Control body one"
+    assert client.get("/notes/L9-sec-1").status_code == 404
+    assert client.get("/notes/lectures").json()[0]["id"] == b
@@ -0,0 +1,83 @@
+import asyncio
+
+from app.models.schemas import QuizRequest
+from app.routers import quiz
+from app.services import quiz_bank
+from app.services.quiz_bank import QuizBank, sample
+
+SECTIONS = [
+    {"id": f"sec-{i}", "title": f"Topic {i}", "type": "text",
+     "content": f"Stability margin {i}: distance from the critical point in the Nyquist plot.\n"
+                f"Phase margin {i}: extra phase lag tolerated before instability occurs.\n"
+                f"Bandwidth {i} = frequency where the closed-loop gain drops by three decibels.\n"
+                f"Settling time {i}: time for the response to stay within two percent of final value."}
+    for i in range(1, 5)
+]
+
+
+def _mcq(q):
+    return {"q": q, "choices": ["a", "b", "c", "d"], "answer": "a", "explanation": None}
+
+
+def _fib(q):
+    return {"q": q, "choices": [], "answer": "x", "explanation": None}
+
+
+def test_stale_hashes_and_difficulty_filtering(tmp_path):
+    bank = QuizBank(str(tmp_path / "bank.sqlite3"))
+    bank.put_many([
+        ("s1", "h1", "auto", "rule", [_mcq("rule q1")]),
+        ("s2", "h2", "hard", "llm", [_mcq("hard q2")]),
+        ("s3", "old", "auto", "rule", [_mcq("stale q3")]),
+    ])
+    hashes = {"s1": "h1", "s2": "h2", "s3": "new"}
+    assert set(bank.get(hashes, "auto")) == {"s1", "s2"}  # s3 changed since it was banked
+    assert set(bank.get(hashes, "hard")) == {"s1", "s2"}  # rule rows match any difficulty
+    assert set(bank.get(hashes, "easy")) == {"s1"}
+    assert bank.prune({"s1": "h1", "s2": "h2"}, keep={"s3"}) == 0  # s3 is from an earlier lecture
+    assert bank.prune(hashes) == 1 and bank.stats()["rows"] == 2
+
+
+def test_sample_respects_type_and_spreads_over_sections():
+    pools = {f"s{i}": [_mcq(f"m{i}{j}") for j in range(3)] + [_fib(f"f{i}{j}") for j in range(3)] for i in range(5)}
+    mcq = sample(pools, 5, "mcq")
+    assert len(mcq) == 5 and all(it["choices"] for it in mcq)
+    assert len({it["q"][1] for it in mcq}) == 5  # one per section before any repeats
+    mix = sample(pools, 10, "mix")
+    assert sum(bool(it["choices"]) for it in mix) == 6
+    assert len(sample({"s": [_fib("only")]}, 3, "mix")) == 1
+
+
+def test_quiz_served_from_bank_and_regenerated_when_section_changes(quiz_corpus, monkeypatch):
+    quiz_corpus(SECTIONS, bank=True)
+    bank = quiz_bank.get_bank()
+
+    assert asyncio.run(quiz.refresh_bank())["filled"] == 4
+    generated = []
+    with monkeypatch.context() as m:
+        m.setattr(quiz, "rule_based_from_candidates", lambda *a: generated.append(a) or [])
+        items = asyncio.run(quiz._generate_quiz(QuizRequest(n=4, type="mcq"), 4, "mcq", "auto"))
+    assert len(items) == 4 and all(len(it.choices) == 4 for it in items)
+    assert generated == []  # nothing generated inside the request
+
+    changed = dict(SECTIONS[0], content=SECTIONS[0]["content"].replace("Nyquist", "Bode"))
+    cands = quiz_corpus([changed] + SECTIONS[1:], bank=True)["sections"]
+    assert set(bank.get({k: v["hash"] for k, v in cands.items()})) == {"sec-2", "sec-3", "sec-4"}
+    assert asyncio.run(quiz.refresh_bank()) == {"pruned": 1, "filled": 1}
+
+
+
+def test_topic_narrows_banked_questions_to_matching_sections(topical_bank, monkeypatch):
+    _, banked = topical_bank
+
+    def quiz_on(topic):
+        items = asyncio.run(quiz._generate_quiz(QuizRequest(n=2, type="mcq", topic=topic), 2, "mcq", "auto"))
+        return {it.q for it in items}
+
+    laplace, conv = quiz_on("Laplace transform"), quiz_on("Convolution")
+    assert laplace and laplace <= {it["q"] for it in banked["lap"]}
+    assert conv and conv <= {it["q"] for it in banked["conv"]}
+    generated = []
+    monkeypatch.setattr(quiz, "_from_bank", lambda *a: generated.append(a))
+    quiz_on("Bode plot")  # nothing in the notes is about it: not sampled from the bank
+    assert generated == []
@@ -0,0 +1,52 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import quiz
+
+SECTIONS = [
+    {"id": f"sec-{i}", "title": f"Topic {i}", "type": "text",
+     "content": f"Phase margin {i}: extra phase lag tolerated before the loop becomes unstable.\n"
+                f"Bandwidth {i} = frequency where the closed-loop gain falls by three decibels.\n"
+                f"Overshoot {i}: peak excess of the step response over its final value."}
+    for i in range(1, 4)
+]
+
+def test_batch_streams_one_ndjson_line_per_spec_and_loads_notes_once(quiz_corpus, monkeypatch):
+    cands = quiz_corpus(SECTIONS)
+    loads = []
+    monkeypatch.setattr(quiz, "get_candidates", lambda: loads.append(1) or cands["sections"])
+
+    body = {
+        "corpus_id": cands["corpus_id"],
+        "quizzes": [
+            {"n": 3, "type": "mcq", "topic": "stability"},
+            {"n": 2, "type": "fib", "section_ids": ["sec-2"]},
+            {"n": 2, "section_ids": ["sec-99"]},
+        ],
+    }
+    with TestClient(app) as client:
+        r = client.post("/quiz/batch", json=body)
+        assert r.status_code == 200 and r.headers["content-type"].startswith("application/x-ndjson")
+        lines = {d["index"]: d for d in map(json.loads, r.text.splitlines())}
+        assert loads == [1]  # one notes lookup for the whole batch
+        stale = client.post("/quiz/batch", json={**body, "corpus_id": "old"})
+
+    assert sorted(lines) == [0, 1, 2]
+    assert len(lines[0]["items"]) == 3 and all(len(it["choices"]) == 4 for it in lines[0]["items"])
+    assert len(lines[1]["items"]) == 2 and all(not it["choices"] for it in lines[1]["items"])
+    assert lines[2]["error"]["status_code"] == 404
+    assert stale.status_code == 409
+
+
+def test_batch_topics_draw_from_their_own_sections_with_the_bank_on(topical_bank):
+    cands, banked = topical_bank
+
+    specs = [{"n": 2, "type": "mcq", "topic": t, "section_ids": ["lap", "conv"]} for t in ("Laplace transform", "Convolution")]
+    with TestClient(app) as client:
+        r = client.post("/quiz/batch", json={"corpus_id": cands["corpus_id"], "quizzes": specs})
+    lines = {d["index"]: d for d in map(json.loads, r.text.splitlines())}
+    for i, sid in enumerate(("lap", "conv")):
+        qs = {it["q"] for it in lines[i]["items"]}
+        assert qs and qs <= {it["q"] for it in banked[sid]}
@@ -0,0 +1,54 @@
+import re
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.schemas import QuizRequest
+from app.routers import quiz
+from app.routers.quiz import preprocess_context, rule_based_from_candidates, rule_based_generate
+from app.services.quiz_prep import CONTACT_PATTERNS, build_candidates, looks_like_contact_or_greeting, section_text
+
+SECTIONS = [
+    {"id": "sec-1", "title": "Stability", "type": "text",
+     "content": "Dear students,\nStability: all poles lie in the left half-plane.\n"
+                "Email me at prof@uni.edu with questions.\nGain margin = distance to instability at the crossover."},
+    {"id": "sec-2", "title": "Transforms", "type": "latex",
+     "content": "Laplace transform: converts differential equations into algebraic ones.\nZ-transform = discrete analogue."},
+    {"id": "sec-3", "title": "Dup", "type": "text", "content": "Stability: all poles lie in the left half-plane.", "dup_of": "sec-1"},
+]
+
+
+def test_combined_contact_regex_matches_pattern_by_pattern():
+    lines = ["Dear all", "Best regards, Sam", "Call +1 555", "see https://x.io", "Poles and zeros", "Hiring team note",
+             "Z = (s+1)/(s+2)", "contact hours moved", "hello world", "phi = 0", "thank you", "LinkIn", "bestseller",
+             "phoneme", "addresses", "(555) 555-5555", "555-555-5555", "a.b@c.org", "hiring", "hiring the teams", "hi"]
+    for ln in lines:
+        expected = any(re.search(p, ln.lower()) for p in CONTACT_PATTERNS)
+        assert looks_like_contact_or_greeting(ln) == expected, ln
+
+
+def test_precomputed_candidates_give_the_same_quiz_as_raw_text():
+    kept = [s for s in SECTIONS if not s.get("dup_of")]
+    context = preprocess_context("\n\n".join(section_text(s) for s in kept))
+    preps = list(build_candidates(SECTIONS)["sections"].values())
+    assert len(preps) == 2  # duplicates are not quiz material
+    for qtype in ("mcq", "fib", "mix"):
+        assert rule_based_from_candidates(preps, 4, qtype) == rule_based_generate(context, 4, qtype)
+
+
+def test_section_ids_resolve_server_side_against_the_current_corpus(monkeypatch):
+    cands = build_candidates(SECTIONS)
+    edited = build_candidates([dict(SECTIONS[0], content="Poles: roots of the denominator."), *SECTIONS[1:]])
+    assert cands["corpus_id"] != edited["corpus_id"]
+    monkeypatch.setattr(quiz, "candidates_by_id", lambda ids=None: {k: cands["sections"][k] for k in ids or cands["sections"]})
+    monkeypatch.setattr(quiz, "corpus_id", lambda: cands["corpus_id"])
+
+    req = QuizRequest(section_ids=["sec-2"], corpus_id=cands["corpus_id"])
+    assert list(quiz._resolve_sections(req)) == ["sec-2"]
+    with pytest.raises(HTTPException) as stale:
+        quiz._resolve_sections(QuizRequest(section_ids=["sec-2"], corpus_id=edited["corpus_id"]))
+    assert stale.value.status_code == 409
+    monkeypatch.setattr(quiz, "candidates_by_id", lambda ids=None: {})
+    with pytest.raises(HTTPException) as unknown:
+        quiz._resolve_sections(QuizRequest(section_ids=["sec-99"]))
+    assert unknown.value.status_code == 404
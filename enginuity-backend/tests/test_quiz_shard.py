@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from app.models.schemas import QuizItem
+from app.routers import quiz
+
+
+def _item(q: str) -> QuizItem:
+    return QuizItem(q=q, answer="x")
+
+
+def test_sharded_generation_runs_in_parallel_and_dedupes(monkeypatch):
+    calls = []
+
+    async def fake_generate(context, n, qtype, difficulty, **kw):
+        calls.append((context.splitlines()[0], n))
+        await asyncio.sleep(0.2)
+        # every shard also returns the same shared question (modulo case/punctuation)
+        return [_item("What is STABILITY?")] + [_item(f"{context.splitlines()[0]} q{i}") for i in range(n - 1)]
+
+    monkeypatch.setattr(quiz, "llm_generate", fake_generate)
+    monkeypatch.setattr(quiz, "compress", lambda text, query="", budget_tokens=0: text)
+    context = "\n".join(f"line {i}: " + "word " * 20 for i in range(40))
+
+    t0 = time.perf_counter()
+    items = asyncio.run(quiz.llm_generate_sharded(context, 20, "mix", "mixed"))
+    elapsed = time.perf_counter() - t0
+
+    assert len(calls) == 4  # ceil(20 / QUIZ_SHARD_ITEMS)
+    assert elapsed < 0.6  # shards overlap instead of 4 x 0.2 s back to back
+    assert len(items) == 20
+    stems = [quiz._stem_key(it.q) for it in items]
+    assert len(set(stems)) == len(stems)
+    assert sum(s == "what is stability" for s in stems) == 1
+
+
+def test_small_quiz_is_a_single_call(monkeypatch):
+    calls = []
+
+    async def fake_generate(context, n, qtype, difficulty, **kw):
+        calls.append(n)
+        return [_item(f"q{i}") for i in range(n)]
+
+    monkeypatch.setattr(quiz, "llm_generate", fake_generate)
+    monkeypatch.setattr(quiz, "compress", lambda text, query="", budget_tokens=0: text)
+    items = asyncio.run(quiz.llm_generate_sharded("a: line one\nb: line two\nc: line three", 5, "mix", "mixed"))
+    assert calls == [5] and len(items) == 5
+
+
+def test_shard_lines_keeps_order_and_balances():
+    lines = [f"l{i} " + "x" * 50 for i in range(10)]
+    shards = quiz._shard_lines(lines, 3)
+    assert len(shards) == 3
+    assert [ln for s in shards for ln in s] == lines
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
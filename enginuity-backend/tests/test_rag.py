@@ -0,0 +1,45 @@
+import asyncio
+
+from app.services.rag import estimate_tokens, local_answer, pack_context
+
+HITS = [
+    {"section_id": "sec-1", "source": "L1", "score": 0.9,
+     "content": "A system is stable if all poles lie in the left half-plane. " * 20},
+    {"section_id": "sec-2", "source": "L1", "score": 0.8,
+     "content": "The Laplace transform turns ODEs into algebra. " * 20},
+    {"section_id": "sec-3", "source": "L1", "score": 0.7, "content": "Bode plots show gain and phase. " * 20},
+]
+
+
+def test_pack_context_respects_budget_and_numbers_blocks():
+    context, packed = pack_context(HITS, budget_tokens=400)
+    assert estimate_tokens(context) <= 400 + 20  # block headers are the only overhead
+    assert [h["section_id"] for h in packed] == ["sec-1", "sec-2"]
+    assert context.startswith("[1] (L1 · sec-1)") and "[2] (L1 · sec-2)" in context
+    assert packed[-1]["content"].endswith("…")  # second block clipped to fit
+
+
+def test_local_answer_cites_overlapping_sentences_only():
+    _, packed = pack_context(HITS, budget_tokens=2000)
+    text = local_answer("When are poles stable?", packed)
+    assert "[1]" in text and "Laplace" not in text
+
+
+def test_stream_answer_sends_citations_then_tokens_then_done(monkeypatch):
+    from app.services import rag
+
+    monkeypatch.setattr(rag, "retrieve", lambda q, k, carry=(): HITS[:k])
+    monkeypatch.setattr(rag.llm, "llm_enabled", lambda: False)
+
+    async def run():
+        events = [e async for e in rag.stream_answer("When are poles stable?", [], top_k=2, temperature=0.2)]
+        return events, await rag.answer("When are poles stable?", [], 2, 0.2)
+
+    events, full = asyncio.run(run())
+
+    kinds = [k for k, _ in events]
+    assert kinds[0] == "citations" and kinds[-1] == "done"
+    assert set(kinds[1:-1]) == {"token"}
+    text = "".join(t for k, t in events if k == "token")
+    assert text == full["text"]
+    assert events[-1][1]["timings"]["ttft_ms"] >= events[-1][1]["timings"]["retrieval_ms"]
@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+
+from app.services.rerank import mmr_select
+
+
+def test_mmr_zero_diversity_is_relevance_order():
+    q = [1.0, 0.0]
+    cands = [[0.2, 1.0], [1.0, 0.0], [0.7, 0.7]]
+    assert mmr_select(q, cands, 3, diversity=0.0) == [1, 2, 0]
+
+
+def test_mmr_skips_near_duplicates():
+    q = [1.0, 0.0, 0.0]
+    cands = [
+        [1.0, 0.05, 0.0],
+        [1.0, 0.06, 0.0],   # near-duplicate of 0
+        [0.6, 0.0, 0.8],    # less relevant but novel
+    ]
+    assert mmr_select(q, cands, 2, diversity=0.5) == [0, 2]
+
+
+def test_mmr_fifty_candidates_is_sub_millisecond():
+    rng = np.random.default_rng(0)
+    q = rng.normal(size=384)
+    cands = rng.normal(size=(50, 384))
+    mmr_select(q, cands, 10, diversity=0.5)  # warm up
+    t0 = time.perf_counter()
+    for _ in range(20):
+        out = mmr_select(q, cands, 10, diversity=0.5)
+    per_call = (time.perf_counter() - t0) / 20
+    assert len(set(out)) == 10
+    assert per_call < 1e-3
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.search import _encode_cursor
+from app.services import vector
+
+client = TestClient(app)
+
+
+def test_cursor_pages_through_cached_candidates(monkeypatch):
+    calls = []
+
+    def fake_search(q, top_k=5, diversity=0.0):
+        calls.append(q)
+        return [vector._hit(f"doc {i}", {"section_id": f"sec-{i}", "title": "Notes"}, 0.1) for i in range(7)]
+
+    monkeypatch.setattr(vector, "search", fake_search)
+    vector.invalidate_search_cache()
+
+    seen, cursor = [], None
+    while True:
+        page = client.post("/search", json={"q": "stability", "top_k": 3, "cursor": cursor}).json()
+        assert page["total"] == 7
+        seen += [h["section_id"] for h in page["hits"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"sec-{i}" for i in range(7)]
+    assert calls == ["stability"]  # later pages come from the cached list
+
+
+def test_bad_cursors_are_rejected(monkeypatch):
+    monkeypatch.setattr(vector, "search", lambda q, top_k=5, diversity=0.0: [])
+    list_id, _ = vector.search_candidates("stability")
+    for cursor in ("not-a-cursor", _encode_cursor(list_id, -2), _encode_cursor(list_id, 10**6)):
+        r = client.post("/search", json={"q": "", "cursor": cursor})
+        assert r.status_code == 400
+    assert client.post("/search", json={"q": "", "cursor": _encode_cursor("gone", 0)}).status_code == 410
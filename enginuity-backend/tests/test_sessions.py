@@ -0,0 +1,30 @@
+from app.services.sessions import SessionStore, record_turn
+
+
+def test_window_rolls_older_questions_into_summary():
+    store = SessionStore(maxsize=8, ttl=60)
+    sess = store.get_or_create(None)
+    for i in range(6):
+        record_turn(sess, f"question {i}", f"answer {i}", [{"section_id": f"s{i}", "content": "x"}])
+    assert len(sess["window"]) <= 6 and sess["window"][-1]["content"] == "answer 5"
+    assert "question 0" in sess["summary"] and "question 5" not in sess["summary"]
+    assert [h["section_id"] for h in sess["sections"]] == ["s5"]  # only the last turn is carried
+
+
+def test_sqlite_write_through_survives_memory_eviction(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    store = SessionStore(maxsize=1, ttl=60, db_path=db)
+    first = store.get_or_create(None)
+    store.save(record_turn(first, "what is a pole?", "a root of the denominator", []))
+    store.get_or_create(None)  # evicts `first` from memory
+
+    again = SessionStore(maxsize=1, ttl=60, db_path=db).get(first["id"])
+    assert again is not None and again["window"][0]["content"] == "what is a pole?"
+    assert store.delete(first["id"]) and store.get(first["id"]) is None
+
+
+def test_unknown_session_id_is_not_adopted():
+    store = SessionStore(maxsize=8, ttl=60)
+    sess = store.get_or_create("client-chosen")
+    assert sess["id"] != "client-chosen" and store.get("client-chosen") is None
+    assert store.get_or_create(sess["id"]) is sess
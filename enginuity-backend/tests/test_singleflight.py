@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight, fingerprint
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight("t")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return {"items": [1, 2, 3]}
+
+    async def main():
+        key = fingerprint(6, "mcq", "auto", "")
+        same = await asyncio.gather(*(flight.do(key, work) for _ in range(20)))
+        other = await flight.do(fingerprint(6, "fib", "auto", ""), work)
+        return same, other
+
+    same, other = asyncio.run(main())
+    assert len(runs) == 2 and all(r is same[0] for r in same) and other == same[0]
+    assert flight.stats() == {"calls": 21, "executed": 2, "coalesced": 19, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    flight = SingleFlight("t")
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("nope")
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", boom) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        with pytest.raises(ValueError):
+            await flight.do("k", boom)  # a new attempt, not a cached failure
+
+    asyncio.run(main())
+    assert flight.stats()["executed"] == 2
@@ -0,0 +1,99 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from app.core.config import get_settings
+from app.services import vector
+from app.services.snapshot import MAGIC, SnapshotError, export_snapshot, import_snapshot, read_snapshot
+
+
+class StubEmbedder:
+    def __call__(self, input):
+        return [np.zeros(4, dtype=np.float32) for _ in input]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "VECTORDB_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(vector, "get_embedder", StubEmbedder)
+    col = vector.collection("src", metadata={**vector.hnsw_metadata(), "hnsw:space": "cosine"})
+    embs = np.random.default_rng(0).random((3, 4), dtype=np.float32)
+    col.upsert(ids=["a", "b", "c"], documents=["one", "two", "three"],
+               metadatas=[{"section_id": s} for s in "abc"], embeddings=embs.tolist())
+    return embs
+
+
+def test_export_import_round_trip(tmp_path, index):
+    path = tmp_path / "index.snap"
+    header = export_snapshot(path, name="src")
+    assert (header["count"], header["dim"]) == (3, 4)
+
+    out = import_snapshot(path, name="dst", replace=True)
+    assert out["imported"] == 3 and out["space"] == "cosine"  # not the configured default
+    got = vector.collection("dst").get(ids=["a", "b", "c"], include=["embeddings", "documents", "metadatas"])
+    by_id = dict(zip(got["ids"], zip(got["documents"], got["metadatas"], got["embeddings"])))
+    for i, sid in enumerate("abc"):
+        doc, meta, emb = by_id[sid]
+        assert doc == ["one", "two", "three"][i] and meta == {"section_id": sid}
+        assert np.allclose(emb, index[i])
+
+
+def _rewrite_header(path, **changes):
+    raw = path.read_bytes()
+    (head_len,) = struct.unpack("<Q", raw[len(MAGIC):len(MAGIC) + 8])
+    start = len(MAGIC) + 8
+    header = json.loads(raw[start:start + head_len])
+    header.update(changes)
+    header = {k: v for k, v in header.items() if v is not None}
+    head = json.dumps(header, separators=(",", ":")).encode("utf-8").ljust(head_len)  # keep the layout
+    path.write_bytes(raw[:start] + head + raw[start + head_len:])
+
+
+@pytest.mark.parametrize("changes", [
+    {"count": None},                      # missing field
+    {"dim": "4"},                         # wrong type
+    {"embeddings_nbytes": 40},            # doesn't match count * dim * 4
+])
+def test_malformed_header_is_rejected(tmp_path, index, changes):
+    path = tmp_path / "index.snap"
+    export_snapshot(path, name="src")
+    _rewrite_header(path, **changes)
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
+
+
+def test_corrupt_or_truncated_file_is_rejected(tmp_path, index):
+    path = tmp_path / "index.snap"
+    export_snapshot(path, name="src")
+    raw = bytearray(path.read_bytes())
+    raw[-5] ^= 0xFF  # flip a byte in the records
+    path.write_bytes(bytes(raw))
+    with pytest.raises(SnapshotError, match="checksum"):
+        read_snapshot(path)
+    path.write_bytes(bytes(raw[:-10]))
+    with pytest.raises(SnapshotError, match="truncated"):
+        read_snapshot(path)
+    path.write_bytes(MAGIC + b"\x01")
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
+
+
+def test_import_refuses_other_embedder_space_or_dim(tmp_path, index, monkeypatch):
+    path = tmp_path / "index.snap"
+    export_snapshot(path, name="src")
+
+    l2 = vector.collection("euclid", metadata={**vector.hnsw_metadata(), "hnsw:space": "l2"})
+    with pytest.raises(SnapshotError, match="distance"):
+        import_snapshot(path, name="euclid")
+    wide = vector.collection("wide", metadata={**vector.hnsw_metadata(), "hnsw:space": "cosine"})
+    wide.upsert(ids=["z"], documents=["z"], embeddings=[[0.1] * 8])
+    with pytest.raises(SnapshotError, match="dimensions"):
+        import_snapshot(path, name="wide")
+    assert l2.count() == 0 and wide.count() == 1
+    assert import_snapshot(path, name="wide", replace=True)["imported"] == 3
+
+    monkeypatch.setattr(get_settings(), "EMBEDDER_LOCAL_MODEL", "some-other-model")
+    with pytest.raises(SnapshotError, match="embedder"):
+        import_snapshot(path, name="dst")
@@ -0,0 +1,32 @@
+import random
+import time
+
+from app.services.suggest import build_index
+
+SECTIONS = [
+    {"id": "sec-1", "title": "Laplace Transform", "content": "The Laplace transform maps f(t) to F(s). Laplace transform tables help."},
+    {"id": "sec-2", "title": "Stability", "content": "Stability requires poles in the left half-plane. Lyapunov stability differs."},
+]
+
+
+def test_prefix_lookup_ranks_by_frequency_and_includes_titles():
+    idx = build_index(SECTIONS, "Signals 101")
+    texts = [s["text"] for s in idx.lookup("lap")]
+    assert texts[0] == "Laplace Transform"            # title boost
+    assert "Laplace" in texts and "laplace transform" not in texts  # same text as the title
+    assert [s["text"] for s in idx.lookup("sta")] == ["Stability"]  # title and term, listed once
+    assert [s["text"] for s in idx.lookup("sig")] == ["Signals 101"]
+    assert idx.lookup("") == [] and idx.lookup("zzz") == []
+
+
+def test_lookup_is_fast_on_large_vocab():
+    rng = random.Random(0)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choices(alphabet, k=rng.randint(4, 10))) for _ in range(40000)]
+    sections = [{"id": f"sec-{i}", "title": f"Section {i}", "content": " ".join(words[i * 20 : (i + 1) * 20])}
+                for i in range(2000)]
+    idx = build_index(sections)
+    t0 = time.perf_counter()
+    for p in ("s", "se", "abc", "q", "mno"):
+        idx.lookup(p)
+    assert (time.perf_counter() - t0) / 5 < 5e-3
@@ -0,0 +1,35 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.timing import ServerTimingMiddleware, timed
+
+app = FastAPI()
+app.add_middleware(ServerTimingMiddleware)
+
+
+@timed("parse")
+def _parse():
+    return 1
+
+
+@app.get("/work")
+def work():  # sync route -> runs in the threadpool with a copied context
+    _parse()
+    with timed("embed"):
+        pass
+    with timed("embed"):
+        pass
+    return {"ok": True}
+
+
+def test_server_timing_header_collects_stages_from_threadpool():
+    r = TestClient(app).get("/work")
+    header = r.headers["server-timing"]
+    names = [part.split(";")[0].strip() for part in header.split(",")]
+    assert names == ["parse", "embed", "total"]  # repeated stages are summed
+
+
+def test_timed_is_noop_outside_requests():
+    with timed("anything"):
+        pass
+    assert _parse() == 1
@@ -118,6 +118,7 @@ with left:
                 st.write("• Building searchable index…")
                 status.update(label="Processing complete ✅", state="complete")
                 st.session_state["has_corpus"] = True
+                st.session_state["corpus_id"] = resp.json().get("corpus_id")
                 st.success("Your corpus is ready (backend).")
             except Exception as e:
                 # graceful fallback (your original simulated steps)
@@ -60,33 +60,77 @@ def _local_sample() -> Dict[str, Any]:
         ],
     }
 
-def load_notes() -> Dict[str, Any]:
+OUTLINE_PAGE = 500   # sections per /notes?outline=true request
+LIST_PAGE = 50       # titles shown in the contents list at a time
+
+def _local_doc() -> Dict[str, Any]:
+    if NOTES_JSON.exists():
+        try:
+            return json.loads(NOTES_JSON.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+    return _local_sample()
+
+def _outline_of(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Local doc -> the same shape as /notes?outline=true, with the bodies kept aside."""
+    bodies = {s.get("id"): s for s in doc.get("sections", [])}
+    sections = [{k: v for k, v in s.items() if k != "content"} | {"n_chars": len(s.get("content") or "")}
+                for s in doc.get("sections", [])]
+    return {**doc, "sections": sections, "total": len(sections), "bodies": bodies}
+
+def load_outline() -> Dict[str, Any]:
     """
-    Tries the backend first (GET /notes). Falls back to local notes.json if present,
-    otherwise returns a small in-memory sample.
+    Tries the backend first (GET /notes?outline=true, page by page: titles and
+    lengths only). Falls back to local notes.json if present, otherwise a small
+    in-memory sample. Section bodies are fetched one at a time by load_section.
     """
     # 1) Backend
     try:
         with st.spinner("Loading notes from backend…"):
-            r = httpx.get(f"{FASTAPI_URL}/notes", timeout=15.0)
-            r.raise_for_status()
-            doc = r.json()
-            if isinstance(doc, dict) and doc.get("sections"):
-                return doc
+            sections: List[Dict[str, Any]] = []
+            doc: Dict[str, Any] = {}
+            with httpx.Client(base_url=FASTAPI_URL, timeout=10.0) as client:
+                while True:
+                    r = client.get("/notes", params={"outline": "true", "offset": len(sections), "limit": OUTLINE_PAGE})
+                    r.raise_for_status()
+                    doc = r.json()
+                    sections += doc.get("sections", [])
+                    if not doc.get("sections") or len(sections) >= (doc.get("total") or 0):
+                        break
+            if sections:
+                return {**doc, "sections": sections, "total": len(sections), "bodies": {}}
     except Exception:
         pass
 
-    # 2) Local file
-    if NOTES_JSON.exists():
-        try:
-            return json.loads(NOTES_JSON.read_text(encoding="utf-8"))
-        except Exception:
-            pass
+    # 2) Local file, 3) Sample
+    return _outline_of(_local_doc())
 
-    # 3) Sample
-    return _local_sample()
-
-notes: Dict[str, Any] = load_notes()
+def load_section(outline: Dict[str, Any], section_id: str) -> Dict[str, Any]:
+    """One section with its content (GET /notes/{id}), cached for the session."""
+    if section_id in outline["bodies"]:
+        return outline["bodies"][section_id]
+    try:
+        r = httpx.get(f"{FASTAPI_URL}/notes/{section_id}", timeout=10.0)
+        r.raise_for_status()
+        sec = r.json()
+    except Exception as e:
+        sec = {"id": section_id, "title": "Unavailable", "type": "text", "content": f"Could not load this section: {e}"}
+    else:
+        outline["bodies"][section_id] = sec
+    return sec
+
+def export_markdown(lecture_id: Optional[int]) -> str:
+    r = httpx.post(f"{FASTAPI_URL}/export", json={"format": "md", "lecture_id": lecture_id}, timeout=30.0)
+    r.raise_for_status()
+    return r.json().get("content", "")
+
+# the outline is reloaded when an upload changes the corpus
+outline_key = st.session_state.get("corpus_id")
+if st.session_state.get("notes_outline_key") != outline_key or "notes_outline" not in st.session_state:
+    st.session_state["notes_outline"] = load_outline()
+    st.session_state["notes_outline_key"] = outline_key
+    st.session_state.pop("notes_md", None)
+notes: Dict[str, Any] = st.session_state["notes_outline"]
 sections: List[Dict[str, Any]] = notes.get("sections", [])
 lecture_title: str = str(notes.get("lecture_title", "Untitled"))
 generated_at: Optional[int] = notes.get("generated_at")
@@ -94,7 +138,7 @@ generated_at: Optional[int] = notes.get("generated_at")
 # Header metadata
 cols = st.columns([3, 2, 1])
 with cols[0]:
-    st.caption(f"Lecture: **{lecture_title}**")
+    st.caption(f"Lecture: **{lecture_title}** · {len(sections)} sections")
 with cols[1]:
     if generated_at:
         try:
@@ -103,11 +147,21 @@ with cols[1]:
         except Exception:
             pass
 with cols[2]:
-    # Download full markdown export (simple join)
-    md_export = "# " + lecture_title + "\n\n" + "\n\n".join(
-        [f"## {s.get('title','Untitled')}\n\n{s.get('content','')}" for s in sections]
-    )
-    st.download_button("Download .md", data=md_export, file_name="lecture-notes.md")
+    # Full markdown export, built by the backend only when asked for
+    if "notes_md" in st.session_state:
+        st.download_button("Download .md", data=st.session_state["notes_md"], file_name="lecture-notes.md")
+    elif st.button("Prepare .md"):
+        try:
+            if notes["bodies"]:  # local fallback: everything is already here
+                md = "# " + lecture_title + "\n\n" + "\n\n".join(
+                    [f"## {s.get('title','Untitled')}\n\n{s.get('content','')}" for s in notes["bodies"].values()]
+                )
+            else:
+                md = export_markdown(notes.get("lecture_id"))
+            st.session_state["notes_md"] = md
+            st.rerun()
+        except Exception as e:
+            st.error(f"Export failed: {e}")
 
 left, right = st.columns([1, 3], gap="large")
 
@@ -115,24 +169,24 @@ with left:
     st.markdown('<div class="sticky-left">', unsafe_allow_html=True)
     st.subheader("Contents")
 
-    # Search filter
-    q = (st.text_input("Search", placeholder="Filter sections…") or "").strip().lower()
-    filtered = [
-        s for s in sections
-        if (q in (s.get("title","").lower()) or q in (s.get("content","").lower()))
-    ] if q else sections
+    # Search filter (titles; bodies aren't loaded up front)
+    q = (st.text_input("Search", placeholder="Filter sections by title…") or "").strip().lower()
+    filtered = [s for s in sections if q in (s.get("title", "").lower())] if q else sections
 
-    # Radio to select section
+    # Radio to select section, a page of titles at a time
     if filtered:
-        options = [s.get("title", "Untitled") for s in filtered]
-        selected_title = st.radio(
+        pages = max(1, -(-len(filtered) // LIST_PAGE))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+        shown = filtered[(page - 1) * LIST_PAGE: page * LIST_PAGE]
+        titles = {s["id"]: s.get("title", "Untitled") for s in shown}
+        selected_id = st.radio(
             "Sections",
-            options=options,
+            options=list(titles),
+            format_func=titles.get,
             label_visibility="collapsed",
             index=0
         )
-        # Map back to section object
-        selected = next((s for s in filtered if s.get("title") == selected_title), None)
+        selected = load_section(notes, selected_id) if selected_id else None
     else:
         st.info("No sections match your search.")
         selected = None
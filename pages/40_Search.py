@@ -5,7 +5,7 @@ import re
 import json
 import os
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 import httpx
 import streamlit as st
 from ui.bootstrap import ensure_corpus
@@ -58,21 +58,71 @@ if NOTES_JSON.exists():
     except Exception:
         st.caption(f"Lecture: **{lecture_title}**")
 
+FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:8000")
+
+# --- Type-ahead suggestions ---
+SUGGEST_DEBOUNCE_MS = 250
+
+try:  # optional: reruns the page while typing, debounced in the browser
+    from st_keyup import st_keyup
+except ImportError:  # plain text_input: suggestions refresh on Enter/blur
+    st_keyup = None
+
+def fetch_suggestions(prefix: str) -> List[Dict]:
+    """
+    /search/suggest call for the debounced query; repeat prefixes are answered from
+    a per-session cache.
+    """
+    prefix = prefix.strip().lower()
+    if len(prefix) < 2:
+        return []
+    cache: Dict[str, List[Dict]] = st.session_state.setdefault("suggest_cache", {})
+    if prefix in cache:
+        return cache[prefix]
+    try:
+        r = httpx.get(f"{FASTAPI_URL}/search/suggest", params={"q": prefix, "limit": 6}, timeout=1.0)
+        r.raise_for_status()
+        out = r.json() or []
+    except Exception:
+        out = []
+    cache[prefix] = out
+    return out
+
+def _pick_suggestion(text: str) -> None:
+    st.session_state["search_q"] = text
+    st.session_state["search_q_picks"] = st.session_state.get("search_q_picks", 0) + 1  # remount the keyup box with `text`
+    st.session_state["search_pending"] = True
+
 # --- Search controls ---
+if st_keyup is not None:
+    # a rerun only fires once typing pauses for SUGGEST_DEBOUNCE_MS, so each suggest call is for the latest text
+    q = st_keyup("Enter search query", value=st.session_state.get("search_q", ""),
+                 placeholder="e.g., Laplace stability condition", debounce=SUGGEST_DEBOUNCE_MS,
+                 key=f"search_q_keyup-{st.session_state.get('search_q_picks', 0)}") or ""
+    st.session_state["search_q"] = q
+else:
+    q = st.text_input("Enter search query", placeholder="e.g., Laplace stability condition", key="search_q")
+suggestions = fetch_suggestions(q or "")
+if suggestions:
+    s_cols = st.columns(len(suggestions))
+    for i, (col, sug) in enumerate(zip(s_cols, suggestions)):
+        col.button(sug.get("text", ""), key=f"sug-{i}",
+                   on_click=_pick_suggestion, args=(sug.get("text", ""),))
+
 with st.form("search_form", clear_on_submit=False):
-    q = st.text_input("Enter search query", placeholder="e.g., Laplace stability condition")
     colA, colB, colC = st.columns([1, 1, 1])
     top_k = colA.slider("Results", 3, 15, 5)
     mode = colB.selectbox("Mode", ["Hybrid", "Keyword", "Semantic"])
     show_snippets = colC.toggle("Show snippets", value=True)
+    diversity = st.slider("Diversity", 0.0, 1.0, 0.0, step=0.1,
+                          help="Higher values drop near-duplicate snippets from the results.")
     submitted = st.form_submit_button("Search", use_container_width=False)
 
 # --- Mode mapping ---
 mode_map: Dict[str, str] = {"Hybrid": "hybrid", "Keyword": "keyword", "Semantic": "semantic"}
-FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:8000")
 
 # --- Run search ---
-if submitted:
+if submitted or st.session_state.pop("search_pending", False):
     q_clean = q.strip()
     if not q_clean:
         st.warning("Please enter a query.")
@@ -84,13 +134,18 @@ if submitted:
             with st.spinner("Searching…"):
                 resp = httpx.post(
                     f"{FASTAPI_URL}/search",
-                    json={"q": q_clean, "top_k": int(top_k), "mode": sel_mode},
+                    json={"q": q_clean, "top_k": int(top_k), "mode": sel_mode,
+                          "diversity": float(diversity)},
                     timeout=30.0,
                 )
                 resp.raise_for_status()
-                st.session_state["search_hits"] = resp.json()
+                page = resp.json()
+                st.session_state["search_hits"] = page.get("hits", [])
+                st.session_state["search_cursor"] = page.get("next_cursor")
+                st.session_state["search_page_size"] = int(top_k)
         except Exception as e:
             st.error(f"Search failed: {e}")
+            st.session_state["search_cursor"] = None
             # graceful fallback
             st.session_state["search_hits"] = [
                 {
@@ -109,8 +164,29 @@ if submitted:
                 },
             ]
 
+# --- Load more (cursor page; backend reuses the cached candidate list) ---
+def _load_more() -> None:
+    cursor = st.session_state.get("search_cursor")
+    if not cursor:
+        return
+    try:
+        resp = httpx.post(
+            f"{FASTAPI_URL}/search",
+            json={"q": "", "cursor": cursor, "top_k": st.session_state.get("search_page_size", 5)},
+            timeout=30.0,
+        )
+        resp.raise_for_status()
+        page = resp.json()
+        st.session_state["search_hits"] = st.session_state.get("search_hits", []) + page.get("hits", [])
+        st.session_state["search_cursor"] = page.get("next_cursor")
+    except Exception as e:
+        st.session_state["search_cursor"] = None
+        st.session_state["search_error"] = f"Could not load more results: {e}"
+
 # --- Render results ---
 hits = st.session_state.get("search_hits", [])
+if st.session_state.get("search_error"):
+    st.error(st.session_state.pop("search_error"))
 
 
 def highlight(text: str, query: str) -> str:
@@ -153,6 +229,9 @@ if hits:
             st.button("Open in Notes", key=f"open-{i}")
         with a2:
             st.button("Copy citation", key=f"cite-{i}")
+
+    if st.session_state.get("search_cursor"):
+        st.button("Load more", on_click=_load_more)
 else:
     st.info("Type a query and press **Search** to see results.")
     st.caption(
@@ -117,51 +117,28 @@ with st.form("quiz_controls"):
     qtype = c2.selectbox("Type", ["MCQ", "Fill-in-the-blank", "Mix"])
     difficulty = c3.selectbox("Difficulty", ["Auto", "Easy", "Medium", "Hard"])
     topic_seed = st.text_input("Optional topic focus", placeholder="e.g., Laplace, stability, convolution")
+    fresh = st.checkbox("Fresh questions (skip cached results)", value=False)
     generated = st.form_submit_button("Generate Quiz")
 
 FASTAPI_URL = (os.getenv("FASTAPI_URL", "http://127.0.0.1:8000") or "").rstrip("/")
 
 # ---------- Generate via backend ----------
 if generated:
-    # Build scoped context from selected sections (or all sections if none picked)
-    section_ids: List[str] = [s.get("id", "") for s in picked] if picked else []
-    raw_context_parts: List[str] = []
-    for s in (picked or all_sections):
-        title = s.get("title", "")
-        content = s.get("content", "")
-        s_type = s.get("type", "text")
-        if not content:
-            continue
-        if s_type == "code":
-            raw_context_parts.append(f"{title}\nCode:\n{content}\n")
-        elif s_type == "latex":
-            raw_context_parts.append(f"{title}\nMath:\n{content}\n")
-        else:
-            raw_context_parts.append(f"{title}\n{content}\n")
-
-    context_text = "\n\n".join(raw_context_parts).strip()
-
-    # cap payload size to keep requests snappy
-    if len(context_text) > 12000:
-        context_text = context_text[:12000]
+    # The backend resolves section ids to their text itself; no selection = all sections
+    section_ids: List[str] = [s["id"] for s in picked if s.get("id")]
 
-    # Guard: don't submit if there is no study text
-    if not context_text.strip() and not (topic_seed and topic_seed.strip()):
-        st.error("No study material found. Select relevant sections or provide a topic focus.")
+    if not all_sections and not (topic_seed and topic_seed.strip()):
+        st.error("No study material found. Upload a lecture or provide a topic focus.")
         st.stop()
 
-    # Small debug badge so you know what's being sent
-    st.caption(f"Context chars: {len(context_text)}")
-
     payload: Dict[str, Any] = {
         "n": int(n_questions),
         "type": str((qtype or "MCQ")).lower(),
         "difficulty": str((difficulty or "Auto")).lower(),
         "topic": topic_seed or None,
         "section_ids": section_ids or None,
-        "context": context_text or None,    # backend prefers this
         "corpus_id": st.session_state.get("corpus_id"),
-        "lecture_title": lecture_title,
+        "no_cache": bool(fresh),
     }
 
     # normalize qtype to what backend expects
@@ -172,6 +149,9 @@ if generated:
         with st.spinner("Generating quiz…"):
             # Accept both /quiz and /quiz/ (router supports both)
             r = httpx.post(f"{FASTAPI_URL}/quiz", json=payload, timeout=60.0)
+            if r.status_code == 409:
+                # notes were re-uploaded since this page loaded; refresh corpus status on the next run
+                st.session_state["has_corpus"] = None
             r.raise_for_status()
             items_from_api: List[Dict[str, Any]] = r.json() or []
     except Exception as e:
@@ -293,12 +273,63 @@ else:
                 if r.get("explanation"):
                     st.info(r["explanation"])
 
+# ---------- Batch (one quiz per topic, streamed) ----------
+def stream_batch(specs: List[Dict[str, Any]]):
+    """Yield each quiz from POST /quiz/batch as soon as the backend finishes it (NDJSON lines)."""
+    body = {"quizzes": specs, "corpus_id": st.session_state.get("corpus_id")}
+    with httpx.stream("POST", f"{FASTAPI_URL}/quiz/batch", json=body, timeout=300.0) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if line.strip():
+                yield json.loads(line)
+
+with st.expander("Batch: one quiz per topic (weekly practice sets)"):
+    with st.form("quiz_batch"):
+        topics_raw = st.text_area("Topics, one per line", placeholder="Laplace transform\nStability\nConvolution",
+                                  help="Each quiz draws on the selected sections that mention its topic.")
+        b1, b2 = st.columns(2)
+        batch_n = b1.slider("Questions per quiz", 3, 25, 6, key="batch_n")
+        batch_type = b2.selectbox("Type", ["MCQ", "Fill-in-the-blank", "Mix"], key="batch_type")
+        batch_go = st.form_submit_button("Generate all")
+
+    if batch_go:
+        topics = [t.strip() for t in (topics_raw or "").splitlines() if t.strip()]
+        btype = {"fill-in-the-blank": "fib"}.get(batch_type.lower(), batch_type.lower())
+        section_ids = [s["id"] for s in picked if s.get("id")] or None
+        specs = [{"n": int(batch_n), "type": btype, "topic": t, "section_ids": section_ids} for t in topics]
+        results: List[Dict[str, Any]] = [{} for _ in specs]
+        if not specs:
+            st.warning("Enter at least one topic.")
+        else:
+            progress = st.progress(0.0, text="Generating…")
+            try:
+                for done, res in enumerate(stream_batch(specs), 1):
+                    results[res["index"]] = res
+                    progress.progress(done / len(specs), text=f"{done}/{len(specs)} ready")
+            except Exception as e:
+                st.error(f"Batch generation failed: {e}")
+            st.session_state["quiz_batch"] = [r for r in results if r]
+
+    for res in st.session_state.get("quiz_batch", []):
+        label = res.get("topic") or "All sections"
+        if res.get("error"):
+            st.warning(f"{label}: {res['error'].get('detail')}")
+            continue
+        st.markdown(f"**{label}** · {len(res.get('items', []))} questions")
+        for i, it in enumerate(res.get("items", []), 1):
+            st.write(f"{i}. {it.get('q', '')}")
+    if st.session_state.get("quiz_batch"):
+        st.download_button("Download all .json", data=json.dumps(st.session_state["quiz_batch"], indent=2),
+                           file_name="quiz_batch.json")
+
 # ---------- Notes ----------
 # Backend contract: POST /quiz
 # Request: {
 #   n, type: "mcq"|"fib"|"mix", difficulty, topic?,
-#   section_ids?: string[], context?: string, corpus_id?: string, lecture_title?: string
+#   section_ids?: string[], corpus_id?: string (from /corpus/status), context?: string (ad-hoc text), no_cache?
 # }
 # Response: [ { q, choices?:[], answer, explanation? }, ... ]
+# POST /quiz/batch: { quizzes: [<quiz request>, ...], corpus_id? }
+#   -> NDJSON, one line per quiz in completion order: { index, topic, section_ids, items | error }
 
 st.markdown('</div>', unsafe_allow_html=True)
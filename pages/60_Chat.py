@@ -2,6 +2,7 @@
 import sys
 import json
 import os
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -30,12 +31,15 @@ if not st.session_state.get("has_corpus"):
 st.markdown('<div class="chat-page">', unsafe_allow_html=True)
 st.title("AI Assistant")
 
+FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:8000")
+
 # ---------- Runtime state ----------
 st.session_state.setdefault(
     "messages",
     [{"role": "assistant", "content": "Ask me about your lecture."}]
 )
 st.session_state.setdefault("chat_meta", {})
+st.session_state.setdefault("chat_session_id", None)  # server-side history (see /chat/sessions)
 
 # ---------- Controls (context + generation) ----------
 c1, c2, c3, c4 = st.columns([1, 1, 1, 1])
@@ -49,6 +53,12 @@ a1, a2 = st.columns([1, 1])
 with a1:
     if st.button("Clear chat 🗑️"):
         st.session_state["messages"] = [{"role": "assistant", "content": "Ask me about your lecture."}]
+        sid = st.session_state.pop("chat_session_id", None)
+        if sid:
+            try:
+                httpx.delete(f"{FASTAPI_URL}/chat/sessions/{sid}", timeout=5.0)
+            except Exception:
+                pass  # the server expires it anyway
 with a2:
     export_payload = {
         "meta": {
@@ -68,6 +78,31 @@ with a2:
 st.divider()
 
 # ---------- Renderer with optional citations ----------
+def render_timings(timings):
+    parts = [f"Retrieval {timings.get('retrieval_ms', 0):.0f} ms"]
+    if "ttft_ms" in timings:
+        parts.append(f"First token {timings['ttft_ms']:.0f} ms")
+    parts.append(f"Generation {timings.get('generation_ms', 0):.0f} ms")
+    st.caption(" · ".join(parts))
+
+
+def render_citations(cites):
+    with st.expander("Sources"):
+        for i, c in enumerate(cites, 1):
+            title = c.get("title", f"Source {i}")
+            sec = c.get("section_id")
+            score = c.get("score")
+            snip = c.get("snippet", "")
+            line = title
+            if sec:
+                line += f" · Section: {sec}"
+            if score is not None:
+                line += f" · Score: {float(score):.2f}"
+            st.markdown(f"- **{line}**")
+            if snip:
+                st.caption(snip)
+
+
 def render_message(msg):
     role = msg.get("role", "assistant")
     content = msg.get("content", "")
@@ -80,27 +115,54 @@ def render_message(msg):
         else:
             st.markdown(content)
 
+        timings = msg.get("timings") or {}
+        if role == "assistant" and timings:
+            render_timings(timings)
+
         if show_citations and role == "assistant" and cites:
-            with st.expander("Sources"):
-                for i, c in enumerate(cites, 1):
-                    title = c.get("title", f"Source {i}")
-                    sec = c.get("section_id")
-                    score = c.get("score")
-                    snip = c.get("snippet", "")
-                    line = title
-                    if sec:
-                        line += f" · Section: {sec}"
-                    if score is not None:
-                        line += f" · Score: {float(score):.2f}"
-                    st.markdown(f"- **{line}**")
-                    if snip:
-                        st.caption(snip)
+            render_citations(cites)
+
 
 # Render chat so far
 for m in st.session_state["messages"]:
     render_message(m)
 
-FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:8000")
+
+
+def sse_events(resp):
+    """Parse a text/event-stream response into (event, data) pairs."""
+    event, data = "message", []
+    for line in resp.iter_lines():
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+
+def stream_chat(payload, answer_msg):
+    """Yield answer tokens from /chat/stream; fills citations/timings on `answer_msg` as they arrive."""
+    t0 = time.perf_counter()
+    with httpx.stream("POST", f"{FASTAPI_URL}/chat/stream", json=payload, timeout=httpx.Timeout(60.0, connect=5.0)) as resp:
+        resp.raise_for_status()
+        if resp.headers.get("x-session-id"):
+            st.session_state["chat_session_id"] = resp.headers["x-session-id"]
+        for event, data in sse_events(resp):
+            if event == "citations":
+                answer_msg["citations"] = data
+            elif event == "token":
+                if "client_ttft_ms" not in answer_msg["timings"]:
+                    answer_msg["timings"]["client_ttft_ms"] = (time.perf_counter() - t0) * 1000.0
+                answer_msg["content"]["text"] += data["t"]
+                yield data["t"]
+            elif event == "done":
+                answer_msg["timings"].update(data.get("timings", {}))
+            elif event == "error":
+                raise RuntimeError(data.get("detail", "stream error"))
+
 
 # ---------- Input ----------
 prompt = st.chat_input("Type your question…")
@@ -110,35 +172,30 @@ if prompt:
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # ---- Call backend ----
+    # ---- Call backend (history lives server-side; send only the new turn) ----
     payload = {
-        "messages": st.session_state["messages"],
+        "message": prompt,
+        "session_id": st.session_state.get("chat_session_id"),
         "top_k": int(top_k),
         "temperature": float(temperature),
         "ctx_mode": "notes" if ctx_mode == "Notes only" else "notes+web",
     }
 
-    try:
-        with st.spinner("Thinking…"):
-            resp = httpx.post(f"{FASTAPI_URL}/chat", json=payload, timeout=60.0)
-            resp.raise_for_status()
-            data = resp.json()  # { "text": "...", "citations": [ {...}, ... ] }
-            answer_msg = {
-                "role": "assistant",
-                "content": {"text": data.get("text", "")},
-                "citations": data.get("citations", []),
-            }
-    except Exception as e:
-        # graceful fallback on error
-        answer_msg = {
-            "role": "assistant",
-            "content": {"text": f"Chat failed: {e}"},
-            "citations": [],
-        }
+    answer_msg = {"role": "assistant", "content": {"text": ""}, "citations": [], "timings": {}}
+    with st.chat_message("assistant"):
+        try:
+            st.write_stream(stream_chat(payload, answer_msg))
+        except Exception as e:
+            # graceful fallback on error
+            answer_msg["content"]["text"] += f"\n\nChat failed: {e}"
+            st.markdown(answer_msg["content"]["text"])
+        if answer_msg["timings"]:
+            render_timings(answer_msg["timings"])
+        if show_citations and answer_msg["citations"]:
+            render_citations(answer_msg["citations"])
 
     # Append assistant turn
     st.session_state["messages"].append(answer_msg)
-    render_message(answer_msg)
 
     # Keep chat size reasonable (avoid unbounded growth)
     if len(st.session_state["messages"]) > 60:
@@ -15,6 +15,7 @@ def ensure_corpus() -> bool:
       - lecture_title (str|None)
       - generated_at (int|None)
       - sections_count (int)
+      - corpus_id (str|None)  (sent back with /quiz section ids)
     Returns True if corpus exists.
     """
     if st.session_state.get("has_corpus") is True:
@@ -29,6 +30,7 @@ def ensure_corpus() -> bool:
         st.session_state["lecture_title"] = meta.get("lecture_title")
         st.session_state["generated_at"] = meta.get("generated_at")
         st.session_state["sections_count"] = int(meta.get("sections") or 0)
+        st.session_state["corpus_id"] = meta.get("corpus_id")
         return ready
     except Exception:
         # leave as-is; page may still fallback to local sample if available